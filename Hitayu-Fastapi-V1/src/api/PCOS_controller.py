@@ -1,14 +1,26 @@
-from fastapi import FastAPI,APIRouter
+from fastapi import FastAPI,APIRouter,HTTPException,File,UploadFile,Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import joblib
-import numpy as np
+from typing import Dict, List, Optional
+import os
+import shutil
+import tempfile
+from src.pcos_module.bulk import OUTPUT_FORMATS, read_header, score_stream
+from src.pcos_module.columnar import COLUMNAR_FORMATS, declared_schema, score_columnar
+from src.pcos_module.explain import ExplainerUnavailable
+from src.pcos_module.predictor import LegacyPredictor
+from src.pcos_module.whatif import SweepError, what_if
+from src.pcos_module.encoding import FEATURE_COLUMNS, EncodingError
+from src.pcos_module.pipeline import get_pipeline
 
 #deine the router
 pcos_router = APIRouter()
 
 
-#load model
-model = joblib.load("src/models/pcos_model.pkl")
+#load model (PCOS_BACKEND=onnx serves it through ONNX Runtime instead of scikit-learn),
+#with repeated feature vectors answered from an LRU cache
+predictor = LegacyPredictor()
 
 
 
@@ -30,22 +42,221 @@ class PCOSOutput(BaseModel):
 @pcos_router.post("/predict", response_model=PCOSOutput)
 def predict_pcos(data: PCOSInput):
 
-    input_data = np.array([[
+    prediction, confidence = predictor.predict((
         data.age,
         data.bmi,
         data.menstrual_irregularity,
         data.testosterone_level,
         data.antral_follicle_count
-    ]])
-
-    prediction = model.predict(input_data)[0]
-    probability = model.predict_proba(input_data)[0]
+    ))
 
     result = "PCOS Detected" if prediction == 1 else "No PCOS"
-    confidence = probability[prediction]
 
     return {
         "prediction": result,
         "confidence": round(confidence, 2)
     }
 
+
+class PCOSExplanation(BaseModel):
+    prediction: str
+    confidence: float
+    model_version: str
+    base_value: float
+    contributions: Dict[str, float]
+
+
+@pcos_router.post("/predict/explain", response_model=PCOSExplanation)
+def explain_pcos(data: PCOSInput):
+    #per-feature contributions to the predicted class: base_value + sum(contributions) = confidence
+    try:
+        prediction, confidence, base_value, contributions = predictor.explain((
+            data.age,
+            data.bmi,
+            data.menstrual_irregularity,
+            data.testosterone_level,
+            data.antral_follicle_count
+        ))
+    except ExplainerUnavailable as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return {
+        "prediction": "PCOS Detected" if prediction == 1 else "No PCOS",
+        "confidence": round(confidence, 4),
+        "model_version": predictor.version,
+        "base_value": round(base_value, 4),
+        "contributions": {feature: round(value, 4) for feature, value in contributions.items()}
+    }
+
+
+class SweepRange(BaseModel):
+    start: float
+    stop: float
+    steps: int = 11
+
+
+class PCOSWhatIfInput(BaseModel):
+    base: PCOSInput
+    sweeps: Dict[str, SweepRange]
+    grid: Optional[List[str]] = None
+
+
+@pcos_router.post("/predict/whatif")
+def what_if_pcos(data: PCOSWhatIfInput):
+    #PCOS probability as each swept feature varies from the base input (and over a 2-D grid on request)
+    if not data.sweeps:
+        raise HTTPException(status_code=422, detail="sweeps must not be empty")
+    base = data.base
+    model, version = predictor.snapshot()
+    try:
+        result = what_if(
+            model,
+            (base.age, base.bmi, base.menstrual_irregularity, base.testosterone_level, base.antral_follicle_count),
+            {feature: (sweep.start, sweep.stop, sweep.steps) for feature, sweep in data.sweeps.items()},
+            data.grid
+        )
+    except SweepError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"model_version": version, **result}
+
+
+@pcos_router.get("/predict/cache")
+def predict_cache_stats():
+    return predictor.stats()
+
+
+@pcos_router.post("/predict/reload")
+def reload_pcos_model():
+    #hot-swap to the artifact on disk; cached results of the old model are dropped
+    try:
+        predictor.reload()
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(status_code=503, detail=f"Reload failed, still serving {predictor.version}: {str(e)}")
+    return predictor.stats()
+
+
+#raw dataset schema (one row of the PCOS dataset, without PCOS_Risk)
+class PCOSRecord(BaseModel):
+    Age: float
+    Weight_kg: float
+    Height_cm: float
+    Irregular_Periods: str
+    Acne: Optional[str] = None
+    Hair_Growth: str
+    Hair_Loss: str
+    Weight_Gain: str
+    Stress_Level: str
+    Physical_Activity: str
+    Family_History_PCOS: str
+    Blood_Sugar_mg_dl: float
+
+
+class PCOSBatchInput(BaseModel):
+    records: List[PCOSRecord]
+
+
+class PCOSRiskPrediction(BaseModel):
+    risk: str
+    confidence: float
+    probabilities: Dict[str, float]
+
+
+class PCOSBatchOutput(BaseModel):
+    model_version: str
+    predictions: List[PCOSRiskPrediction]
+
+
+def load_pipeline():
+    try:
+        return get_pipeline()
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=503,
+            detail="PCOS pipeline artifact not found - build it with: python -m src.pcos_module.pipeline"
+        )
+
+
+@pcos_router.post("/predict/batch", response_model=PCOSBatchOutput)
+def predict_pcos_batch(data: PCOSBatchInput):
+    if not data.records:
+        raise HTTPException(status_code=422, detail="records must not be empty")
+    pipeline = load_pipeline()
+
+    #column-wise batch, encoded in one vectorized pass
+    columns = {column: [getattr(record, column) for record in data.records] for column in FEATURE_COLUMNS}
+    try:
+        labels, confidences, probabilities = pipeline.predict(columns)
+    except EncodingError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    probabilities = probabilities.round(4).tolist()
+    return {
+        "model_version": pipeline.version,
+        "predictions": [
+            {
+                "risk": label,
+                "confidence": round(confidence, 2),
+                "probabilities": dict(zip(pipeline.classes, row))
+            }
+            for label, confidence, row in zip(labels.tolist(), confidences.tolist(), probabilities)
+        ]
+    }
+
+
+@pcos_router.get("/predict/batch/schema")
+def predict_pcos_batch_schema():
+    return declared_schema()
+
+
+@pcos_router.post("/predict/batch/columnar")
+async def predict_pcos_batch_columnar(request: Request):
+    """Arrow IPC or .npy batch, answered in the same format (see /predict/batch/schema)."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in COLUMNAR_FORMATS:
+        raise HTTPException(status_code=415, detail=f"Content-Type must be one of {list(COLUMNAR_FORMATS)}")
+    pipeline = load_pipeline()
+    body = await request.body()
+
+    #decode, validate and score off the event loop
+    try:
+        payload = await run_in_threadpool(score_columnar, body, content_type, pipeline)
+    except EncodingError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ImportError:
+        raise HTTPException(status_code=415, detail="Arrow payloads need pyarrow installed on the server")
+
+    return Response(
+        content=payload,
+        media_type=content_type,
+        headers={"X-Model-Version": pipeline.version, "X-PCOS-Classes": ",".join(pipeline.classes)}
+    )
+
+
+def stream_scores(csv_path: str, output_format: str):
+    #the 200 status is already sent: a bad chunk can only abort the connection,
+    #so the client sees a truncated transfer rather than a complete-looking result
+    try:
+        yield from score_stream(csv_path, output_format)
+    finally:
+        os.remove(csv_path)
+
+
+@pcos_router.post("/predict/csv")
+def predict_pcos_csv(file: UploadFile = File(...), output_format: str = "csv"):
+    if output_format not in OUTPUT_FORMATS:
+        raise HTTPException(status_code=422, detail=f"output_format must be one of {list(OUTPUT_FORMATS)}")
+    load_pipeline()
+
+    #spool the upload to disk so it can be streamed after the request body is released
+    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as spooled:
+        shutil.copyfileobj(file.file, spooled, length=1 << 20)
+
+    #reject a bad header with a 422 while the status can still be chosen
+    try:
+        read_header(spooled.name)
+    except (EncodingError, UnicodeDecodeError) as e:
+        os.remove(spooled.name)
+        raise HTTPException(status_code=422, detail=str(e))
+
+    media_type = "text/csv" if output_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(stream_scores(spooled.name, output_format), media_type=media_type)
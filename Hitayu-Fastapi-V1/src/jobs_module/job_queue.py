@@ -0,0 +1,190 @@
+import json
+import os
+import shutil
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+
+JOBS_DIR = os.getenv("JOBS_DIR", "jobs")
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(JOBS_DIR, "jobs.sqlite3"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    input_path TEXT,
+    result_path TEXT,
+    processed INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker_pid INTEGER,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+
+class JobQueue:
+    """
+    Durable job queue in a local SQLite database.
+
+    Every method opens its own short-lived connection, so one queue object can
+    be shared by API threads and each worker process uses the same file safely
+    (WAL mode). Claiming runs in an IMMEDIATE transaction, so a queued job is
+    handed to exactly one worker.
+    """
+
+    def __init__(self, db_path=JOBS_DB_PATH, jobs_dir=JOBS_DIR):
+        self.db_path = db_path
+        self.jobs_dir = jobs_dir
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connect(self, immediate=False):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _as_dict(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def job_dir(self, job_id) -> str:
+        path = os.path.join(self.jobs_dir, job_id)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def new_job_id(self) -> str:
+        return uuid.uuid4().hex
+
+    # API side -----------------------------------------------------------------
+
+    def enqueue(self, kind, params=None, input_path=None, job_id=None) -> str:
+        job_id = job_id or self.new_job_id()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, input_path, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(params or {}), input_path, time.time())
+            )
+        return job_id
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            return self._as_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def cancel(self, job_id):
+        """Cancel a queued job at once; ask a running job to stop at its next progress update."""
+        now = time.time()
+        with self._connect(immediate=True) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, now, job_id, QUEUED)
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                (job_id, RUNNING)
+            )
+            return self._as_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    # Worker side --------------------------------------------------------------
+
+    def claim(self):
+        """Atomically move the oldest queued job to running and return it, or None."""
+        now = time.time()
+        with self._connect(immediate=True) as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker_pid = ?, started_at = ?, heartbeat_at = ? WHERE id = ?",
+                (RUNNING, os.getpid(), now, now, row["id"])
+            )
+            return self._as_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+
+    def report_progress(self, job_id, processed, total=None) -> bool:
+        """Record progress and heartbeat; returns True if cancellation was requested."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET processed = ?, total = COALESCE(?, total), heartbeat_at = ? WHERE id = ?",
+                (processed, total, time.time(), job_id)
+            )
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def finish(self, job_id, status, result_path=None, error=None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result_path = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, result_path, error, time.time(), job_id)
+            )
+
+    def requeue_stale(self, stale_after=300.0) -> int:
+        """Return running jobs whose worker stopped heartbeating (e.g. crashed) to the queue."""
+        with self._connect(immediate=True) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, worker_pid = NULL, processed = 0 "
+                "WHERE status = ? AND heartbeat_at < ? AND cancel_requested = 0",
+                (QUEUED, RUNNING, time.time() - stale_after)
+            )
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE status = ? AND heartbeat_at < ? AND cancel_requested = 1",
+                (CANCELLED, time.time(), RUNNING, time.time() - stale_after)
+            )
+            return cursor.rowcount
+
+    def purge_finished(self, older_than) -> int:
+        """
+        Delete finished jobs older than ``older_than`` seconds, rows and files,
+        plus job directories no row refers to (uploads whose enqueue never happened).
+        """
+        cutoff = time.time() - older_than
+        with self._connect(immediate=True) as conn:
+            expired = [row["id"] for row in conn.execute(
+                f"SELECT id FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED_STATES))}) AND finished_at < ?",
+                (*FINISHED_STATES, cutoff)
+            )]
+            conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in expired])
+            known = {row["id"] for row in conn.execute("SELECT id FROM jobs")}
+
+        for job_id in expired:
+            shutil.rmtree(os.path.join(self.jobs_dir, job_id), ignore_errors=True)
+        for entry in os.scandir(self.jobs_dir):
+            # Directories younger than the cutoff may be uploads about to be enqueued
+            if entry.is_dir() and entry.name not in known and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        return len(expired)
@@ -0,0 +1,97 @@
+import os
+import shutil
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+
+from src.jobs_module.job_queue import FINISHED_STATES, SUCCEEDED, JobQueue
+from src.jobs_module.worker import JOB_HANDLERS
+from src.pcos_module.bulk import OUTPUT_FORMATS
+
+jobs_router = APIRouter()
+
+
+@lru_cache(maxsize=None)
+def get_job_queue() -> JobQueue:
+    return JobQueue()
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    processed: int
+    total: Optional[int]
+    progress: Optional[float]
+    error: Optional[str]
+    created_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+
+
+def job_status(job) -> dict:
+    total = job["total"]
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "processed": job["processed"],
+        "total": total,
+        "progress": round(job["processed"] / total, 4) if total else (1.0 if job["status"] == SUCCEEDED else None),
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+
+
+def get_job_or_404(job_id: str):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@jobs_router.post("/jobs", response_model=JobStatus, status_code=202)
+def create_job(file: UploadFile = File(...), kind: str = Form("pcos_csv"), output_format: str = Form("csv")):
+    if kind not in JOB_HANDLERS:
+        raise HTTPException(status_code=422, detail=f"kind must be one of {list(JOB_HANDLERS)}")
+    if output_format not in OUTPUT_FORMATS:
+        raise HTTPException(status_code=422, detail=f"output_format must be one of {list(OUTPUT_FORMATS)}")
+
+    queue = get_job_queue()
+    job_id = queue.new_job_id()
+    input_path = os.path.join(queue.job_dir(job_id), "input.csv")
+    with open(input_path, "wb") as f:
+        shutil.copyfileobj(file.file, f, length=1 << 20)
+
+    queue.enqueue(kind, {"output_format": output_format}, input_path, job_id=job_id)
+    return job_status(queue.get(job_id))
+
+
+@jobs_router.get("/jobs/{job_id}", response_model=JobStatus)
+def get_job(job_id: str):
+    return job_status(get_job_or_404(job_id))
+
+
+@jobs_router.post("/jobs/{job_id}/cancel", response_model=JobStatus)
+def cancel_job(job_id: str):
+    job = get_job_or_404(job_id)
+    if job["status"] in FINISHED_STATES:
+        return job_status(job)
+    return job_status(get_job_queue().cancel(job_id))
+
+
+@jobs_router.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    job = get_job_or_404(job_id)
+    if job["status"] != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job['status']}, no result available")
+    if not job["result_path"] or not os.path.exists(job["result_path"]):
+        raise HTTPException(status_code=410, detail=f"Result file for job {job_id} is gone")
+
+    media_type = "text/csv" if job["result_path"].endswith(".csv") else "application/x-ndjson"
+    return FileResponse(job["result_path"], media_type=media_type, filename=os.path.basename(job["result_path"]))
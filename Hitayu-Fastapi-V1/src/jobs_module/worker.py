@@ -0,0 +1,195 @@
+import argparse
+import multiprocessing
+import os
+import signal
+import time
+
+from src.core.logger import setup_logger
+from src.jobs_module.job_queue import CANCELLED, FAILED, SUCCEEDED, JOBS_DB_PATH, JOBS_DIR, JobQueue
+
+logger = setup_logger()
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1.0"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "300"))
+# Finished jobs (rows, uploads and results) are deleted after this long
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+JOB_SWEEP_SECONDS = float(os.getenv("JOB_SWEEP_SECONDS", "3600"))
+# Bulk work runs at lower CPU priority than the API process serving /predict
+JOB_NICENESS = int(os.getenv("JOB_NICENESS", "10"))
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when the job was cancelled through the API."""
+
+
+def _count_data_rows(path) -> int:
+    """Data rows in a CSV (header excluded), counted in binary blocks."""
+    lines, last = 0, b"\n"
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1  # final line without a trailing newline
+    return max(0, lines - 1)
+
+
+def run_pcos_csv(queue, job):
+    """Score an uploaded PCOS CSV into the job directory; reports progress per chunk."""
+    from src.pcos_module.bulk import score_stream
+
+    output_format = job["params"].get("output_format", "csv")
+    result_path = os.path.join(queue.job_dir(job["id"]), f"result.{output_format}")
+    tmp_path = result_path + ".part"
+    total = _count_data_rows(job["input_path"])
+    queue.report_progress(job["id"], 0, total)
+
+    stats = {}
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as out:
+            # In-process scoring: the worker already is the unit of parallelism
+            for text in score_stream(job["input_path"], output_format, workers=1, stats=stats,
+                                     chunk_rows=job["params"].get("chunk_rows", 50000)):
+                out.write(text)
+                if queue.report_progress(job["id"], stats["rows"]):
+                    raise JobCancelled()
+        os.replace(tmp_path, result_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return result_path
+
+
+# Job kind -> handler(queue, job) returning the result file path
+JOB_HANDLERS = {
+    "pcos_csv": run_pcos_csv,
+}
+
+
+def run_job(queue, job):
+    handler = JOB_HANDLERS.get(job["kind"])
+    if handler is None:
+        queue.finish(job["id"], FAILED, error=f"Unknown job kind: {job['kind']}")
+        return
+    logger.info(f"Job {job['id']} ({job['kind']}) started in worker {os.getpid()}")
+    try:
+        result_path = handler(queue, job)
+    except JobCancelled:
+        logger.info(f"Job {job['id']} cancelled")
+        queue.finish(job["id"], CANCELLED)
+    except Exception as e:
+        logger.error(f"Job {job['id']} failed: {str(e)}")
+        queue.finish(job["id"], FAILED, error=str(e))
+    else:
+        logger.info(f"Job {job['id']} finished: {result_path}")
+        queue.finish(job["id"], SUCCEEDED, result_path=result_path)
+
+
+def worker_loop(db_path=JOBS_DB_PATH, jobs_dir=JOBS_DIR, stop_event=None):
+    """
+    Claim and run jobs until ``stop_event`` is set.
+
+    Models are loaded by the first job that needs them and stay loaded for the
+    life of the worker, so later jobs reuse them.
+    """
+    if hasattr(os, "nice"):
+        os.nice(JOB_NICENESS)
+    if stop_event is not None:
+        # The API process owns shutdown; let it stop us through the event
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    queue = JobQueue(db_path, jobs_dir)
+    last_sweep = 0.0
+    while stop_event is None or not stop_event.is_set():
+        queue.requeue_stale(JOB_STALE_SECONDS)
+        if time.time() - last_sweep >= JOB_SWEEP_SECONDS:
+            purged = queue.purge_finished(JOB_RETENTION_SECONDS)
+            if purged:
+                logger.info(f"Purged {purged} finished jobs older than {JOB_RETENTION_SECONDS:.0f}s")
+            last_sweep = time.time()
+        job = queue.claim()
+        if job is None:
+            if stop_event is not None:
+                stop_event.wait(JOB_POLL_SECONDS)
+            else:
+                time.sleep(JOB_POLL_SECONDS)
+            continue
+        run_job(queue, job)
+
+
+class JobWorkerPool:
+    """
+    Worker processes for the job queue, separate from the API process.
+
+    Spawned (not forked) so they start clean of the server's threads and event loop.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, db_path=JOBS_DB_PATH, jobs_dir=JOBS_DIR):
+        self.workers = workers
+        self.db_path = db_path
+        self.jobs_dir = jobs_dir
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._processes = []
+        self._lock_file = None
+
+    def start(self):
+        for i in range(self.workers):
+            process = self._context.Process(
+                target=worker_loop,
+                args=(self.db_path, self.jobs_dir, self._stop),
+                name=f"job-worker-{i}",
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+        logger.info(f"Started {self.workers} job workers")
+        return self
+
+    def start_once(self):
+        """
+        Start unless another process on this host already runs the pool.
+
+        Every uvicorn worker runs the app's startup; only the one holding the
+        lock file in ``jobs_dir`` starts job workers. Returns the pool, or None.
+        """
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        lock_file = open(os.path.join(self.jobs_dir, "workers.lock"), "a")
+        try:
+            import fcntl
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except ImportError:
+            pass  # no flock (Windows): uvicorn --workers is POSIX-only there anyway
+        except OSError:
+            lock_file.close()
+            logger.info("Job workers already run in another process")
+            return None
+        self._lock_file = lock_file
+        return self.start()
+
+    def stop(self, timeout=10.0):
+        """Stop after the running jobs; a job killed at the timeout is requeued once its heartbeat goes stale."""
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run job workers outside the API process")
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS)
+    args = parser.parse_args()
+
+    pool = JobWorkerPool(args.workers).start_once()
+    if pool is None:
+        raise SystemExit("Job workers are already running on this host")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pool.stop()
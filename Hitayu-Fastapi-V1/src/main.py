@@ -2,6 +2,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.api.PCOS_controller import pcos_router
 from src.conversational_module.chat_Controller import cnv_router
+from src.jobs_module.jobs_controller import jobs_router
+from src.jobs_module.worker import JOB_WORKERS, JobWorkerPool
 
 
 
@@ -16,6 +18,7 @@ app = FastAPI(
 
 app.include_router(pcos_router)
 app.include_router(cnv_router)
+app.include_router(jobs_router)
 
 
 app.add_middleware(
@@ -26,6 +29,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Bulk jobs run in separate worker processes so /predict latency is unaffected.
+# Only one process per host starts them, however many uvicorn workers run the app;
+# JOB_WORKERS=0 leaves them to an external `python -m src.jobs_module.worker`.
+job_workers = None
+
+@app.on_event("startup")
+def start_job_workers():
+    global job_workers
+    if JOB_WORKERS > 0:
+        job_workers = JobWorkerPool(JOB_WORKERS).start_once()
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    if job_workers is not None:
+        job_workers.stop()
+
 @app.get("/")
 def read_root():
     # logger.info("API is running")
@@ -0,0 +1,180 @@
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from src.core.logger import setup_logger
+from src.pcos_module.pipeline import DATASET_PATH, RISK_CLASSES
+from src.pcos_module.training import DEFAULT_SEED, load_feature_matrix, measure_latency, seed_everything
+
+logger = setup_logger()
+
+REPORT_PATH = "src/models/pcos_benchmark"
+
+
+def candidate_models(seed):
+    """Model families to compare: name -> unfitted estimator (scikit-learn API)."""
+    from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+
+    candidates = {
+        f"rf_t{trees}_d{depth or 'full'}": RandomForestClassifier(
+            n_estimators=trees, max_depth=depth, random_state=seed, class_weight="balanced", n_jobs=1)
+        for trees, depth in ((50, 6), (100, 8), (200, 10), (400, 12), (100, None))
+    }
+    candidates["hist_gb"] = HistGradientBoostingClassifier(max_iter=200, random_state=seed)
+    candidates["logreg"] = LogisticRegression(max_iter=1000, class_weight="balanced")
+    return candidates
+
+
+class KerasANN:
+    """The notebook's PC11 network behind a ``fit``/``predict_proba`` interface."""
+
+    def __init__(self, seed, epochs=30, batch_size=32):
+        self.seed = seed
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.model = None
+
+    def fit(self, X, y):
+        import tensorflow as tf
+        from tensorflow.keras.layers import Dense, Dropout
+        from tensorflow.keras.models import Sequential
+
+        tf.keras.utils.set_random_seed(self.seed)
+        self.model = Sequential([
+            Dense(32, activation="relu", input_shape=(X.shape[1],)),
+            Dropout(0.2),
+            Dense(16, activation="relu"),
+            Dropout(0.2),
+            Dense(len(RISK_CLASSES), activation="softmax"),
+        ])
+        self.model.compile(optimizer="adam", loss="sparse_categorical_crossentropy", metrics=["accuracy"])
+        self.model.fit(X, y, epochs=self.epochs, batch_size=self.batch_size, verbose=0)
+        return self
+
+    def predict_proba(self, X):
+        # Direct call: Model.predict adds per-call overhead that dominates single rows
+        return self.model(X, training=False).numpy()
+
+    def predict(self, X):
+        return self.predict_proba(X).argmax(axis=1)
+
+
+def _serialized_profile(name, model):
+    """Artifact size in bytes and load time in milliseconds."""
+    if isinstance(model, KerasANN):
+        from tensorflow.keras.models import load_model
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, f"{name}.keras")
+            model.model.save(path)
+            size = os.path.getsize(path)
+            started = time.perf_counter()
+            load_model(path)
+            return size, (time.perf_counter() - started) * 1000
+
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    size = buffer.tell()
+    buffer.seek(0)
+    started = time.perf_counter()
+    joblib.load(buffer)
+    return size, (time.perf_counter() - started) * 1000
+
+
+def pareto_front(results, objectives=(("single_row_p50_ms", "min"), ("artifact_bytes", "min"), ("accuracy", "max"))):
+    """Names of the results no other result beats on every objective."""
+    def _key(result):
+        return [result[field] if goal == "min" else -result[field] for field, goal in objectives]
+
+    keys = {result["name"]: _key(result) for result in results}
+    front = []
+    for name, key in keys.items():
+        dominated = any(
+            all(o <= k for o, k in zip(other, key)) and any(o < k for o, k in zip(other, key))
+            for other_name, other in keys.items() if other_name != name
+        )
+        if not dominated:
+            front.append(name)
+    return front
+
+
+def run_benchmark(data_path=DATASET_PATH, seed=DEFAULT_SEED, include_ann=True, latency_repeats=200):
+    from sklearn.metrics import accuracy_score, balanced_accuracy_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    seed_everything(seed)
+    X, y, _ = load_feature_matrix(data_path)
+    X_train, X_test, y_train, y_test = train_test_split(
+        np.asarray(X), y, test_size=0.2, random_state=seed, stratify=y)
+    scaler = StandardScaler().fit(X_train)
+    X_train, X_test = scaler.transform(X_train).astype(np.float32), scaler.transform(X_test).astype(np.float32)
+
+    candidates = candidate_models(seed)
+    if include_ann:
+        try:
+            import tensorflow  # noqa: F401
+            candidates["ann_pc11"] = KerasANN(seed)
+        except ImportError:
+            logger.warning("TensorFlow not installed - skipping the ANN")
+
+    results = []
+    for name, model in candidates.items():
+        logger.info(f"Benchmarking {name}")
+        started = time.perf_counter()
+        model.fit(X_train, y_train)
+        train_seconds = time.perf_counter() - started
+
+        y_pred = model.predict(X_test)
+        size, load_ms = _serialized_profile(name, model)
+        latency = measure_latency(model.predict_proba, X_test[:1], X_test, repeats=latency_repeats)
+        results.append({
+            "name": name,
+            "accuracy": round(float(accuracy_score(y_test, y_pred)), 4),
+            "balanced_accuracy": round(float(balanced_accuracy_score(y_test, y_pred)), 4),
+            "train_seconds": round(train_seconds, 2),
+            "artifact_bytes": size,
+            "load_ms": round(load_ms, 2),
+            **latency,
+        })
+
+    front = set(pareto_front(results))
+    for result in results:
+        result["pareto"] = result["name"] in front
+    return sorted(results, key=lambda result: (not result["pareto"], -result["accuracy"]))
+
+
+def render_markdown(results) -> str:
+    columns = ("name", "pareto", "accuracy", "balanced_accuracy", "single_row_p50_ms", "single_row_p95_ms",
+               "batch_rows_per_second", "artifact_bytes", "load_ms", "train_seconds")
+    lines = ["| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+    for result in results:
+        lines.append("| " + " | ".join("✓" if value is True else "" if value is False else str(value)
+                                       for value in (result[column] for column in columns)) + " |")
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency/accuracy Pareto benchmark across PCOS model families")
+    parser.add_argument("--data", default=DATASET_PATH)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--no-ann", action="store_true", help="Skip the Keras ANN")
+    parser.add_argument("--repeats", type=int, default=200, help="Single-row latency samples per model")
+    parser.add_argument("--out", default=REPORT_PATH, help="Report path prefix (.json and .md are written)")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.data, args.seed, not args.no_ann, args.repeats)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(f"{args.out}.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    markdown = render_markdown(report)
+    with open(f"{args.out}.md", "w", encoding="utf-8") as f:
+        f.write(markdown)
+    print(markdown)
@@ -0,0 +1,235 @@
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.core.logger import setup_logger
+from src.pcos_module.encoding import CATEGORIES, FEATURE_COLUMNS, EncodingError
+from src.pcos_module.pipeline import PIPELINE_PATH, get_pipeline
+
+logger = setup_logger()
+
+DEFAULT_CHUNK_ROWS = int(os.getenv("PCOS_BULK_CHUNK_ROWS", "50000"))
+DEFAULT_WORKERS = int(os.getenv("PCOS_BULK_WORKERS", str(os.cpu_count() or 1)))
+OUTPUT_FORMATS = ("csv", "ndjson")
+
+# Imported by the fork server before it forks any worker: see bulk_preload
+PRELOAD_MODULE = "src.pcos_module.bulk_preload"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _mp_context():
+    """
+    forkserver where available: workers are forked from a single-threaded server process,
+    never from the threaded API process, and the server preloads the pipeline so the
+    forest's pages are still shared copy-on-write between workers.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    if "forkserver" in methods:
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([PRELOAD_MODULE])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _init_worker(path):
+    # A no-op when the fork server already loaded this path; otherwise loads it here
+    get_pipeline(path)
+
+
+def get_scoring_pool(workers=DEFAULT_WORKERS, path=PIPELINE_PATH) -> ProcessPoolExecutor:
+    """Process-wide scoring pool; safe to create from a request thread."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=_mp_context(),
+                initializer=_init_worker,
+                initargs=(path,)
+            )
+            logger.info(f"Started PCOS scoring pool with {workers} workers")
+    return _pool
+
+
+def read_header(source) -> list:
+    """Column names from the first line of a CSV file."""
+    with open(source, "rb") as f:
+        names = next(csv.reader([f.readline().decode("utf-8-sig")]), [])
+    missing = [column for column in FEATURE_COLUMNS if column not in names]
+    if missing:
+        raise EncodingError(f"Missing column(s): {missing}")
+    return names
+
+
+def plan_chunks(source, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Yield ``(start byte, end byte, first row)`` of each ``chunk_rows``-row slice after the header.
+
+    Row boundaries are found by scanning for newlines in large binary blocks,
+    which is far cheaper than parsing; the parsing happens in the workers.
+    Assumes one record per line (no quoted newlines), as the dataset exports are.
+    """
+    size = os.path.getsize(source)
+    newlines, offset, first_row, pending = 0, 0, 0, None
+    with open(source, "rb") as f:
+        for block in iter(lambda: f.read(1 << 22), b""):
+            positions = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10)
+            # Newline n (the header's is 0) ends the line before row n; chunks start at every chunk_rows-th row
+            numbers = newlines + np.arange(len(positions))
+            for start in (offset + positions[numbers % chunk_rows == 0] + 1).tolist():
+                if pending is not None:
+                    yield pending, start, first_row
+                    first_row += chunk_rows
+                pending = start
+            newlines += len(positions)
+            offset += len(block)
+    if pending is not None and pending < size:
+        yield pending, size, first_row
+
+
+def read_chunk(source, start, end, names) -> dict:
+    """
+    Parse one byte range of the CSV into column arrays.
+
+    Categorical columns are read as plain strings so "None" reaches the encoder verbatim.
+    """
+    import pandas as pd
+
+    with open(source, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    frame = pd.read_csv(
+        io.BytesIO(data),
+        header=None,
+        names=names,
+        usecols=list(FEATURE_COLUMNS),
+        dtype={column: str for column in CATEGORIES},
+        keep_default_na=False
+    )
+    return {column: frame[column].to_numpy() for column in FEATURE_COLUMNS}
+
+
+def _format_header(output_format, classes):
+    if output_format != "csv":
+        return ""
+    return ",".join(["row", "risk", "confidence"] + [f"prob_{c}" for c in classes]) + "\n"
+
+
+def _format_csv(start_row, labels, confidences, probabilities):
+    lines = [
+        f"{start_row + offset},{label},{confidence:.4f}," + ",".join(f"{p:.4f}" for p in row)
+        for offset, (label, confidence, row) in enumerate(zip(labels.tolist(), confidences.tolist(), probabilities.tolist()))
+    ]
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _format_ndjson(start_row, labels, confidences, probabilities, classes):
+    return "".join(
+        json.dumps({
+            "row": start_row + offset,
+            "risk": label,
+            "confidence": round(confidence, 4),
+            "probabilities": dict(zip(classes, (round(p, 4) for p in row)))
+        }) + "\n"
+        for offset, (label, confidence, row) in enumerate(zip(labels.tolist(), confidences.tolist(), probabilities.tolist()))
+    )
+
+
+def _score_chunk(path, source, start, end, names, first_row, output_format):
+    """Parse, score and format one byte range; runs in a worker, returns (text, rows)."""
+    pipeline = get_pipeline(path)
+    labels, confidences, probabilities = pipeline.predict(read_chunk(source, start, end, names))
+    if output_format == "csv":
+        text = _format_csv(first_row, labels, confidences, probabilities)
+    else:
+        text = _format_ndjson(first_row, labels, confidences, probabilities, pipeline.classes)
+    return text, len(labels)
+
+
+def score_stream(source, output_format="csv", chunk_rows=DEFAULT_CHUNK_ROWS, workers=DEFAULT_WORKERS,
+                 path=PIPELINE_PATH, stats=None):
+    """
+    Score a raw-schema CSV file and yield the formatted output chunk by chunk, in input order.
+
+    The parent only finds chunk boundaries; parsing, scoring and formatting
+    all happen in the workers, which get byte ranges and return finished text.
+    At most ``2 * workers`` chunks are in flight, so memory stays constant
+    regardless of the input size. With ``workers=1`` everything runs in-process.
+    ``stats`` (a dict) is filled with row/chunk counts and timing.
+
+    The header is checked before anything is yielded; a chunk with bad data
+    raises ``EncodingError`` mid-stream, after the chunks before it were yielded.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"output_format must be one of {OUTPUT_FORMATS}")
+    names = read_header(source)
+    stats = stats if stats is not None else {}
+    stats.update(rows=0, chunks=0)
+    started = time.perf_counter()
+
+    yield _format_header(output_format, get_pipeline(path).classes)
+
+    def _emit(result):
+        text, rows = result
+        stats["rows"] += rows
+        stats["chunks"] += 1
+        return text
+
+    if workers <= 1:
+        for start, end, first_row in plan_chunks(source, chunk_rows):
+            yield _emit(_score_chunk(path, source, start, end, names, first_row, output_format))
+    else:
+        pool = get_scoring_pool(workers, path)
+        in_flight = deque()
+        for start, end, first_row in plan_chunks(source, chunk_rows):
+            in_flight.append(pool.submit(_score_chunk, path, source, start, end, names, first_row, output_format))
+            if len(in_flight) >= 2 * workers:
+                yield _emit(in_flight.popleft().result())
+        while in_flight:
+            yield _emit(in_flight.popleft().result())
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    stats["rows_per_second"] = int(stats["rows"] / stats["seconds"]) if stats["seconds"] else 0
+
+
+def score_csv(source, output, output_format="csv", chunk_rows=DEFAULT_CHUNK_ROWS, workers=DEFAULT_WORKERS,
+              path=PIPELINE_PATH) -> dict:
+    """Score ``source`` into the ``output`` path (or text file object); returns the run stats."""
+    stats = {}
+    close = isinstance(output, (str, os.PathLike))
+    out = open(output, "w", encoding="utf-8", newline="") if close else output
+    try:
+        for text in score_stream(source, output_format, chunk_rows, workers, path, stats):
+            out.write(text)
+    finally:
+        if close:
+            out.close()
+    logger.info(f"Scored {stats['rows']} rows in {stats['chunks']} chunks ({stats.get('rows_per_second', 0)} rows/s)")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a raw-schema PCOS CSV in streaming chunks across a process pool")
+    parser.add_argument("input", help="Input CSV in the dataset schema")
+    parser.add_argument("-o", "--output", required=True, help="Output file")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--pipeline", default=PIPELINE_PATH)
+    args = parser.parse_args()
+
+    from src.pcos_module import bulk
+
+    run_stats = bulk.score_csv(args.input, args.output, args.format, args.chunk_rows, args.workers, args.pipeline)
+    print(json.dumps(run_stats))
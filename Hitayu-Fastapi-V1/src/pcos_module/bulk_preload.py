@@ -0,0 +1,16 @@
+"""
+Preloaded by the bulk scoring pool's fork server.
+
+Loads the default pipeline once and freezes the heap, so every worker forked
+from the server shares the forest's pages instead of copying them on
+reference-count writes. A missing artifact is left to the workers to report.
+"""
+import gc
+
+from src.pcos_module.pipeline import get_pipeline
+
+try:
+    get_pipeline()
+except Exception:
+    pass
+gc.freeze()
@@ -0,0 +1,223 @@
+import argparse
+import io
+import json
+import time
+
+import numpy as np
+
+from src.pcos_module.encoding import CATEGORIES, FEATURE_COLUMNS, EncodingError, synthetic_columns
+from src.pcos_module.pipeline import PIPELINE_PATH, get_pipeline
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+NPY = "application/x-npy"
+COLUMNAR_FORMATS = (ARROW_STREAM, ARROW_FILE, NPY)
+
+# Accepted range of each numeric feature; rows outside it are rejected, not clipped
+NUMERIC_RANGES = {
+    "Age": (10, 100),
+    "Weight_kg": (25, 300),
+    "Height_cm": (100, 230),
+    "Blood_Sugar_mg_dl": (20, 600),
+}
+
+_CATEGORICAL = np.array([column in CATEGORIES for column in FEATURE_COLUMNS])
+_LOWER = np.array([0 if column in CATEGORIES else NUMERIC_RANGES[column][0] for column in FEATURE_COLUMNS],
+                  dtype=np.float32)
+_UPPER = np.array([len(CATEGORIES[column]) - 1 if column in CATEGORIES else NUMERIC_RANGES[column][1]
+                   for column in FEATURE_COLUMNS], dtype=np.float32)
+
+
+def declared_schema() -> dict:
+    """The feature schema binary batch requests are validated against."""
+    features = []
+    for column, low, high in zip(FEATURE_COLUMNS, _LOWER.tolist(), _UPPER.tolist()):
+        if column in CATEGORIES:
+            features.append({"name": column, "type": "category", "codes": list(CATEGORIES[column])})
+        else:
+            features.append({"name": column, "type": "float32", "min": low, "max": high})
+    return {
+        "features": features,
+        ARROW_STREAM: "One column per feature. Categories as strings, dictionary arrays or integer codes.",
+        ARROW_FILE: "Same as the stream format, in the Arrow file layout.",
+        NPY: f"float32 matrix [rows, {len(FEATURE_COLUMNS)}] in feature order, categories as codes.",
+    }
+
+
+def validate_features(features) -> np.ndarray:
+    """Reject NaNs, out-of-range values and non-integral category codes in one vectorized pass."""
+    bad = np.isnan(features) | (features < _LOWER) | (features > _UPPER)
+    codes = features[:, _CATEGORICAL]
+    bad[:, _CATEGORICAL] |= codes != np.floor(codes)
+    if bad.any():
+        bad_rows = np.flatnonzero(bad.any(axis=1))
+        counts = bad.sum(axis=0)
+        per_column = {FEATURE_COLUMNS[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+        raise EncodingError(
+            f"{len(bad_rows)} row(s) missing or out of range (first at row {int(bad_rows[0])}): {per_column}")
+    return features
+
+
+def _arrow_column(encoder, column, array) -> np.ndarray:
+    """One Arrow column as float32 values (numeric) or codes (categorical), without per-row Python objects."""
+    import pyarrow as pa
+
+    if column not in CATEGORIES or pa.types.is_integer(array.type):
+        if not (pa.types.is_integer(array.type) or pa.types.is_floating(array.type)):
+            raise EncodingError(f"Column {column} must be numeric, got {array.type}")
+        # Nulls come out as NaN and are rejected by validate_features
+        return array.to_numpy(zero_copy_only=False).astype(np.float32, copy=False)
+
+    if pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+        array = array.dictionary_encode()
+    if not pa.types.is_dictionary(array.type):
+        raise EncodingError(f"Column {column} must be strings or category codes, got {array.type}")
+
+    # Only the distinct values are looked up; rows just index into their codes
+    codes = encoder.encode_column(column, array.dictionary.to_numpy(zero_copy_only=False))
+    indices = array.indices
+    values = codes[indices.fill_null(0).to_numpy()]
+    if indices.null_count:
+        try:
+            null_code = encoder.encode_column(column, [""])[0]
+        except EncodingError:
+            raise EncodingError(f"Column {column} must not contain nulls") from None
+        values[indices.is_null().to_numpy(zero_copy_only=False)] = null_code
+    return values
+
+
+def decode_arrow(body, content_type, encoder) -> np.ndarray:
+    import pyarrow as pa
+
+    try:
+        if content_type == ARROW_FILE:
+            table = pa.ipc.open_file(pa.BufferReader(body)).read_all()
+        else:
+            table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as e:
+        raise EncodingError(f"Invalid Arrow payload: {str(e)}") from e
+
+    missing = [column for column in FEATURE_COLUMNS if column not in table.column_names]
+    if missing:
+        raise EncodingError(f"Missing column(s): {missing}")
+
+    features = np.empty((table.num_rows, len(FEATURE_COLUMNS)), dtype=np.float32)
+    for i, column in enumerate(FEATURE_COLUMNS):
+        features[:, i] = _arrow_column(encoder, column, table.column(column).combine_chunks())
+    return features
+
+
+def decode_npy(body) -> np.ndarray:
+    try:
+        features = np.load(io.BytesIO(body), allow_pickle=False)
+    except ValueError as e:
+        raise EncodingError(f"Invalid .npy payload: {str(e)}") from e
+    if features.ndim != 2 or features.shape[1] != len(FEATURE_COLUMNS) or features.dtype.kind not in "fiu":
+        raise EncodingError(
+            f"Expected a numeric [rows, {len(FEATURE_COLUMNS)}] matrix, got {features.dtype} {features.shape}")
+    return features.astype(np.float32, copy=False)
+
+
+def encode_arrow(content_type, classes, confidences, probabilities, model_version) -> bytes:
+    import pyarrow as pa
+
+    columns = {
+        "risk": pa.DictionaryArray.from_arrays(probabilities.argmax(axis=1).astype(np.int8), pa.array(list(classes))),
+        "confidence": pa.array(confidences.astype(np.float32, copy=False)),
+    }
+    for i, label in enumerate(classes):
+        columns[f"prob_{label}"] = pa.array(probabilities[:, i].astype(np.float32))
+    table = pa.table(columns).replace_schema_metadata({"model_version": model_version})
+
+    sink = pa.BufferOutputStream()
+    writer = pa.ipc.new_file if content_type == ARROW_FILE else pa.ipc.new_stream
+    with writer(sink, table.schema) as out:
+        out.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_npy(probabilities) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, probabilities.astype(np.float32, copy=False), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def score_columnar(body, content_type, pipeline) -> bytes:
+    """
+    Score a binary batch and encode the result in the request's format.
+
+    Arrow responses carry ``risk``, ``confidence`` and one ``prob_<class>``
+    column per class; ``.npy`` responses are the float32 probability matrix in
+    ``pipeline.classes`` order.
+    """
+    if content_type == NPY:
+        features = decode_npy(body)
+    else:
+        features = decode_arrow(body, content_type, pipeline.encoder)
+    if not len(features):
+        raise EncodingError("Batch must not be empty")
+
+    _, confidences, probabilities = pipeline.predict_features(validate_features(features))
+    if content_type == NPY:
+        return encode_npy(probabilities)
+    return encode_arrow(content_type, pipeline.classes, confidences, probabilities, pipeline.version)
+
+
+def _best_rows_per_second(run, n_rows, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return {"seconds": round(best, 3), "rows_per_second": int(n_rows / best)}
+
+
+def benchmark_formats(n_rows=100_000, repeats=3, path=PIPELINE_PATH) -> dict:
+    """
+    Rows/s through the batch endpoint logic (decode, validate, score, encode) for JSON, Arrow and .npy.
+
+    The JSON path is the ``/predict/batch`` handler plus response serialization.
+    """
+    import pyarrow as pa
+
+    from src.api.PCOS_controller import PCOSBatchInput, predict_pcos_batch
+
+    pipeline = get_pipeline(path)
+    columns = synthetic_columns(n_rows)
+
+    as_lists = {column: values.tolist() for column, values in columns.items()}
+    json_body = json.dumps({"records": [dict(zip(as_lists, row)) for row in zip(*as_lists.values())]})
+
+    table = pa.table({
+        column: pa.array(values).dictionary_encode() if column in CATEGORIES else pa.array(values)
+        for column, values in columns.items()
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as out:
+        out.write_table(table)
+    arrow_body = sink.getvalue().to_pybytes()
+
+    npy_buffer = io.BytesIO()
+    np.save(npy_buffer, pipeline.encoder.transform(columns))
+    npy_body = npy_buffer.getvalue()
+
+    def _json():
+        data = PCOSBatchInput.parse_obj(json.loads(json_body))
+        json.dumps(predict_pcos_batch(data))
+
+    report = {"rows": n_rows}
+    report["json"] = _best_rows_per_second(_json, n_rows, repeats)
+    report["arrow"] = _best_rows_per_second(lambda: score_columnar(arrow_body, ARROW_STREAM, pipeline), n_rows, repeats)
+    report["npy"] = _best_rows_per_second(lambda: score_columnar(npy_body, NPY, pipeline), n_rows, repeats)
+    for name, size in (("json", len(json_body)), ("arrow", len(arrow_body)), ("npy", len(npy_body))):
+        report[name]["request_bytes"] = size
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JSON against Arrow/.npy PCOS batch scoring")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--pipeline", default=PIPELINE_PATH)
+    args = parser.parse_args()
+    print(json.dumps(benchmark_formats(args.rows, args.repeats, args.pipeline), indent=2))
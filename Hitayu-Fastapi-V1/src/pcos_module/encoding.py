@@ -0,0 +1,167 @@
+import argparse
+import time
+
+import numpy as np
+
+# Raw dataset columns in model feature order (datasets/pcos_dataset_2000_rows (1).csv)
+FEATURE_COLUMNS = (
+    "Age", "Weight_kg", "Height_cm", "Irregular_Periods", "Acne", "Hair_Growth", "Hair_Loss",
+    "Weight_Gain", "Stress_Level", "Physical_Activity", "Family_History_PCOS", "Blood_Sugar_mg_dl"
+)
+TARGET_COLUMN = "PCOS_Risk"
+
+YES_NO = ("No", "Yes")
+
+# Categorical columns and their categories in code order (code = position), as in the
+# training notebook: yes/no flags are 0/1, the rest are OrdinalEncoder categories.
+CATEGORIES = {
+    "Irregular_Periods": YES_NO,
+    "Acne": ("unknown", "Mild", "Severe"),
+    "Hair_Growth": YES_NO,
+    "Hair_Loss": YES_NO,
+    "Weight_Gain": YES_NO,
+    "Stress_Level": ("Low", "Medium", "High"),
+    "Physical_Activity": ("Low", "Moderate", "High"),
+    "Family_History_PCOS": YES_NO,
+}
+
+# Extra spellings accepted per column (matched case-insensitively). pandas reads the
+# dataset's "None" acne level as NaN, which reaches the encoder as "nan".
+ALIASES = {
+    "Acne": {"none": "unknown", "nan": "unknown", "": "unknown"},
+}
+
+NUMERIC_COLUMNS = tuple(column for column in FEATURE_COLUMNS if column not in CATEGORIES)
+
+
+class EncodingError(ValueError):
+    """Raised when a batch contains unknown categories or non-numeric values."""
+
+
+class _ColumnTable:
+    """
+    Sorted lookup table for one categorical column.
+
+    Codes are found with ``np.searchsorted`` over the sorted category strings,
+    so a whole column is encoded in one vectorized pass without a Python dict.
+    Values that miss the exact table are retried case-insensitively (with aliases).
+    """
+
+    def __init__(self, categories, aliases=None):
+        self.categories = tuple(categories)
+        self._keys, self._codes = self._build({category: code for code, category in enumerate(categories)})
+
+        folded = {category.lower(): code for code, category in enumerate(categories)}
+        for alias, category in (aliases or {}).items():
+            folded[alias.lower()] = self.categories.index(category)
+        self._folded_keys, self._folded_codes = self._build(folded)
+
+    @staticmethod
+    def _build(mapping):
+        keys = np.array(sorted(mapping))
+        return keys, np.array([mapping[key] for key in keys], dtype=np.float32)
+
+    @staticmethod
+    def _lookup(keys, codes, values):
+        positions = np.searchsorted(keys, values).clip(0, len(keys) - 1)
+        found = keys[positions] == values
+        return codes[positions], found
+
+    def encode(self, values, column):
+        values = np.asarray(values).astype(str)
+        encoded, found = self._lookup(self._keys, self._codes, values)
+        if found.all():
+            return encoded
+
+        misses = ~found
+        folded = np.char.lower(np.char.strip(values[misses]))
+        retried, found_folded = self._lookup(self._folded_keys, self._folded_codes, folded)
+        if not found_folded.all():
+            unknown = sorted(set(values[misses][~found_folded].tolist()))[:5]
+            raise EncodingError(f"Unknown {column} value(s) {unknown}; expected one of {list(self.categories)}")
+        encoded[misses] = retried
+        return encoded
+
+
+class VectorizedEncoder:
+    """
+    Encoder from the dataset's raw schema to the model's float32 feature matrix.
+
+    Input is a column mapping (``{"Age": [...], "Acne": [...], ...}``) of lists,
+    arrays or pandas Series; every column of the batch is encoded at once.
+    The categories are fixed by the schema, so there is nothing to fit.
+    """
+
+    def __init__(self, categories=CATEGORIES, aliases=ALIASES, feature_columns=FEATURE_COLUMNS):
+        self.feature_columns = tuple(feature_columns)
+        self._tables = {
+            column: _ColumnTable(values, aliases.get(column))
+            for column, values in categories.items()
+        }
+        self._numeric = [i for i, column in enumerate(self.feature_columns) if column not in self._tables]
+
+    def encode_column(self, column, values) -> np.ndarray:
+        """Category codes of one categorical column."""
+        return self._tables[column].encode(values, column)
+
+    def transform(self, columns) -> np.ndarray:
+        missing = [column for column in self.feature_columns if column not in columns]
+        if missing:
+            raise EncodingError(f"Missing column(s): {missing}")
+
+        n_rows = len(columns[self.feature_columns[0]])
+        matrix = np.empty((n_rows, len(self.feature_columns)), dtype=np.float32)
+        for i, column in enumerate(self.feature_columns):
+            values = columns[column]
+            if len(values) != n_rows:
+                raise EncodingError(f"Column {column} has {len(values)} rows, expected {n_rows}")
+            if column in self._tables:
+                matrix[:, i] = self._tables[column].encode(values, column)
+            else:
+                try:
+                    matrix[:, i] = np.asarray(values, dtype=np.float32)
+                except (TypeError, ValueError) as e:
+                    raise EncodingError(f"Column {column} must be numeric: {str(e)}") from e
+
+        if np.isnan(matrix[:, self._numeric]).any():
+            raise EncodingError("Numeric columns must not contain missing values")
+        return matrix
+
+
+def synthetic_columns(n_rows, seed=0):
+    """Random batch in the raw dataset schema (numeric ranges follow the dataset)."""
+    rng = np.random.default_rng(seed)
+    columns = {
+        "Age": rng.integers(18, 46, n_rows),
+        "Weight_kg": rng.integers(40, 111, n_rows),
+        "Height_cm": rng.integers(145, 181, n_rows),
+        "Blood_Sugar_mg_dl": rng.integers(70, 181, n_rows),
+    }
+    for column, categories in CATEGORIES.items():
+        choices = np.array(categories if column != "Acne" else ("None", "Mild", "Severe"))
+        columns[column] = choices[rng.integers(0, len(choices), n_rows)]
+    return columns
+
+
+def benchmark_encoder(n_rows=1_000_000, repeats=3, seed=0):
+    """Encoding throughput on ``n_rows`` synthetic raw rows (best of ``repeats``)."""
+    encoder = VectorizedEncoder()
+    columns = synthetic_columns(n_rows, seed)
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        encoder.transform(columns)
+        best = min(best, time.perf_counter() - started)
+    return {
+        "rows": n_rows,
+        "seconds": round(best, 3),
+        "rows_per_second": int(n_rows / best)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized PCOS feature encoder")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    print(benchmark_encoder(args.rows, args.repeats))
@@ -0,0 +1,211 @@
+import argparse
+import json
+from math import factorial
+
+import numpy as np
+
+from src.core.logger import setup_logger
+
+logger = setup_logger()
+
+# Exact Shapley values enumerate every feature coalition, 2 ** n_features of them
+MAX_EXACT_FEATURES = 10
+# Largest (rows x coalitions x path entries) float32 block evaluated at once, 32 MiB
+CHUNK_ELEMENTS = 1 << 23
+# Path entries per segment: leaf paths are evaluated a segment at a time
+SEGMENT_ENTRIES = 1 << 12
+
+
+class ForestExplainer:
+    """
+    Per-feature contributions for a fitted scikit-learn random forest.
+
+    Contributions are the exact Shapley values of TreeSHAP's path-dependent
+    expectation: with a coalition of known features, a tree's value is the
+    sum over its leaves of the leaf value times, along the leaf's path, 1/0
+    for whether the row takes that branch (known feature) or the branch's
+    share of the training cover (unknown feature). Every root-to-leaf path of
+    every tree is flattened into arrays once, at construction, so a batch is
+    explained with a few array operations over all coalitions at once. With
+    the /predict model's five features that is 32 coalitions per row. Work is
+    blocked over rows, coalitions and segments of leaf paths, so memory per
+    call stays under ``CHUNK_ELEMENTS`` float32 values whatever the forest size.
+
+    ``base_value + contributions.sum(features) == predict_proba`` for every row.
+    """
+
+    def __init__(self, forest, max_features=MAX_EXACT_FEATURES):
+        n_features = forest.n_features_in_
+        if n_features > max_features:
+            raise ValueError(f"{n_features} features is too many for exact explanations (max {max_features})")
+        self.n_features = n_features
+        self.classes_ = forest.classes_
+
+        features, thresholds, goes_left, ratios, leaf_starts, leaf_values = [], [], [], [], [], []
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            values = tree.value[:, 0, :] / tree.value[:, 0, :].sum(axis=1, keepdims=True)
+            cover = tree.weighted_n_node_samples
+            # Each leaf's path starts with an always-taken entry on a virtual feature,
+            # so single-leaf trees still get a non-empty segment
+            stack = [(0, [(n_features, np.inf, True, 1.0)])]
+            while stack:
+                node, path = stack.pop()
+                left, right = tree.children_left[node], tree.children_right[node]
+                if left == right:
+                    leaf_starts.append(len(features))
+                    for feature, threshold, left_branch, ratio in path:
+                        features.append(feature)
+                        thresholds.append(threshold)
+                        goes_left.append(left_branch)
+                        ratios.append(ratio)
+                    leaf_values.append(values[node])
+                    continue
+                feature, threshold = tree.feature[node], tree.threshold[node]
+                stack.append((left, path + [(feature, threshold, True, cover[left] / cover[node])]))
+                stack.append((right, path + [(feature, threshold, False, cover[right] / cover[node])]))
+
+        self._feature = np.array(features, dtype=np.intp)
+        self._threshold = np.array(thresholds, dtype=np.float64)
+        self._goes_left = np.array(goes_left, dtype=bool)
+        self._ratio = np.array(ratios, dtype=np.float64)
+        self._leaf_starts = np.array(leaf_starts, dtype=np.intp)
+        self._leaf_values = np.array(leaf_values, dtype=np.float64) / len(forest.estimators_)
+        self._segments = self._build_segments(self._leaf_starts, len(self._feature))
+
+        # Coalition s contains feature i when bit i of s is set. The virtual feature has
+        # no bit: unknown, its factor is its ratio of 1.0, the same as taking it.
+        self._coalitions = np.arange(2 ** n_features)
+        self._feature_bits = np.where(self._feature < n_features, 1 << np.minimum(self._feature, n_features - 1), 0)
+        members = (self._coalitions[:, None] >> np.arange(n_features)) & 1
+        self._shapley_weights = self._build_shapley_weights(members)
+        logger.info(f"Flattened {len(forest.estimators_)} trees into {len(self._leaf_values)} leaf paths "
+                    f"({len(self._feature)} entries)")
+
+    @staticmethod
+    def _build_segments(leaf_starts, n_entries, max_entries=SEGMENT_ENTRIES):
+        """Split the leaf paths into runs of whole leaves of at most ``max_entries`` entries (or one leaf)."""
+        leaf_ends = np.append(leaf_starts[1:], n_entries)
+        segments, first = [], 0
+        while first < len(leaf_starts):
+            start = leaf_starts[first]
+            last = max(int(np.searchsorted(leaf_ends, start + max_entries, side="right")), first + 1)
+            segments.append((slice(start, leaf_ends[last - 1]), slice(first, last), leaf_starts[first:last] - start))
+            first = last
+        return segments
+
+    @staticmethod
+    def _build_shapley_weights(members):
+        """Matrix W with ``W @ v`` = Shapley value of each feature for coalition values ``v``."""
+        n_coalitions, n_features = members.shape
+        sizes = members.sum(axis=1)
+        weights = np.zeros((n_features, n_coalitions))
+        for i in range(n_features):
+            for coalition in np.flatnonzero(members[:, i] == 0):
+                size = sizes[coalition]
+                weight = factorial(size) * factorial(n_features - size - 1) / factorial(n_features)
+                weights[i, coalition | (1 << i)] += weight
+                weights[i, coalition] -= weight
+        return weights
+
+    def coalition_values(self, X) -> np.ndarray:
+        """Forest probabilities for every row and coalition, shape (rows, 2 ** n_features, classes)."""
+        # Trees compare float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        X = np.hstack([X, np.zeros((len(X), 1))])
+        n_coalitions = len(self._coalitions)
+
+        values = np.zeros((len(X), n_coalitions, self._leaf_values.shape[1]))
+        for entries, leaves, starts in self._segments:
+            n_entries = entries.stop - entries.start
+            coalitions_per_block = min(n_coalitions, max(1, CHUNK_ELEMENTS // n_entries))
+            rows_per_block = max(1, CHUNK_ELEMENTS // (coalitions_per_block * n_entries))
+            ratio = self._ratio[entries].astype(np.float32)
+            leaf_values = self._leaf_values[leaves]
+
+            taken = (X[:, self._feature[entries]] <= self._threshold[entries]) == self._goes_left[entries]
+            for first in range(0, n_coalitions, coalitions_per_block):
+                block = slice(first, first + coalitions_per_block)
+                known = (self._coalitions[block, None] & self._feature_bits[entries]) != 0
+                for start in range(0, len(X), rows_per_block):
+                    rows = slice(start, start + rows_per_block)
+                    factors = np.where(known, taken[rows, None, :], ratio)
+                    leaf_weights = np.multiply.reduceat(factors, starts, axis=2)
+                    values[rows, block] += leaf_weights @ leaf_values
+        return values
+
+    def explain(self, X):
+        """
+        Returns:
+            tuple: (base value per class, contributions (rows, features, classes), probabilities (rows, classes))
+        """
+        values = self.coalition_values(X)
+        contributions = np.einsum("fs,rsc->rfc", self._shapley_weights, values)
+        return values[0, 0], contributions, values[:, -1]
+
+
+class ExplainerUnavailable(RuntimeError):
+    """Raised when the served model has no forest that can be explained."""
+
+
+def forest_for(model):
+    """
+    The scikit-learn forest behind a served model.
+
+    An ONNX session is explained through the joblib artifact only when that
+    file is byte-for-byte the one the session was exported from.
+    """
+    if hasattr(model, "estimators_"):
+        return model
+    import hashlib
+    import io
+
+    import joblib
+
+    from src.pcos_module.onnx_backend import LEGACY_MODEL_PATH
+
+    source_sha256 = getattr(model, "metadata", {}).get("source_sha256")
+    if not source_sha256:
+        raise ExplainerUnavailable("The served ONNX model records no source forest; re-export it to explain")
+    try:
+        with open(LEGACY_MODEL_PATH, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        raise ExplainerUnavailable(f"{LEGACY_MODEL_PATH} is missing; the served ONNX model can't be explained") from None
+    if hashlib.sha256(data).hexdigest() != source_sha256:
+        raise ExplainerUnavailable(f"{LEGACY_MODEL_PATH} is not the forest the served ONNX model was exported from")
+    return joblib.load(io.BytesIO(data))
+
+
+def benchmark_explainer(model_path, n_rows=1000, repeats=200) -> dict:
+    """Explanation vs prediction latency, plus the largest additivity error against predict_proba."""
+    import joblib
+
+    from src.pcos_module.onnx_backend import legacy_samples
+    from src.pcos_module.training import measure_latency
+
+    forest = joblib.load(model_path)
+    explainer = ForestExplainer(forest)
+    X = legacy_samples(n_rows)
+
+    base, contributions, _ = explainer.explain(X)
+    additivity = np.abs(base + contributions.sum(axis=1) - forest.predict_proba(X)).max()
+    predict = measure_latency(forest.predict_proba, X[:1], X, repeats)
+    explain = measure_latency(explainer.explain, X[:1], X, repeats)
+    return {
+        "predict": predict,
+        "explain": explain,
+        "single_row_ratio": round(explain["single_row_p50_ms"] / predict["single_row_p50_ms"], 2),
+        "max_additivity_error": float(additivity),
+    }
+
+
+if __name__ == "__main__":
+    from src.pcos_module.onnx_backend import LEGACY_MODEL_PATH
+
+    parser = argparse.ArgumentParser(description="Benchmark per-prediction explanations of the PCOS forest")
+    parser.add_argument("--model", default=LEGACY_MODEL_PATH)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(benchmark_explainer(args.model, args.rows, args.repeats), indent=2))
@@ -0,0 +1,203 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from src.core.logger import setup_logger
+
+logger = setup_logger()
+
+LEGACY_MODEL_PATH = "src/models/pcos_model.pkl"
+LEGACY_ONNX_PATH = os.getenv("PCOS_ONNX_PATH", "src/models/pcos_model.onnx")
+# "joblib" (scikit-learn pickle) or "onnx" (onnxruntime session, no scikit-learn import)
+PCOS_BACKEND = os.getenv("PCOS_BACKEND", "joblib").lower()
+
+# Sampling ranges (low, high, integer) of the legacy model's five features, for parity and
+# latency checks: age, bmi, menstrual_irregularity, testosterone_level, antral_follicle_count
+LEGACY_FEATURE_RANGES = ((18, 45, False), (16, 40, False), (0, 1, True), (10, 120, False), (2, 40, True))
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OnnxClassifier:
+    """
+    ONNX Runtime session behind the scikit-learn classifier interface the API uses.
+
+    Exported with probabilities as a plain tensor (no ZipMap), so
+    ``predict_proba`` returns an array in ``classes_`` order.
+    """
+
+    def __init__(self, path=LEGACY_ONNX_PATH, threads=1):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.classes_ = np.array(json.loads(metadata.get("classes", "[]")))
+        self.metadata = metadata
+
+    def _run(self, X):
+        labels, probabilities = self.session.run(None, {self.input_name: np.asarray(X, dtype=np.float32)})
+        return labels, probabilities
+
+    def predict(self, X):
+        return self._run(X)[0]
+
+    def predict_proba(self, X):
+        return self._run(X)[1]
+
+
+def load_legacy_model(backend=PCOS_BACKEND):
+    """The /predict model through the configured backend."""
+    if backend == "onnx":
+        model = OnnxClassifier(LEGACY_ONNX_PATH)
+        logger.info(f"PCOS model served by ONNX Runtime from {LEGACY_ONNX_PATH}")
+        return model
+    if backend != "joblib":
+        raise ValueError(f"Unknown PCOS_BACKEND: {backend}")
+    import joblib
+    return joblib.load(LEGACY_MODEL_PATH)
+
+
+def export_onnx(model_path=LEGACY_MODEL_PATH, out_path=LEGACY_ONNX_PATH):
+    """
+    Convert a joblib scikit-learn classifier, or a PCOSPipeline's scaler and model, to ONNX.
+
+    A PCOSPipeline exports as scaler + classifier; its string encoder stays in NumPy.
+    """
+    import joblib
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    from sklearn.pipeline import make_pipeline
+
+    from src.pcos_module.pipeline import PCOSPipeline
+
+    loaded = joblib.load(model_path)
+    if isinstance(loaded, PCOSPipeline):
+        estimator, classifier = make_pipeline(loaded.scaler, loaded.model), loaded.model
+        classes, version = list(loaded.classes), loaded.version
+    else:
+        estimator = classifier = loaded
+        classes, version = classifier.classes_.tolist(), os.path.basename(model_path)
+
+    n_features = classifier.n_features_in_
+    onnx_model = convert_sklearn(
+        estimator,
+        initial_types=[("features", FloatTensorType([None, n_features]))],
+        options={id(classifier): {"zipmap": False}},
+        target_opset=17
+    )
+    metadata = {
+        "classes": json.dumps(classes),
+        "version": version,
+        "source": model_path,
+        # Lets /predict/explain check the joblib forest is the one this export came from
+        "source_sha256": file_sha256(model_path),
+    }
+    for key, value in metadata.items():
+        prop = onnx_model.metadata_props.add()
+        prop.key, prop.value = key, value
+
+    with open(out_path, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+    logger.info(f"Exported {model_path} ({n_features} features) to {out_path}")
+    return out_path
+
+
+def legacy_samples(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = [
+        rng.integers(low, high + 1, n_rows) if integer else rng.uniform(low, high, n_rows).round(1)
+        for low, high, integer in LEGACY_FEATURE_RANGES
+    ]
+    return np.column_stack(columns).astype(np.float32)
+
+
+def check_parity(model_path=LEGACY_MODEL_PATH, onnx_path=LEGACY_ONNX_PATH, n_rows=10000, atol=1e-5):
+    """Compare joblib and ONNX predictions of the legacy model on random inputs; returns a summary with ``ok``."""
+    import joblib
+
+    reference = joblib.load(model_path)
+    candidate = OnnxClassifier(onnx_path)
+    X = legacy_samples(n_rows)
+
+    expected, actual = reference.predict_proba(X), candidate.predict_proba(X)
+    max_diff = float(np.abs(expected - actual).max())
+    agreement = float((reference.predict(X) == candidate.predict(X)).mean())
+    return {
+        "rows": n_rows,
+        "max_probability_diff": max_diff,
+        "label_agreement": agreement,
+        "ok": max_diff <= atol and agreement == 1.0,
+    }
+
+
+_COLD_START = {
+    "joblib": "import joblib; model = joblib.load({path!r}); model.predict_proba(X)",
+    "onnx": "from src.pcos_module.onnx_backend import OnnxClassifier; "
+            "model = OnnxClassifier({path!r}); model.predict_proba(X)",
+}
+
+
+def cold_start_ms(backend, path):
+    """Import + load + first prediction in a fresh interpreter, in milliseconds."""
+    code = (
+        "import time; started = time.perf_counter()\n"
+        "import numpy as np; X = np.zeros((1, 5), dtype=np.float32)\n"
+        + _COLD_START[backend].format(path=path) + "\n"
+        "print((time.perf_counter() - started) * 1000)"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return round(float(completed.stdout.strip().splitlines()[-1]), 1)
+
+
+def compare_latency(model_path=LEGACY_MODEL_PATH, onnx_path=LEGACY_ONNX_PATH, repeats=500):
+    import joblib
+
+    models = {"joblib": joblib.load(model_path), "onnx": OnnxClassifier(onnx_path)}
+    row = legacy_samples(1)
+    report = {}
+    for backend, model in models.items():
+        model.predict_proba(row)
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            model.predict_proba(row)
+            timings.append((time.perf_counter() - started) * 1000)
+        report[backend] = {
+            "cold_start_ms": cold_start_ms(backend, model_path if backend == "joblib" else onnx_path),
+            "per_row_p50_ms": round(float(np.percentile(timings, 50)), 3),
+            "per_row_p95_ms": round(float(np.percentile(timings, 95)), 3),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the PCOS model to ONNX and check it against joblib")
+    parser.add_argument("command", choices=("export", "parity", "latency"))
+    parser.add_argument("--model", default=LEGACY_MODEL_PATH)
+    parser.add_argument("--onnx", default=LEGACY_ONNX_PATH)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_onnx(args.model, args.onnx)
+    elif args.command == "parity":
+        summary = check_parity(args.model, args.onnx)
+        print(json.dumps(summary))
+        sys.exit(0 if summary["ok"] else 1)
+    else:
+        print(json.dumps(compare_latency(args.model, args.onnx), indent=2))
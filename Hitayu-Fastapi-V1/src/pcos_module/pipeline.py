@@ -0,0 +1,136 @@
+import argparse
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import joblib
+import numpy as np
+
+from src.core.logger import setup_logger
+from src.pcos_module.encoding import FEATURE_COLUMNS, TARGET_COLUMN, VectorizedEncoder
+
+logger = setup_logger()
+
+DATASET_PATH = "src/datasets/pcos_dataset_2000_rows (1).csv"
+PIPELINE_PATH = os.getenv("PCOS_PIPELINE_PATH", "src/models/pcos_pipeline.joblib")
+
+# LabelEncoder order of PCOS_Risk in the training notebook
+RISK_CLASSES = ("High", "Low", "Medium")
+
+
+class PCOSPipeline:
+    """
+    The fitted PCOS risk pipeline: raw-schema encoder, scaler and classifier in one artifact.
+
+    ``predict_proba`` takes a column mapping in the dataset's native schema and
+    returns one probability row per input row, in ``classes`` order.
+    """
+
+    def __init__(self, encoder, scaler, model, classes=RISK_CLASSES, metadata=None):
+        self.encoder = encoder
+        self.scaler = scaler
+        self.model = model
+        self.classes = tuple(classes)
+        self.metadata = dict(metadata or {})
+
+    @property
+    def version(self) -> str:
+        return self.metadata.get("version", "unversioned")
+
+    def transform(self, columns) -> np.ndarray:
+        """Encode and scale a raw batch to the float32 model input."""
+        return self.scale(self.encoder.transform(columns))
+
+    def scale(self, features) -> np.ndarray:
+        """Scale an already-encoded feature matrix (``FEATURE_COLUMNS`` order) to the model input."""
+        return self.scaler.transform(features).astype(np.float32, copy=False)
+
+    def predict_proba(self, columns) -> np.ndarray:
+        return self.model.predict_proba(self.transform(columns))
+
+    def predict(self, columns):
+        """
+        Returns:
+            tuple: (risk labels, confidence of each label, full probability matrix)
+        """
+        return self.predict_features(self.encoder.transform(columns))
+
+    def predict_features(self, features):
+        """``predict`` for an already-encoded float32 feature matrix."""
+        probabilities = self.model.predict_proba(self.scale(features))
+        best = probabilities.argmax(axis=1)
+        labels = np.asarray(self.classes)[best]
+        return labels, probabilities[np.arange(len(best)), best], probabilities
+
+    def save(self, path=PIPELINE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved PCOS pipeline {self.version} to {path}")
+
+    @classmethod
+    def load(cls, path=PIPELINE_PATH) -> "PCOSPipeline":
+        pipeline = joblib.load(path)
+        if not isinstance(pipeline, cls):
+            raise TypeError(f"{path} does not contain a PCOSPipeline")
+        return pipeline
+
+
+def load_dataset(path=DATASET_PATH):
+    """Raw feature columns and integer risk labels (``RISK_CLASSES`` order) from the dataset CSV."""
+    import pandas as pd
+
+    frame = pd.read_csv(path)
+    columns = {column: frame[column].to_numpy() for column in FEATURE_COLUMNS}
+    y = np.searchsorted(np.array(RISK_CLASSES), frame[TARGET_COLUMN].to_numpy().astype(str))
+    return columns, y
+
+
+def fit_pipeline(columns, y, model=None, random_state=42) -> PCOSPipeline:
+    """Fit the scaler and classifier (defaults to the notebook's random forest) on a raw batch."""
+    from sklearn import __version__ as sklearn_version
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    encoder = VectorizedEncoder()
+    features = encoder.transform(columns)
+    scaler = StandardScaler().fit(features)
+    model = model or RandomForestClassifier(
+        n_estimators=200,
+        max_depth=10,
+        random_state=random_state,
+        class_weight="balanced"
+    )
+    model.fit(scaler.transform(features).astype(np.float32), y)
+
+    metadata = {
+        "version": datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S"),
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "model": type(model).__name__,
+        "sklearn_version": sklearn_version,
+        "feature_columns": list(FEATURE_COLUMNS),
+        "training_rows": int(len(y)),
+    }
+    return PCOSPipeline(encoder, scaler, model, RISK_CLASSES, metadata)
+
+
+@lru_cache(maxsize=None)
+def get_pipeline(path=PIPELINE_PATH) -> PCOSPipeline:
+    """Load the pipeline artifact once per process."""
+    pipeline = PCOSPipeline.load(path)
+    logger.info(f"Loaded PCOS pipeline {pipeline.version} from {path}")
+    return pipeline
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit the PCOS pipeline on the raw dataset and save the artifact")
+    parser.add_argument("--data", default=DATASET_PATH)
+    parser.add_argument("--out", default=PIPELINE_PATH)
+    args = parser.parse_args()
+
+    # Fit through the package module so the artifact pickles PCOSPipeline by its import path, not __main__
+    from src.pcos_module import pipeline as pcos_pipeline
+
+    columns, y = pcos_pipeline.load_dataset(args.data)
+    pcos_pipeline.fit_pipeline(columns, y).save(args.out)
@@ -0,0 +1,141 @@
+import os
+import threading
+from functools import lru_cache, partial
+
+import numpy as np
+
+from src.core.logger import setup_logger
+from src.pcos_module.explain import ForestExplainer, forest_for
+from src.pcos_module.onnx_backend import (
+    LEGACY_MODEL_PATH, LEGACY_ONNX_PATH, PCOS_BACKEND, file_sha256, load_legacy_model
+)
+
+logger = setup_logger()
+
+PREDICTION_CACHE_SIZE = int(os.getenv("PCOS_PREDICTION_CACHE_SIZE", "65536"))
+
+LEGACY_FEATURES = ("age", "bmi", "menstrual_irregularity", "testosterone_level", "antral_follicle_count")
+# Input precision of each /predict feature: values are rounded to it before caching *and* scoring
+LEGACY_FEATURE_DECIMALS = (1, 1, 0, 2, 0)
+
+
+def quantize(features) -> tuple:
+    """
+    The cache key and the model input for one /predict feature vector.
+
+    Scoring the rounded vector, not the raw one, is part of the /predict
+    contract: every input with the same key gets the same answer whether or
+    not it is a cache hit. Extra precision (BMI 27.46, testosterone 60.004)
+    is not seen by the model.
+    """
+    return tuple(
+        round(float(value), decimals) if decimals else float(round(value))
+        for value, decimals in zip(features, LEGACY_FEATURE_DECIMALS)
+    )
+
+
+def legacy_model_version(backend=PCOS_BACKEND) -> str:
+    """Short content hash of the served artifact, so a replaced file is a new version."""
+    path = LEGACY_ONNX_PATH if backend == "onnx" else LEGACY_MODEL_PATH
+    return f"{os.path.basename(path)}@{file_sha256(path)[:12]}"
+
+
+def _score(model, version, features):
+    probabilities = model.predict_proba(np.array([features]))[0]
+    best = int(probabilities.argmax())
+    return model.classes_[best].item(), float(probabilities[best])
+
+
+def _build_explainer(model):
+    return ForestExplainer(forest_for(model))
+
+
+class LegacyPredictor:
+    """
+    The /predict model behind a bounded LRU of results.
+
+    Results are keyed by (model version, quantized features); a hit returns
+    the stored label and confidence without running the model. ``reload``
+    swaps in the artifact currently on disk together with a fresh cache, so
+    results of the previous model are never served after a swap. The
+    forest's explainer is built on the first ``explain`` call for the model
+    being served, so startup and reloads don't pay for it.
+    """
+
+    def __init__(self, backend=PCOS_BACKEND, cache_size=PREDICTION_CACHE_SIZE):
+        self.backend = backend
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._retired = {"hits": 0, "misses": 0}
+        self._serving = None
+        self.reload()
+
+    @property
+    def model(self):
+        return self._serving[0]
+
+    @property
+    def version(self) -> str:
+        return self._serving[1]
+
+    def snapshot(self) -> tuple:
+        """The served ``(model, version)``, taken from one swap so a concurrent reload can't mix them."""
+        model, version = self._serving[:2]
+        return model, version
+
+    def reload(self) -> str:
+        """Load the artifact from disk and switch to it; returns the new version."""
+        model = load_legacy_model(self.backend)
+        version = legacy_model_version(self.backend)
+        cached = lru_cache(maxsize=self.cache_size)(partial(_score, model))
+        # Built once per served model, on first use; a failed build is retried on the next call
+        explainer = lru_cache(maxsize=1)(partial(_build_explainer, model))
+
+        with self._lock:
+            if self._serving is not None:
+                info = self._serving[2].cache_info()
+                self._retired["hits"] += info.hits
+                self._retired["misses"] += info.misses
+            # One tuple, swapped atomically: a request never pairs a version with another model's cache
+            self._serving = (model, version, cached, explainer)
+        logger.info(f"Serving PCOS model {version} ({self.backend})")
+        return version
+
+    def predict(self, features):
+        """
+        Returns:
+            tuple: (class label, confidence)
+        """
+        _, version, cached, _ = self._serving
+        return cached(version, quantize(features))
+
+    def explain(self, features):
+        """
+        Returns:
+            tuple: (class label, confidence, base value, {feature: contribution}) for the predicted class
+        """
+        explainer = self._serving[3]()
+        base, contributions, probabilities = explainer.explain([quantize(features)])
+        best = int(probabilities[0].argmax())
+        return (
+            explainer.classes_[best].item(),
+            float(probabilities[0, best]),
+            float(base[best]),
+            dict(zip(LEGACY_FEATURES, contributions[0, :, best].tolist()))
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            info = self._serving[2].cache_info()
+            hits, misses = self._retired["hits"] + info.hits, self._retired["misses"] + info.misses
+            return {
+                "model_version": self.version,
+                "backend": self.backend,
+                "size": info.currsize,
+                "max_size": info.maxsize,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+                "current_model_hits": info.hits,
+                "current_model_misses": info.misses,
+            }
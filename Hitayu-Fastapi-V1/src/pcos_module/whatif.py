@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from src.pcos_module.predictor import LEGACY_FEATURE_DECIMALS, LEGACY_FEATURES, quantize
+
+WHATIF_MAX_STEPS = int(os.getenv("PCOS_WHATIF_MAX_STEPS", "200"))
+WHATIF_MAX_ROWS = int(os.getenv("PCOS_WHATIF_MAX_ROWS", "20000"))
+
+
+class SweepError(ValueError):
+    """Raised for unknown features, bad ranges or a grid over the row limit."""
+
+
+def sweep_values(feature, start, stop, steps) -> np.ndarray:
+    """Evenly spaced values of one feature, rounded like /predict inputs and deduplicated."""
+    if feature not in LEGACY_FEATURES:
+        raise SweepError(f"Unknown feature {feature}; expected one of {list(LEGACY_FEATURES)}")
+    if not 2 <= steps <= WHATIF_MAX_STEPS:
+        raise SweepError(f"steps must be between 2 and {WHATIF_MAX_STEPS}")
+    decimals = LEGACY_FEATURE_DECIMALS[LEGACY_FEATURES.index(feature)]
+    return np.unique(np.linspace(start, stop, steps).round(decimals))
+
+
+def perturbation_grid(base, sweeps, grid=None):
+    """
+    Every scenario as one matrix: the base row, one block per swept feature, then the 2-D grid.
+
+    Args:
+        base: /predict feature vector in ``LEGACY_FEATURES`` order
+        sweeps: {feature: values} to vary one at a time
+        grid: optional (x feature, y feature), both in ``sweeps``, to vary together
+
+    Returns:
+        tuple: (matrix, {feature: row slice}, grid row slice or None)
+    """
+    base = np.array(quantize(base))
+    n_rows = 1 + sum(len(values) for values in sweeps.values())
+    if grid is not None:
+        missing = [feature for feature in grid if feature not in sweeps]
+        if len(grid) != 2 or grid[0] == grid[1] or missing:
+            raise SweepError("grid must name two different swept features")
+        n_rows += len(sweeps[grid[0]]) * len(sweeps[grid[1]])
+    if n_rows > WHATIF_MAX_ROWS:
+        raise SweepError(f"{n_rows} scenarios exceed the limit of {WHATIF_MAX_ROWS}")
+
+    matrix = np.tile(base, (n_rows, 1))
+    slices, row = {}, 1
+    for feature, values in sweeps.items():
+        matrix[row:row + len(values), LEGACY_FEATURES.index(feature)] = values
+        slices[feature] = slice(row, row + len(values))
+        row += len(values)
+
+    grid_slice = None
+    if grid is not None:
+        x_values, y_values = np.meshgrid(sweeps[grid[0]], sweeps[grid[1]], indexing="ij")
+        grid_slice = slice(row, row + x_values.size)
+        matrix[grid_slice, LEGACY_FEATURES.index(grid[0])] = x_values.ravel()
+        matrix[grid_slice, LEGACY_FEATURES.index(grid[1])] = y_values.ravel()
+    return matrix, slices, grid_slice
+
+
+def what_if(model, base, sweeps, grid=None, positive_class=1) -> dict:
+    """
+    PCOS probability across the perturbation grid, scored in one ``predict_proba`` call.
+
+    ``sweeps`` maps features to ``(start, stop, steps)``.
+    """
+    values = {feature: sweep_values(feature, *spec) for feature, spec in sweeps.items()}
+    matrix, slices, grid_slice = perturbation_grid(base, values, grid)
+
+    started = time.perf_counter()
+    probabilities = model.predict_proba(matrix)[:, np.flatnonzero(model.classes_ == positive_class)[0]]
+    scoring_ms = (time.perf_counter() - started) * 1000
+
+    result = {
+        "scenarios": len(matrix),
+        "scoring_ms": round(scoring_ms, 3),
+        "base_probability": round(float(probabilities[0]), 4),
+        "curves": {
+            feature: {
+                "values": values[feature].tolist(),
+                "probability": probabilities[slices[feature]].round(4).tolist()
+            }
+            for feature in values
+        },
+        "grid": None,
+    }
+    if grid_slice is not None:
+        x_feature, y_feature = grid
+        result["grid"] = {
+            "x": x_feature,
+            "y": y_feature,
+            "x_values": values[x_feature].tolist(),
+            "y_values": values[y_feature].tolist(),
+            # probability[i][j] is at x_values[i], y_values[j]
+            "probability": probabilities[grid_slice].reshape(len(values[x_feature]), -1).round(4).tolist()
+        }
+    return result
+
+
+if __name__ == "__main__":
+    import joblib
+
+    from src.pcos_module.onnx_backend import LEGACY_MODEL_PATH
+
+    parser = argparse.ArgumentParser(description="Time a full what-if sweep against a single PCOS prediction")
+    parser.add_argument("--model", default=LEGACY_MODEL_PATH)
+    parser.add_argument("--steps", type=int, default=50)
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    base = (28, 27.5, 1, 60, 14)
+    sweeps = {
+        "age": (18, 45, args.steps),
+        "bmi": (18, 40, args.steps),
+        "testosterone_level": (15, 120, args.steps),
+        "antral_follicle_count": (2, 40, args.steps),
+    }
+    model.predict_proba(np.array([base], dtype=np.float64))
+
+    started = time.perf_counter()
+    model.predict_proba(np.array([base], dtype=np.float64))
+    single_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    result = what_if(model, base, sweeps, grid=("bmi", "testosterone_level"))
+    sweep_ms = (time.perf_counter() - started) * 1000
+    print(json.dumps({
+        "scenarios": result["scenarios"],
+        "single_prediction_ms": round(single_ms, 3),
+        "sweep_ms": round(sweep_ms, 3),
+    }, indent=2))
@@ -0,0 +1,8 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Artifact paths such as src/models/pcos_model.pkl are relative to the service root, as when serving
+os.chdir(ROOT)
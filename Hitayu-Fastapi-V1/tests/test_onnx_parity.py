@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("skl2onnx")
+
+from src.pcos_module.onnx_backend import LEGACY_MODEL_PATH, OnnxClassifier, check_parity, export_onnx, file_sha256
+
+
+@pytest.fixture(scope="module")
+def onnx_path(tmp_path_factory):
+    return export_onnx(LEGACY_MODEL_PATH, str(tmp_path_factory.mktemp("onnx") / "pcos_model.onnx"))
+
+
+def test_onnx_export_matches_joblib(onnx_path):
+    # The legacy dataset columns aren't in the shipped CSV, so parity runs on the sampled feature ranges
+    summary = check_parity(LEGACY_MODEL_PATH, onnx_path, n_rows=10000)
+
+    assert summary["label_agreement"] == 1.0
+    assert summary["max_probability_diff"] <= 1e-5
+
+
+def test_onnx_export_records_its_source(onnx_path):
+    model = OnnxClassifier(onnx_path)
+
+    assert model.metadata["source_sha256"] == file_sha256(LEGACY_MODEL_PATH)
+    assert model.classes_.tolist() == [0, 1]
@@ -1,8 +1,18 @@
 import streamlit as st
+import os
 import time
-import cv2
+import hashlib
 from PIL import Image
-import numpy as np
+from services.camera import CaptureWorker, camera_source_factory
+from services.frame_ingest import FrameIngestPipeline
+from services.skin_model import submit_prediction
+
+# "client": the browser camera streams locally and uploads one compressed capture
+# "server": OpenCV reads a camera attached to the server host
+CAMERA_MODE = os.getenv("HITAYU_CAMERA_MODE", "client").lower()
+
+# Preview refresh rate; the capture worker itself reads at the device rate
+PREVIEW_FPS = float(os.getenv("HITAYU_PREVIEW_FPS", "10"))
 
 # Page configuration
 st.set_page_config(
@@ -44,6 +54,76 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_resource(show_spinner=False)
+def capture_worker():
+    """Process-wide capture worker that owns the camera ("synthetic" source for testing)."""
+    source = os.getenv("HITAYU_CAMERA_SOURCE", "0")
+    return CaptureWorker(source_factory=camera_source_factory(source)).start()
+
+
+@st.fragment(run_every=1.0 / PREVIEW_FPS)
+def live_preview():
+    """Re-renders only the preview image at a steady rate, without rerunning the script."""
+    worker = capture_worker()
+    latest = worker.latest()
+    if latest is not None:
+        st.image(latest[2], caption="Live Camera Feed", use_container_width=True)
+    elif worker.error:
+        st.error(f"Error: {worker.error}")
+    else:
+        st.info("Starting camera...")
+
+
+def store_capture(image):
+    """Keep the captured RGB image in this session and start SDN5 inference on it."""
+    st.session_state.clicked_image = image
+    st.session_state.camera_running = False
+    
+    # The frame stays in memory; the diagnosis page picks it up from the session
+    st.session_state.captured_frame = image
+    st.session_state.inference = submit_prediction(image, image_key=hashlib.sha256(image.tobytes()).hexdigest())
+    st.session_state.inference_started = time.monotonic()
+    
+    # Set processing state to show the inference status
+    st.session_state.processing = True
+
+
+@st.fragment(run_every=0.5)
+def inference_status():
+    """Poll the running inference and re-render only the status line until it finishes."""
+    future = st.session_state.get('inference')
+    if future is not None and not future.done():
+        waited = time.monotonic() - st.session_state.inference_started
+        state = "Analyzing your image with SDN5" if future.running() else "Waiting for the model"
+        st.info(f"⏳ {state}... ({waited:.1f}s)")
+        return
+    
+    st.session_state.capture_prediction = future.result() if future is not None else None
+    st.session_state.inference = None
+    st.session_state.processing = False
+    st.session_state.image_captured = True
+    st.rerun(scope="app")
+
+
+def client_capture():
+    """Capture from the browser camera: the preview never leaves the client, only the final JPEG is uploaded."""
+    col1, col2, col3 = st.columns([0.5, 2, 0.5])
+    with col2:
+        snapshot = st.camera_input("Position your skin area in the frame and take a photo")
+        if snapshot is not None:
+            if 'frame_ingest' not in st.session_state:
+                st.session_state.frame_ingest = FrameIngestPipeline()
+            try:
+                image = st.session_state.frame_ingest.capture(snapshot.getvalue())
+            except Exception as e:
+                st.error(f"Failed to read captured image: {str(e)}")
+                return None
+            store_capture(image)
+            st.success("Image captured! Processing...")
+            st.rerun()
+    return None
+
+
 if 'image_captured' not in st.session_state:
     st.session_state.image_captured = False
 if 'clicked_image' not in st.session_state:
@@ -53,18 +133,11 @@ if 'processing' not in st.session_state:
 if 'camera_running' not in st.session_state:
     st.session_state.camera_running = True
 
-# Show processing spinner if currently processing
+# Show inference status while the captured image is being analyzed
 if st.session_state.processing:
-    # Center the spinner
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        with st.spinner("Processing your image..."):
-            time.sleep(2)  # Simulate processing time
-    
-    # Mark processing as complete
-    st.session_state.processing = False
-    st.session_state.image_captured = True
-    st.rerun()
+        inference_status()
 
 # Only show camera interface if no image has been captured yet
 elif not st.session_state.image_captured:
@@ -85,6 +158,10 @@ elif not st.session_state.image_captured:
             # Create placeholder for the camera feed (centered)
             FRAME_WINDOW = st.image([],use_container_width=True)
             
+            # Live preview refreshes inside its own fragment, without full reruns
+            if st.session_state.camera_running:
+                live_preview()
+            
             # Create centered button layout
             btn_col1, btn_col2, btn_col3 = st.columns([1, 2, 1])
             with btn_col2:
@@ -100,42 +177,14 @@ elif not st.session_state.image_captured:
         
         # Camera operations
         if st.session_state.camera_running:
-            # Initialize the webcam
-            cap = cv2.VideoCapture(0)
-            if not cap.isOpened():
-                st.error("Error: Could not open webcam")
-                return None
-            
-            # Set camera properties for better quality
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            cap.set(cv2.CAP_PROP_FPS, 30)
+            worker = capture_worker()
             
             # Handle capture button press
             if capture_btn:
-                ret, frame = cap.read()
-                if ret:
-                    # Convert BGR to RGB
-                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    
-                    # Convert to numpy array
-                    img_array = np.array(rgb_frame)
-                    
-                    # Store in session state
-                    st.session_state.clicked_image = Image.fromarray(img_array)
-                    
-                    # Stop the camera
-                    st.session_state.camera_running = False
-                    
-                    # Release webcam
-                    cap.release()
-                    
-                    # Save the image
-                    img = Image.fromarray(img_array)
-                    img.save("captured_image.jpg")
-                    
-                    # Set processing state to trigger spinner
-                    st.session_state.processing = True
+                # Freshest frame from the running worker; no device open/close
+                img_array = worker.capture()
+                if img_array is not None:
+                    store_capture(Image.fromarray(img_array))
                     
                     # Show success message briefly
                     with col2:
@@ -146,28 +195,9 @@ elif not st.session_state.image_captured:
                     
                     return img_array
                 else:
-                    st.error("Failed to capture image")
-                    cap.release()
+                    st.error(f"Failed to capture image: {worker.error or 'no frame available'}")
                     return None
-            
-            # Show live preview - single frame capture to avoid infinite loop
-            ret, frame = cap.read()
-            if ret:
-                # Convert BGR to RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                # Update live preview in centered layout
-                with col2:
-                    FRAME_WINDOW.image(frame_rgb, caption="Live Camera Feed",use_container_width=True)
-            else:
-                st.error("Cannot read from camera")
-            
-            # Release webcam after each frame
-            cap.release()
-            
-            # Auto-refresh for live preview (small delay to prevent overwhelming)
-            time.sleep(0.1)
-            st.rerun()
-            
+
         else:
             # Display captured image if available (when camera is stopped but not processed yet)
             if st.session_state.clicked_image:
@@ -182,17 +212,28 @@ elif not st.session_state.image_captured:
                         if st.button("🔄 Restart Camera", use_container_width=True):
                             st.session_state.camera_running = True
                             st.session_state.clicked_image = None
+                            st.session_state.captured_frame = None
+                            capture_worker().start()
                             st.rerun()
         
         return None
     
-    capture_image()
+    if CAMERA_MODE == "server":
+        capture_image()
+    else:
+        client_capture()
 else:
     
     col1, col2 , col3 = st.columns([0.5, 2, 0.5])
 
     with col2:
-        st.success('✅ Your Picture has been saved sucessfully')    
+        st.success('✅ Your Picture has been saved sucessfully')
+        prediction = st.session_state.get('capture_prediction')
+        if prediction and 'error' not in prediction:
+            st.info(f"🔬 Preliminary result: {prediction['predicted_class']} "
+                    f"({prediction['confidence_score']:.1%} confidence)")
+        elif prediction:
+            st.warning(f"⚠️ Analysis failed: {prediction['error']}")
 
 
 # Project Information Section
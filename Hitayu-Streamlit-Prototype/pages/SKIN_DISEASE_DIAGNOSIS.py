@@ -1,21 +1,19 @@
 from logger import Logger
 import streamlit as st 
 import warnings
-import numpy as np
 from datetime import datetime
 import time
-from PIL import Image, ImageOps
-import tensorflow as tf
-from pymongo import MongoClient
+from PIL import Image
 import os
+import hashlib
 from dotenv import load_dotenv, find_dotenv
-from keras.models import load_model
-from tensorflow.keras.layers import DepthwiseConv2D
-from huggingface_hub import hf_hub_download
-import requests
-from pandas import DataFrame
-import base64
-from io import BytesIO
+from services.analysis import AnalysisProgress
+from services.persistence import get_persistence_service
+from services.image_store import queue_image_blob
+from services.medicine_client import get_medicine_client
+from services.knowledge import load_knowledge_index
+from services.report_renderer import REPORT_CSS, render_report
+from services import skin_model
 
 #Ignore the warnings 
 warnings.filterwarnings("ignore")
@@ -26,50 +24,6 @@ logger = Logger(name= "skin_disease")
 logger.set_console_output(enabled= True)
 
 
-user_name = os.getenv('HUGGINGFACE_USERNAME')
-repository = os.getenv('HUGGINGFACE_REPO')
-
-class PatchedDepthwiseConv2D(DepthwiseConv2D):
-    def __init__(self, *args, groups=None, **kwargs):
-        super().__init__(*args, **kwargs)
-
-@st.cache_resource(show_spinner="Loading AI model...")
-def huggingface_load():
-    """Load model from Huggingface. Cached using st.cache_resource to load only once."""
-    try:
-        # Download the model file from Hugging Face Hub
-        model_path = hf_hub_download(
-            repo_id=f"{user_name}/{repository}",
-            filename="SDN5.h5",  
-            repo_type="model"
-        )
-        logger.info(f"Model downloaded successfully from Hugging Face Hub: {model_path}")
-        
-        # Load the model with custom objects
-        with tf.keras.utils.custom_object_scope({'DepthwiseConv2D': PatchedDepthwiseConv2D}):
-            model = load_model(model_path)
-            
-        logger.info("Model loaded successfully")
-        return model
-        
-    except Exception as e:
-        error_msg = str(e) if hasattr(e, '__str__') else "Unknown error occurred"
-        logger.error(f"Error loading model from Hugging Face Hub: {error_msg}")
-        
-        # Fallback to local model if Hugging Face fails
-        logger.info("Attempting to load model from local storage")
-        try:
-            with tf.keras.utils.custom_object_scope({'DepthwiseConv2D': PatchedDepthwiseConv2D}):
-                model = load_model("F:/Hitayu-PS1/SDN5/SDN5.h5")
-            logger.info("Local model loaded successfully")
-            return model
-        except Exception as inner_e:
-            error_msg = str(inner_e) if hasattr(inner_e, '__str__') else "Unknown error occurred"
-            logger.error(f"Error loading local model: {error_msg}")
-            # Wrap the error in a meaningful exception
-            raise RuntimeError(f"Failed to load model: {error_msg}") from inner_e
-
-
 logger.info("Started skin disease diagnosis")
 
 # Initialize session state variables if they don't exist
@@ -558,483 +512,60 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Shared stylesheet for the report cards, emitted once per run instead of per card
+st.markdown(REPORT_CSS, unsafe_allow_html=True)
+
 def generate_detailed_report(disease_info, predicted_class):
     """
-    Generate a detailed medical report using Streamlit native components
+    Generate a detailed medical report from the memoized report renderer.
+    Styles come from the shared REPORT_CSS injected with the page theme.
     """
     logger.info(f"Generating styled report for: {predicted_class}")
     
-    # Get disease information
-    disease_name = disease_info.get('disease_name', predicted_class)
-    description = disease_info.get('description', 'No description available.')
-    entry_to_body = disease_info.get('entry_to_body', 'Development mechanism not specified.')
-    spread = disease_info.get('spread', 'Transmission information not available.')
-    
-    def render_medical_report(disease_name: str, description: str, entry_to_body: str, spread: str) -> None:
-        """Renders a styled medical report with disease information using glassmorphism design."""
+    report = render_report(disease_info.get('disease_name', predicted_class))
+    st.markdown(report['medical_report_html'], unsafe_allow_html=True)
 
-        # Add custom CSS for styling with dark theme and blur effects
-        st.markdown("""
-        <style>
-            .medical-report-container {
-                background: linear-gradient(145deg, rgba(255, 255, 255, 0.1), rgba(255, 255, 255, 0.05));
-                backdrop-filter: blur(25px);
-                border: 2px solid rgba(255, 255, 255, 0.2);
-                border-radius: 25px;
-                padding: 2.5rem;
-                margin: 2rem 0;
-                box-shadow: 
-                    0 20px 40px rgba(0, 0, 0, 0.4),
-                    inset 0 1px 0 rgba(255, 255, 255, 0.2),
-                    0 0 0 1px rgba(255, 255, 255, 0.05);
-                position: relative;
-                overflow: hidden;
-            }
-            
-            .medical-report-container::before {
-                content: '';
-                position: absolute;
-                top: 0;
-                left: 0;
-                right: 0;
-                height: 3px;
-                background: linear-gradient(90deg, #667eea, #764ba2, #f093fb);
-                animation: reportHeaderShimmer 3s ease-in-out infinite;
-            }
-            
-            @keyframes reportHeaderShimmer {
-                0%, 100% { opacity: 0.8; }
-                50% { opacity: 1; }
-            }
-            
-            .medical-report-header {
-                text-align: center;
-                margin-bottom: 2.5rem;
-                padding: 2rem;
-                background: linear-gradient(135deg, rgba(255, 255, 255, 0.15), rgba(255, 255, 255, 0.08));
-                backdrop-filter: blur(20px);
-                border: 1px solid rgba(255, 255, 255, 0.2);
-                border-radius: 20px;
-                box-shadow: 
-                    0 10px 25px rgba(0, 0, 0, 0.3),
-                    inset 0 1px 0 rgba(255, 255, 255, 0.2);
-                position: relative;
-                overflow: hidden;
-            }
-            
-            .medical-report-header::after {
-                content: '';
-                position: absolute;
-                top: 0;
-                left: -100%;
-                width: 100%;
-                height: 100%;
-                background: linear-gradient(90deg, 
-                    transparent, 
-                    rgba(255, 255, 255, 0.1), 
-                    transparent);
-                transition: left 0.8s ease;
-                pointer-events: none;
-            }
-            
-            .medical-report-header:hover::after {
-                left: 100%;
-            }
-            
-            .medical-report-title {
-                font-size: 2.2rem;
-                color: #ffffff;
-                margin-bottom: 0.8rem;
-                font-weight: 800;
-                text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.3);
-                letter-spacing: 1px;
-            }
-            
-            .medical-report-subtitle {
-                font-size: 1.1rem;
-                color: rgba(255, 255, 255, 0.8);
-                margin: 0;
-                font-weight: 500;
-            }
-            
-            .medical-report-section {
-                background: linear-gradient(135deg, rgba(255, 255, 255, 0.12), rgba(255, 255, 255, 0.06));
-                backdrop-filter: blur(20px);
-                border: 1px solid rgba(255, 255, 255, 0.15);
-                padding: 2rem;
-                border-radius: 18px;
-                margin-bottom: 1.8rem;
-                box-shadow: 
-                    0 12px 28px rgba(0, 0, 0, 0.3),
-                    inset 0 1px 0 rgba(255, 255, 255, 0.2);
-                border-left: 4px solid;
-                transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-                position: relative;
-                overflow: hidden;
-            }
-            
-            .medical-report-section::before {
-                content: '';
-                position: absolute;
-                top: 0;
-                left: -100%;
-                width: 100%;
-                height: 100%;
-                background: linear-gradient(90deg, 
-                    transparent, 
-                    rgba(255, 255, 255, 0.08), 
-                    transparent);
-                transition: left 0.6s ease;
-                pointer-events: none;
-            }
-            
-            .medical-report-section:hover {
-                transform: translateY(-5px) scale(1.01);
-                box-shadow: 
-                    0 18px 35px rgba(0, 0, 0, 0.4),
-                    inset 0 1px 0 rgba(255, 255, 255, 0.25),
-                    0 0 0 1px rgba(255, 255, 255, 0.1);
-                border-color: rgba(255, 255, 255, 0.25);
-            }
-            
-            .medical-report-section:hover::before {
-                left: 100%;
-            }
-            
-            .medical-section-title {
-                font-size: 1.4rem;
-                font-weight: 700;
-                margin-bottom: 1.2rem;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                gap: 0.8rem;
-                text-shadow: 1px 1px 3px rgba(0, 0, 0, 0.3);
-                position: relative;
-                padding-bottom: 0.5rem;
-            }
-            
-            .medical-section-title::after {
-                content: '';
-                position: absolute;
-                bottom: 0;
-                left: 50%;
-                transform: translateX(-50%);
-                width: 50px;
-                height: 2px;
-                border-radius: 1px;
-                opacity: 0.8;
-            }
-            
-            .medical-section-content {
-                font-size: 1.05rem;
-                line-height: 1.7;
-                color: rgba(255, 255, 255, 0.9);
-                text-shadow: 0 1px 2px rgba(0, 0, 0, 0.2);
-                font-weight: 400;
-            }
-            
-            .medical-section-icon {
-                font-size: 1.6rem;
-                filter: drop-shadow(0 2px 4px rgba(0, 0, 0, 0.3));
-                animation: iconPulse 2.5s ease-in-out infinite;
-            }
-            
-            @keyframes iconPulse {
-                0%, 100% { transform: scale(1); }
-                50% { transform: scale(1.05); }
-            }
-            
-            /* Color variations for different sections */
-            .section-description {
-                border-left-color: #4ecdc4;
-            }
-            .section-description .medical-section-title {
-                color: #4ecdc4;
-            }
-            .section-description .medical-section-title::after {
-                background: linear-gradient(90deg, #4ecdc4, transparent);
-            }
-            
-            .section-development {
-                border-left-color: #ff6b6b;
-            }
-            .section-development .medical-section-title {
-                color: #ff6b6b;
-            }
-            .section-development .medical-section-title::after {
-                background: linear-gradient(90deg, #ff6b6b, transparent);
-            }
-            
-            .section-transmission {
-                border-left-color: #ffa500;
-            }
-            .section-transmission .medical-section-title {
-                color: #ffa500;
-            }
-            .section-transmission .medical-section-title::after {
-                background: linear-gradient(90deg, #ffa500, transparent);
-            }
-            
-            /* Responsive design */
-            @media (max-width: 768px) {
-                .medical-report-container {
-                    padding: 1.5rem;
-                    margin: 1rem 0;
-                }
-                
-                .medical-report-header {
-                    padding: 1.5rem;
-                }
-                
-                .medical-report-title {
-                    font-size: 1.8rem;
-                }
-                
-                .medical-report-section {
-                    padding: 1.5rem;
-                }
-                
-                .medical-section-title {
-                    font-size: 1.2rem;
-                }
-            }
-        </style>
-        """, unsafe_allow_html=True)
-
-        # Define section configurations with enhanced styling
-        sections = [
-            {
-                "title": "Medical Description",
-                "content": description,
-                "icon": "🏥",
-                "class": "section-description"
-            },
-            {
-                "title": "How It Develops", 
-                "content": entry_to_body,
-                "icon": "🔬",
-                "class": "section-development"
-            },
-            {
-                "title": "Transmission Information",
-                "content": spread,
-                "icon": "🦠",
-                "class": "section-transmission"
-            }
-        ]
-
-        # Render report container and header
-        st.markdown(f"""
-        <div class="medical-report-container">
-            <div class="medical-report-header">
-                <div class="medical-report-title">
-                    📋 Medical Report: {disease_name}
-                </div>
-                <div class="medical-report-subtitle">
-                    Comprehensive Medical Information & Analysis
-                </div>
-            </div>
-        """, unsafe_allow_html=True)       
-
-        # Render sections dynamically with enhanced styling and CENTERED content
-        for section in sections:
-            st.markdown(f"""
-            <div class="medical-report-section {section['class']}">
-                <div class="medical-section-title">
-                    <span class="medical-section-icon">{section['icon']}</span>
-                    {section['title']}
-                </div>
-                <div class="medical-section-content">
-            """, unsafe_allow_html=True)
-            
-            # Enhanced content rendering with CENTERED typography and styling
-            st.markdown(f"""
-            <div style="
-                font-size: 1.2rem;
-                line-height: 1.8;
-                color: rgba(255, 255, 255, 0.95);
-                text-shadow: 0 1px 2px rgba(0, 0, 0, 0.2);
-                font-weight: 400;
-                text-align: center;
-                padding: 0.5rem 0;
-                background: linear-gradient(135deg, rgba(255, 255, 255, 0.05), rgba(255, 255, 255, 0.02));
-                border-radius: 12px;
-                padding: 1.5rem;
-                margin: 0.5rem 0;
-                border-left: 3px solid rgba(255, 255, 255, 0.2);
-                backdrop-filter: blur(10px);
-                box-shadow: 
-                    0 4px 15px rgba(0, 0, 0, 0.2),
-                    inset 0 1px 0 rgba(255, 255, 255, 0.1);
-                transition: all 0.3s ease;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                min-height: 80px;
-            ">
-                {section['content']}
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("</div></div>", unsafe_allow_html=True)
-
-        # Close report container
-        st.markdown('</div>', unsafe_allow_html=True)
-
-        # Close report container
-        st.markdown('</div>', unsafe_allow_html=True)
-
-    # Execute the function
-    render_medical_report(disease_name, description, entry_to_body, spread)
-    
-    
-    # Prevention section
-    if disease_info.get('prevention'):
-        prevention_items = '<br>'.join([f"• {prevention}" for prevention in disease_info['prevention']])
-        st.markdown(f"""
-        <div style="
-            background: linear-gradient(135deg, rgba(76, 175, 80, 0.15), rgba(76, 175, 80, 0.08));
-            backdrop-filter: blur(20px);
-            border: 2px solid rgba(76, 175, 80, 0.3);
-            border-radius: 25px;
-            padding: 2.5rem;
-            margin: 1.5rem 0;
-            box-shadow: 0 15px 35px rgba(0, 0, 0, 0.3);
-        ">
-            <h3 style="
-                font-size: 1.5rem;
-                font-weight: 600;
-                margin-bottom: 1.5rem;
-                text-shadow: 1px 1px 3px rgba(0, 0, 0, 0.3);
-                text-align: center;
-                color: #4CAF50;
-                margin-top: 0;
-            ">How To Stay Safe</h3>
-            <div style="
-                color: rgba(255, 255, 255, 0.9);
-                font-size: 1.1rem;
-                line-height: 1.8;
-            ">{prevention_items}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Complications section
-    if disease_info.get('complications'):
-        complications_items = '<br>'.join([f"• {complication}" for complication in disease_info['complications']])
-        st.markdown(f"""
-        <div style="
-            background: linear-gradient(135deg, rgba(244, 67, 54, 0.15), rgba(244, 67, 54, 0.08));
-            backdrop-filter: blur(20px);
-            border: 2px solid rgba(244, 67, 54, 0.3);
-            border-radius: 25px;
-            padding: 2.5rem;
-            margin: 1.5rem 0;
-            box-shadow: 0 15px 35px rgba(0, 0, 0, 0.3);
-        ">
-            <h3 style="
-                font-size: 1.5rem;
-                font-weight: 600;
-                margin-bottom: 1.5rem;
-                text-shadow: 1px 1px 3px rgba(0, 0, 0, 0.3);
-                text-align: center;
-                color: #f44336;
-                margin-top: 0;
-            ">Things That Might Happen</h3>
-            <div style="
-                color: rgba(255, 255, 255, 0.9);
-                font-size: 1.1rem;
-                line-height: 1.8;
-            ">{complications_items}</div>
-        </div>
-        """, unsafe_allow_html=True)
-
-@st.cache_data(show_spinner=False)
-def preprocess_image(_image):
-    """
-    Preprocess image for model prediction. Cached to avoid reprocessing the same image.
-    
-    Args:
-        image: PIL Image object
-    Returns:
-        tuple: preprocessed image array and original resized image
-    """
-    # Resize and preprocess image
-    processed_image = ImageOps.fit(image=_image, size=(224,224), method=Image.Resampling.LANCZOS)
-    image_array = np.asarray(processed_image)
-    normalized_array = (image_array.astype(np.float32) / 127.5) - 1
-    
-    return np.array([normalized_array]), processed_image
-
-@st.cache_data(show_spinner="Analyzing image...")
-def load_labels():
-    """Load and cache the labels file"""
-    return open("E:/Hitayu-PS1/SDN5/sdn_labels.txt").readlines()
-
-def predict_skin_disease(image) -> dict:
+def predict_skin_disease(image, progress=None, image_key=None) -> dict:
     """
     Predict skin disease type from uploaded image
     
     Args:
         image: PIL Image object
+        progress: Optional AnalysisProgress receiving the preprocess/infer stages
+        image_key: Content hash of the image (computed from the pixels when omitted)
     Returns:
         dict: Prediction results with class and confidence
     """
-    try:
-        logger.info("Processing skin disease prediction")
-        
-        logger.info("Processing and analyzing image")
-        
-        # Get preprocessed image (cached)
-        skin_data, processed_image = preprocess_image(image)
-        
-        # Load model (cached)
-        skin_model = huggingface_load()
-        
-        # Load labels (cached)
-        skin_labels = load_labels()
-
-        logger.info('Making prediction initiated')
-        prediction = skin_model.predict(skin_data)
-        index = np.argmax(prediction)
-        class_name = skin_labels[index]
-        confidence_score = prediction[0][index]
+    if image_key is None:
+        image_key = hashlib.sha256(image.tobytes()).hexdigest()
+    return skin_model.predict(image, progress=progress, image_key=image_key)
 
-        logger.info('Making prediction finished')
-
-        return {
-            "predicted_class": class_name[2:],
-            "confidence_score": confidence_score,
-            "all_predictions": prediction
-        }
-        
-    except Exception as e:
-        logger.error(f"Error in skin disease prediction: {str(e)}")
-        return {
-            "predicted_class": "Unknown",
-            "confidence_score": 0.0,
-            "error": str(e)
-        }
-
-def update_record_with_feedback(record_id: str, feedback_data: dict) -> dict:
+def update_record_with_feedback(record_id: str, feedback_data: dict, wait: bool = None) -> dict:
     """
-    Update an existing patient record with feedback data
+    Update an existing patient record with feedback data.
+    By default the update is queued on the background persistence writer, where
+    feedback from many sessions is coalesced into bulk writes; if the record does
+    not exist the feedback is stored as a standalone record instead.
+    With ``wait=True`` a single ``update_one`` is issued and its matched count
+    tells whether the record exists.
     
     Args:
         record_id: The ID of the record to update
         feedback_data: The feedback data to add to the record
+        wait: Write synchronously (defaults to FEEDBACK_WRITE_MODE == "sync")
     Returns:
         dict: Update operation result
     """
+    if wait is None:
+        wait = os.getenv("FEEDBACK_WRITE_MODE", "async").lower() == "sync"
+
     try:
         logger.info(f"Attempting to update record {record_id} with feedback")
         
-        # Get environment variables
-        mongo_connection_string = os.getenv("MONGO_CONNECTION_STRING")
-        mongo_database_name = os.getenv("MONGO_DATABASE_NAME", "skin_disease_db")
         collection_name = os.getenv("COLLECTION_NAME", "patient_diagnoses")
         
-        if not mongo_connection_string:
+        persistence = get_persistence_service()
+        if persistence is None:
             logger.warn("MongoDB connection not configured")
             return {
                 "success": False,
@@ -1047,14 +578,6 @@ def update_record_with_feedback(record_id: str, feedback_data: dict) -> dict:
                 "success": False,
                 "message": "Invalid record ID or feedback data"
             }
-            
-        # Connect to MongoDB
-        client = MongoClient(mongo_connection_string, serverSelectionTimeoutMS=10000)
-        database = client[mongo_database_name]
-        collection = database[collection_name]
-        
-        # Test connection
-        client.server_info()
         
         # Convert string ID to ObjectId if necessary
         from bson.objectid import ObjectId
@@ -1070,51 +593,44 @@ def update_record_with_feedback(record_id: str, feedback_data: dict) -> dict:
                 "message": f"Invalid record ID format: {record_id}"
             }
         
-        # Check if record exists first
-        existing_record = collection.find_one({"_id": record_id_obj})
-        if not existing_record:
-            logger.error(f"Record not found: {record_id}")
-            return {
-                "success": False,
-                "message": f"Record not found: {record_id}"
-            }
-        
         # Update the record with feedback
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         update_data = {
             "$set": {
                 "user_feedback": feedback_data,
-                "feedback_timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                "last_updated": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                "feedback_timestamp": timestamp,
+                "last_updated": timestamp
             }
         }
         
-        result = collection.update_one(
-            {"_id": record_id_obj},
-            update_data
-        )
-        
-        if result.modified_count > 0:
+        if wait:
+            matched_count = persistence.update_now(collection_name, {"_id": record_id_obj}, update_data)
+            if matched_count == 0:
+                logger.error(f"Record not found: {record_id}")
+                return {
+                    "success": False,
+                    "message": f"Record not found: {record_id}"
+                }
             logger.info(f"Successfully updated record {record_id} with feedback")
             return {
                 "success": True,
                 "message": "Feedback successfully added to record",
-                "record_id": str(record_id),
-                "modified_count": result.modified_count
-            }
-        elif result.matched_count > 0:
-            logger.info(f"Record {record_id} matched but no changes made (possibly duplicate feedback)")
-            return {
-                "success": True,
-                "message": "Record found but no changes needed",
-                "record_id": str(record_id),
-                "modified_count": 0
-            }
-        else:
-            logger.error(f"Record {record_id} not found or not modified")
-            return {
-                "success": False,
-                "message": "Record not found or could not be modified"
+                "record_id": str(record_id)
             }
+        
+        feedback_record = {
+            'record_type': 'user_feedback',
+            'feedback_data': feedback_data,
+            'original_record_id': str(record_id),
+            'created_at': timestamp
+        }
+        persistence.update(collection_name, {"_id": record_id_obj}, update_data, on_missing=feedback_record)
+        logger.info(f"Queued feedback update for record {record_id}")
+        return {
+            "success": True,
+            "message": "Feedback queued for storage",
+            "record_id": str(record_id)
+        }
             
     except Exception as e:
         error_msg = str(e)
@@ -1123,16 +639,13 @@ def update_record_with_feedback(record_id: str, feedback_data: dict) -> dict:
             "success": False,
             "message": f"Database error: {error_msg}"
         }
-    finally:
-        try:
-            client.close() # Close the Database Connection
-        except:
-            pass
     
 
 def save_patient_data(data: dict) -> dict:
     """
-    Save patient data and diagnosis results to database
+    Save patient data and diagnosis results to database.
+    The record ID is generated client side and the insert is written by the
+    background persistence writer, so this never blocks rendering.
     
     Args:
         data: Patient information and diagnosis data
@@ -1146,18 +659,17 @@ def save_patient_data(data: dict) -> dict:
             
         # Validate required fields for initial save
         required_fields = ['patient_data', 'diagnosis_results']
-        missing_fields = [field for field in required_fields if field not in data]
-        if missing_fields:
-            raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
+        if data.get('record_type') != 'user_feedback':
+            missing_fields = [field for field in required_fields if field not in data]
+            if missing_fields:
+                raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
             
         logger.info("Attempting to save patient data to database")
         
-        # Get environment variables
-        mongo_connection_string = os.getenv("MONGO_CONNECTION_STRING")
-        mongo_database_name = os.getenv("MONGO_DATABASE_NAME", "skin_disease_db")
         collection_name = os.getenv("COLLECTION_NAME", "patient_diagnoses")
         
-        if not mongo_connection_string:
+        persistence = get_persistence_service()
+        if persistence is None:
             logger.warn("MongoDB connection not configured - no connection string found")
             return {
                 "success": False,
@@ -1165,35 +677,15 @@ def save_patient_data(data: dict) -> dict:
                 "record_id": f"local_save_{int(time.time())}"
             }
         
-        try:
-            # Connect to MongoDB
-            logger.info("Connecting to MongoDB database")
-            client = MongoClient(mongo_connection_string)
-            database = client[mongo_database_name]
-            collection = database[collection_name]
-            
-            # Test connection
-            client.server_info()
-            
-            # Insert data
-            logger.info("Inserting patient data into database")
-            result = collection.insert_one(data)
-            logger.info(f"Data saved to database successfully with ID: {result.inserted_id}")
-            
-            return {
+        record_id = persistence.insert(collection_name, data)
+        logger.info(f"Queued patient data for storage with ID: {record_id}")
+        
+        return {
             "success": True,
-            "message": "Data successfully saved to database",
-            "record_id": str(result.inserted_id)
+            "message": "Data queued for storage",
+            "record_id": record_id
         }
 
-        except Exception as e:
-            logger.error(f"Error inserting patient data into database: {str(e)}")
-            return {
-                "success": False,
-                "message": f"Database error: {str(e)}",
-                "record_id": f"error_save_{int(time.time())}"
-            }
-
     except Exception as e:
             logger.error(f"Error saving to database: {str(e)}")
             return {
@@ -1202,45 +694,30 @@ def save_patient_data(data: dict) -> dict:
                 "record_id": f"error_save_{int(time.time())}"
             }
 
+@st.cache_resource(show_spinner=False)
+def medicine_client():
+    """Shared medicine-info client, prewarmed once per process for every known class."""
+    client = get_medicine_client()
+    client.prewarm(SKIN_DISEASE_CLASSES)
+    return client
+
 def api_tool_call(class_name: str) -> dict:
     """
-    API tool call for specific disease name
+    API tool call for specific disease name.
+    Served from the medicine client's TTL cache, so repeated reports cost no network call.
 
     Args:
         class_name: Predicted class name for skin disease
     Returns:
-        dict: Save operation file
+        dict: Medication payload, or a dict with an "error" key
     """
     logger.info(f"Database tool call initiated for class: {class_name}")
-    try:
-
-        username = os.getenv('NAME')
-        password = os.getenv("PASSWORD")
-        api_key = os.getenv("API_KEY")
-
-
-        logger.info(f' {username} | {password} | {class_name}')
-        data = {
-            "username": username.strip(),
-            "password": password.strip(),
-            "disease_name": class_name.strip()
-        }
-
-        result = requests.post(url=api_key, json=data)
-
-        result = result.json()
-
-        logger.info(f"Database tool call result: {result} | Disease: {class_name}")
-        if result.get('status') == "success":
-            logger.info(f"Database tool call successful for class: {class_name}")
-            return result
-        else:
-            logger.error(f"Database tool call failed for class: {class_name}")
-            return {"error": "Database tool call failed"}
-
-    except Exception as e:
-        logger.error(f"Error occurred during database tool call for class: {class_name}, Error: {str(e)}")
-        return {"error": str(e)}
+    result = medicine_client().get(class_name)
+    if result.get('error'):
+        logger.error(f"Database tool call failed for class: {class_name}")
+    else:
+        logger.info(f"Database tool call successful for class: {class_name}")
+    return result
 
 
 def display_combined_info(class_name: str) -> bool:
@@ -1279,207 +756,23 @@ def display_combined_info(class_name: str) -> bool:
             st.error(f"❌ Error: {error_msg}")
             return False
             
-        # Create modern container for the information
-        st.markdown("""
-        <style>
-        .info-container {
-            background: linear-gradient(135deg, rgba(25,25,50,0.9), rgba(45,45,80,0.9));
-            border-radius: 20px;
-            padding: 2rem;
-            margin: 1rem 0;
-            border: 1px solid rgba(255,255,255,0.1);
-            box-shadow: 0 8px 32px rgba(0,0,0,0.2);
-        }
-        .section-title {
-            color: #7B68EE;
-            font-size: 1.5rem;
-            font-weight: 600;
-            margin-bottom: 1rem;
-            text-shadow: 0 2px 4px rgba(0,0,0,0.2);
-        }
-        .info-card {
-            background: rgba(255,255,255,0.05);
-            border-radius: 15px;
-            padding: 1.5rem;
-            margin: 1rem 0;
-            border: 1px solid rgba(255,255,255,0.05);
-        }
-        .highlight-text {
-            color: #50C878;
-            font-weight: 500;
-        }
-        </style>
-        """, unsafe_allow_html=True)
+        # Rendered HTML is memoized on (class, knowledge version, medication payload)
+        report = render_report(class_name, api_data)
         
+        if report['medications_html']:
+            st.markdown(report['medications_html'], unsafe_allow_html=True)
         
-        if isinstance(api_data, dict):  # Changed to list since API data is a list
-            st.markdown('<div class="info-container" style="text-align: center;">', unsafe_allow_html=True)
-            st.markdown('<div class="section-title" style="text-align: center;">💊 Prescribed Medications</div>', unsafe_allow_html=True)
-
-            for medication in api_data['data']:
-                # Create a card for each medication
-                # Get timing string
-                timing = []
-                if medication['morning'] == 'Yes':
-                    timing.append("Morning")
-                if medication['afternoon'] == 'Yes':
-                    timing.append("Afternoon")
-                if medication['evening'] == 'Yes':
-                    timing.append("Evening")
-                timing_str = ", ".join(timing) if timing else "As prescribed"
-                st.markdown(f"""
-                <div style="
-                    background: linear-gradient(135deg, rgba(72, 49, 212, 0.05), rgba(72, 49, 212, 0.1));
-                    border-radius: 15px;
-                    padding: 1.5rem;
-                    margin: 1rem auto; /* Changed to auto margins for horizontal centering */
-                    border: 1px solid rgba(72, 49, 212, 0.2);
-                    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-                    max-width: 800px; /* Added max-width for better readability */
-                    text-align: center; /* Center the text content */
-                ">
-                    <div style="display: flex; flex-direction: column; align-items: center; gap: 1rem;">
-                        <div>
-                            <div style="font-size: 1.5rem; color: #7B68EE; margin-bottom: 1rem; font-weight: 600;">
-                                {medication['drug_name']}
-                            </div>
-                            <div style="color: rgba(255,255,255,0.9); font-size: 1.1rem; margin-bottom: 0.5rem;">
-                                📋 Dosage: {medication['dosage'] if medication['dosage'] else 'As directed'}
-                            </div>
-                            <div style="color: rgba(255,255,255,0.9); font-size: 1.1rem; margin-bottom: 0.5rem;">
-                                ⏱️ Duration: {medication['duration']}
-                            </div>
-                            <div style="color: rgba(255,255,255,0.9); font-size: 1.1rem; margin-bottom: 0.5rem;">
-                                💊 Route: {medication['route']}
-                            </div>
-                            <div style="color: rgba(255,255,255,0.9); font-size: 1.1rem;">
-                                🕒 Timing: {timing_str}
-                            </div>
-                        </div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+        # Display Prevention Information Section
+        if report['care_guide_html']:
+            st.markdown(report['care_guide_html'], unsafe_allow_html=True)
         
-            # Display Prevention Information Section
-        if prevention_data and prevention_data.get('detailed_info'):
-            try:
-                # Create the prevention section container
-                st.markdown('<div class="info-container">', unsafe_allow_html=True)
-                st.markdown('<div class="section-title">🛡️ Prevention & Care Guide</div>', unsafe_allow_html=True)
-                
-                # Get disease info safely
-                disease_info = prevention_data.get('detailed_info', {})
-            except Exception as e:
-                error_msg = str(e) if hasattr(e, '__str__') else "Unknown error occurred"
-                logger.error(f"Error displaying prevention section: {error_msg}")
-                st.error("An error occurred while displaying the prevention information.")
-                return
-            
-            # Description, Entry to Body, and Spread
-            disease_info = prevention_data.get('detailed_info', {})
-            if disease_info:
-                st.markdown("""
-                <div class="info-card">
-                    <div style="color: #7B68EE; font-size: 1.3rem; margin-bottom: 1.5rem; font-weight: 600;">
-                        About the Condition
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Using st.write for reliable text display
-                col1, col2 = st.columns([1, 2])
-                with col1:
-                    st.write("**Description:**")
-                with col2:
-                    st.write(disease_info.get('description', 'Information not available'))
-                
-                st.markdown("<br>", unsafe_allow_html=True)
-                
-                col1, col2 = st.columns([1, 2])
-                with col1:
-                    st.write("**How it Affects the Body:**")
-                with col2:
-                    st.write(disease_info.get('entry_to_body', 'Information not available'))
-                
-                st.markdown("<br>", unsafe_allow_html=True)
-                
-                col1, col2 = st.columns([1, 2])
-                with col1:
-                    st.write("**Transmission:**")
-                with col2:
-                    st.write(disease_info.get('spread', 'Information not available'))
-                
-            # Prevention Steps
-            if prevention_data.get('secondary_prevention'):
-                st.markdown("""
-                <div class="info-card" style="
-                    background: linear-gradient(135deg, rgba(80, 200, 120, 0.05), rgba(80, 200, 120, 0.1));
-                    border: 1px solid rgba(80, 200, 120, 0.2);
-                ">
-                    <div style="
-                        color: #50C878;
-                        font-size: 1.3rem;
-                        margin-bottom: 1.5rem;
-                        font-weight: 600;
-                        display: flex;
-                        align-items: center;
-                        gap: 0.5rem;
-                    ">
-                        🛡️ Prevention & Management Steps
-                    </div>
-                """, unsafe_allow_html=True)
-
-                for i, step in enumerate(prevention_data['secondary_prevention'], 1):
-                    st.markdown(f"""
-                    <div style="
-                        display: flex;
-                        align-items: center;
-                        margin: 1rem 0;
-                        padding: 1rem;
-                        background: rgba(255, 255, 255, 0.05);
-                        border-radius: 12px;
-                        border: 1px solid rgba(80, 200, 120, 0.2);
-                        transition: all 0.3s ease;
-                    ">
-                        <div style="
-                            background: rgba(80, 200, 120, 0.1);
-                            color: #50C878;
-                            width: 28px;
-                            height: 28px;
-                            border-radius: 50%;
-                            display: flex;
-                            align-items: center;
-                            justify-content: center;
-                            margin-right: 1rem;
-                            font-weight: 600;
-                            border: 1px solid rgba(80, 200, 120, 0.3);
-                        ">{i}</div>
-                        <span style="
-                            color: rgba(255,255,255,0.95);
-                            font-size: 1.1rem;
-                            line-height: 1.5;
-                        ">{step}</span>
-                    </div>
-                    """, unsafe_allow_html=True)
-                st.markdown('</div>', unsafe_allow_html=True)
-            
-            # Complications
-            if prevention_data.get('complications'):
-                st.markdown("""
-                <div class="info-card">
-                    <div style="color: #7B68EE; font-size: 1.1rem; margin-bottom: 0.5rem;">⚠️ Potential Complications</div>
-                """, unsafe_allow_html=True)
-                
-                for complication in prevention_data['complications']:
-                    st.markdown(f"""
-                    <div style="display: flex; align-items: start; margin: 0.5rem 0; color: rgba(255,255,255,0.9);">
-                        <span style="color: #FF6B6B; margin-right: 0.5rem;">•</span>
-                        <span>{complication}</span>
-                    </div>
-                    """, unsafe_allow_html=True)
-                st.markdown('</div>', unsafe_allow_html=True)
-            
-            st.markdown('</div>', unsafe_allow_html=True)
+        st.download_button(
+            label="⬇️ Download Report (HTML)",
+            data=report['document'],
+            file_name=f"hitayu_report_{class_name.strip().replace(' ', '_')}.html",
+            mime="text/html",
+            width='stretch'
+        )
             
     except Exception as e:
         error_msg = str(e)
@@ -1501,189 +794,12 @@ def info_generation(class_name: str) -> dict:
     try:
         logger.info(f"Generating comprehensive information for disease: {class_name}")
         
-        # Comprehensive skin disease information from JSON structure
-        skin_diseases_info = {
-            "skin_diseases": [
-                {
-                    "disease": "Acne",
-                    "description": "Acne is a common skin condition where pores become clogged with excess oil and dead skin cells, producing blackheads, whiteheads and pimples.",
-                    "entry_to_body": "Acne begins when hair follicles (pores) get plugged by substances like sebum (oil), bacteria or dead skin cells, creating inflamed bumps (pimples).",
-                    "spread": "Acne is not contagious; you cannot catch it from another person.",
-                    "secondary_prevention": [
-                        "Wash your face gently with warm water and a mild cleanser once or twice a day.",
-                        "Use oil-free or non-comedogenic moisturizers and cosmetics to avoid clogging pores.",
-                        "Avoid squeezing or picking at pimples; let the skin heal naturally to prevent scars."
-                    ],
-                    "complications": [
-                        "Scarring: Deep or persistent acne can leave pitted scars or thick (keloid) scars.",
-                        "Skin discoloration: After acne clears, the affected skin may remain darker or lighter than normal."
-                    ]
-                },
-                {
-                    "disease": "Eczema",
-                    "description": "Atopic dermatitis (eczema) is a chronic, non-contagious skin condition that causes dry, itchy and inflamed skin. It often begins in childhood and can flare periodically.",
-                    "entry_to_body": "Eczema arises when a person's skin barrier is weakened (often due to genetic factors), allowing irritants or allergens to penetrate and trigger inflammation.",
-                    "spread": "Eczema is not contagious; it cannot be passed from person to person.",
-                    "secondary_prevention": [
-                        "Moisturize the skin at least twice daily (e.g. with creams or petroleum jelly) to keep it hydrated.",
-                        "Take warm (not hot), brief showers or baths using gentle, fragrance-free cleansers, then pat the skin dry and apply moisturizer.",
-                        "Identify and avoid triggers (such as rough fabrics, harsh soaps, extreme temperatures or known allergens)."
-                    ],
-                    "complications": [
-                        "Asthma, hay fever and food allergies often develop in people with eczema.",
-                        "Chronic scratching can thicken and discolor the skin (lichenification, hyperpigmentation or hypopigmentation).",
-                        "Broken skin from scratching increases the risk of bacterial or viral skin infections.",
-                        "Eczema can disrupt sleep and lead to anxiety or depression due to chronic itching."
-                    ]
-                },
-                {
-                    "disease": "Psoriasis",
-                    "description": "Psoriasis is an autoimmune skin disease in which the immune system causes red, scaly patches (plaques) on the skin. The most common type (plaque psoriasis) produces raised, itchy areas covered with silvery scales.",
-                    "entry_to_body": "In psoriasis, the immune system becomes overactive and attacks the skin, causing inflammation and rapid overgrowth of skin cells.",
-                    "spread": "Psoriasis is not contagious; you cannot get it from another person.",
-                    "secondary_prevention": [
-                        "Maintain a healthy lifestyle (balanced diet, regular exercise, no smoking) and follow any treatment plan prescribed by a doctor to control symptoms.",
-                        "Avoid known triggers of flares, such as severe stress, skin injury (cuts, sunburn), infections (strep throat) and certain medications.",
-                        "Keep skin moisturized and protect it from trauma or sunburn to reduce flare-ups."
-                    ],
-                    "complications": [
-                        "Psoriatic arthritis: many people with psoriasis develop inflammatory joint pain and swelling.",
-                        "Metabolic and cardiovascular risks: psoriasis is linked to higher rates of obesity, diabetes, high cholesterol, heart attack and stroke.",
-                        "Chronic discomfort and visibility can also impact emotional well-being (stress, self-esteem issues)."
-                    ]
-                },
-                {
-                    "disease": "FU-ringworm",
-                    "description": "Ringworm (tinea) is a common, itchy fungal infection of the skin. It causes a ring-shaped red rash with clearer skin in the middle.",
-                    "entry_to_body": "It occurs when fungi on the skin invade through small cuts or abrasions, infecting the outer layer of skin.",
-                    "spread": "Ringworm is highly contagious. The fungus spreads by direct skin-to-skin contact with an infected person or animal, and by sharing contaminated items (such as towels, clothing or sports gear).",
-                    "secondary_prevention": [
-                        "Keep skin clean and dry; shower and change socks and underwear daily, especially after sweating.",
-                        "Wear footwear in public showers, locker rooms and pool areas.",
-                        "Avoid sharing personal items like towels, clothing or hairbrushes.",
-                        "Treat infected pets (e.g. cats, dogs) and avoid contact with animals that have skin lesions."
-                    ],
-                    "complications": [
-                        "If it infects the scalp, ringworm can cause scaly bald patches; if untreated, the hair loss can become permanent.",
-                        "It can spread to fingernails or toenails, causing thickened, brittle nails (onychomycosis).",
-                        "Repeated scratching may lead to secondary bacterial infection of the skin."
-                    ]
-                },
-                {
-                    "disease": "BA- cellulitis",
-                    "description": "Cellulitis is a bacterial skin infection of the deeper layers of skin and underlying tissue. It causes redness, swelling, warmth and pain in the affected area, often on the legs.",
-                    "entry_to_body": "Cellulitis happens when bacteria (usually strep or staph) enter through a crack or break in the skin (such as a cut, insect bite, surgical wound or rash).",
-                    "spread": "Cellulitis itself is not spread from person to person; it is caused by bacteria entering the skin. However, the bacteria (strep/staph) can sometimes be spread through contact with infected wounds.",
-                    "secondary_prevention": [
-                        "Clean and cover any cuts, scrapes or insect bites right away; wash wounds with soap and water and apply antibiotic ointment, then keep them covered.",
-                        "Keep skin moisturized to prevent cracks; check and care for skin daily if you have diabetes or poor circulation.",
-                        "Treat underlying skin conditions (like athlete's foot) promptly and wear protective footwear or gloves to avoid injury."
-                    ],
-                    "complications": [
-                        "Bacteria may spread to the bloodstream (bacteremia) causing sepsis.",
-                        "Necrotizing fasciitis (flesh-eating disease) or infection of deeper tissues in severe cases.",
-                        "Recurrent cellulitis can cause chronic swelling of the affected limb (lymphedema).",
-                        "Infection can extend to bones (osteomyelitis) or heart valves (endocarditis) in rare cases."
-                    ]
-                },
-                {
-                    "disease": "BA-impetigo",
-                    "description": "Impetigo is a highly contagious bacterial skin infection, most common in infants and young children. It appears as red sores or blisters (often around the nose and mouth) that burst and form yellowish-brown crusts.",
-                    "entry_to_body": "Impetigo is caused by bacteria (usually staph or strep) entering the skin, often through minor cuts, insect bites or other breaks in the skin.",
-                    "spread": "Impetigo spreads very easily by close contact. It can be transmitted through direct skin contact with the sores or by touching objects and surfaces (like towels, bedding, toys) that have the bacteria on them.",
-                    "secondary_prevention": [
-                        "Keep skin clean and treat cuts or scratches promptly: wash minor wounds right away and cover them with a bandage.",
-                        "Do not share personal items (towels, clothing, toys, etc.) with infected individuals.",
-                        "Wash the hands of infected individuals frequently and wear gloves when applying antibiotics.",
-                        "Keep fingernails trimmed to minimize skin damage from scratching."
-                    ],
-                    "complications": [
-                        "Cellulitis: the infection can spread to deeper skin layers and cause serious cellulitis.",
-                        "Post-streptococcal glomerulonephritis: some strep bacteria can trigger kidney inflammation.",
-                        "Scarring: if lesions extend deep into the skin (ecthyma), they may leave scars."
-                    ]
-                },
-                {
-                    "disease": "Warts",
-                    "description": "Warts are common benign skin growths caused by certain strains of human papillomavirus (HPV). They often appear as rough, raised bumps on hands or feet, or fleshy nodules on the genitals.",
-                    "entry_to_body": "The virus enters through tiny cuts or abrasions in the skin, causing extra cell growth that forms a wart.",
-                    "spread": "Warts are contagious. HPV is spread by direct skin contact (touching another person's wart) and by indirect contact (using objects like towels or razors that have touched a wart).",
-                    "secondary_prevention": [
-                        "Avoid touching warts (yours or others') and do not pick or bite at warts.",
-                        "Do not share personal items such as towels, socks, shoes, or nail clippers.",
-                        "Keep skin moist and healthy; avoid cracked skin where the virus can enter.",
-                        "Use the HPV vaccine (for genital warts) and wear shoes in public showers or pool areas."
-                    ],
-                    "complications": [
-                        "Plantar warts (on the feet) can become painful when walking.",
-                        "Warts may recur or spread to other areas if untreated.",
-                        "Genital warts indicate HPV infection; appropriate monitoring for related cancers is important."
-                    ]
-                },
-                {
-                    "disease": "Lupus",
-                    "description": "Lupus is an autoimmune disease in which the immune system attacks its own tissues, causing inflammation. It often affects the skin, joints, kidneys, brain and other organs. A common sign is a butterfly-shaped rash on the face over the cheeks and nose.",
-                    "entry_to_body": "People with a genetic predisposition can develop lupus when exposed to triggers like sunlight (UV light), certain infections or medications.",
-                    "spread": "Lupus is not contagious and cannot be passed from person to person.",
-                    "secondary_prevention": [
-                        "There is no known way to prevent lupus, but patients can reduce flares by avoiding triggers (e.g. sun exposure).",
-                        "Manage infections promptly, avoid smoking and discuss safe medications with a doctor to minimize risk factors."
-                    ],
-                    "complications": [
-                        "Kidney damage (lupus nephritis) leading to kidney failure.",
-                        "Neurological problems: lupus can cause headaches, seizures, strokes, and cognitive difficulties.",
-                        "Blood disorders: increased risk of blood clots, anemia and bleeding problems.",
-                        "Heart and lung inflammation: higher risk of pericarditis, pleurisy, and heart disease.",
-                        "Pregnancy complications: higher risk of miscarriage, preterm birth and high blood pressure."
-                    ]
-                },
-                {
-                    "disease": "SkinCancer",
-                    "description": "Skin cancer is a disease in which skin cells grow abnormally and can form tumors. It is often caused by DNA damage from ultraviolet (UV) radiation (sunlight or tanning beds). The main types are basal cell carcinoma, squamous cell carcinoma, and melanoma (the most serious, as it can spread).",
-                    "entry_to_body": "Exposure to UV light causes mutations in skin cell DNA, triggering cells to grow and divide in an uncontrolled way.",
-                    "spread": "Skin cancer is not contagious. However, if malignant cells break away, they can invade nearby tissue or spread (metastasize) to lymph nodes or other parts of the body.",
-                    "secondary_prevention": [
-                        "Protect your skin from UV exposure: use broad-spectrum sunscreen (SPF 30+) daily, wear protective clothing and seek shade during peak sun hours.",
-                        "Avoid indoor tanning and intentional sunburns.",
-                        "Perform regular skin self-exams and get routine check-ups for any suspicious moles or lesions."
-                    ],
-                    "complications": [
-                        "Advanced skin cancers, especially melanoma, can spread to lymph nodes and distant organs.",
-                        "Late-stage skin cancer may require extensive surgery or radiation, which can be disfiguring.",
-                        "Untreated melanoma can be fatal."
-                    ]
-                },
-                {
-                    "disease": "chickenpox",
-                    "description": "Chickenpox is a highly contagious viral infection caused by the varicella-zoster virus. It causes an itchy rash of red bumps and blisters all over the body.",
-                    "entry_to_body": "The virus enters the body through the respiratory tract or by direct contact with chickenpox blisters.",
-                    "spread": "Chickenpox spreads very easily from person to person. It is transmitted through close contact, such as breathing in virus particles from coughs or sneezes, and by touching the rash of an infected person.",
-                    "secondary_prevention": [
-                        "Vaccination with the varicella (chickenpox) vaccine is the best prevention; two doses are recommended and prevent about 90% of cases.",
-                        "Keep infected individuals isolated until all blisters have crusted to avoid spreading the virus to others.",
-                        "Wash hands frequently and disinfect surfaces to reduce transmission."
-                    ],
-                    "complications": [
-                        "Bacterial skin infections: scratching blisters can introduce bacteria into the skin.",
-                        "Pneumonia (lung infection) or encephalitis (brain inflammation) can occur.",
-                        "Dehydration or (in aspirin-treated children) Reye's syndrome.",
-                        "In rare cases, severe infection can lead to hospitalization or death, especially in high-risk individuals."
-                    ]
-                }
-            ]
-        }
-        
-        # Clean class name for lookup (remove extra spaces and convert to lowercase for matching)
+        # Clean class name for lookup; the index normalizes case, spacing and punctuation
         clean_class_name = class_name.strip()
         logger.info(f"Looking up information for cleaned class name: {clean_class_name}")
         
-        # Find matching disease information
-        disease_info = None
-        for disease in skin_diseases_info["skin_diseases"]:
-            if disease["disease"].lower() == clean_class_name.lower():
-                disease_info = disease
-                logger.info(f"Found exact match for disease: {disease['disease']}")
-                break
+        knowledge = load_knowledge_index()
+        disease_info = knowledge.lookup(clean_class_name)
         
         if disease_info:
             logger.info(f"Successfully found comprehensive disease information for: {clean_class_name}")
@@ -1696,6 +812,9 @@ def info_generation(class_name: str) -> dict:
                 "spread": disease_info["spread"],
                 "secondary_prevention": disease_info["secondary_prevention"],  # Fixed key name
                 "complications": disease_info["complications"],
+                "prevention_html": disease_info["prevention_html"],
+                "complications_html": disease_info["complications_html"],
+                "knowledge_version": knowledge.version,
                 "detailed_info": disease_info  # Include all detailed information
             }
         else:
@@ -1705,6 +824,7 @@ def info_generation(class_name: str) -> dict:
                 "success": True,
                 "disease_name": clean_class_name,
                 "source": "general_medical_knowledge",
+                "knowledge_version": knowledge.version,
                 "description": f"Skin condition detected: {clean_class_name}. This appears to be a dermatological condition that requires professional evaluation.",
                 "entry_to_body": "The exact mechanism of this condition may vary. Consult with a dermatologist for detailed information.",
                 "spread": "Transmission characteristics unknown. Follow general hygiene practices and avoid direct contact until evaluated by a healthcare provider.",
@@ -1733,10 +853,10 @@ def info_generation(class_name: str) -> dict:
 def main():
     logger.info("Starting main application function")
 
-    image = Image.open("E:/hitayu/captured_image.jpg")
-    img_array = np.asarray(image)
-    img_list = img_array.tolist()
-    logger.info(f'Got an array of shape {img_array.shape}')
+    # Start fetching medication payloads and loading the model in the background while the form is filled in
+    medicine_client()
+    skin_model.load_in_background()
+
 
     # Main Header
     st.markdown("""
@@ -1859,8 +979,7 @@ def main():
                 'family_history_skin': family_history_skin,
                 'previous_skin_issues': previous_skin_issues,
                 'current_symptoms': current_symptoms,
-                'lesion_location': lesion_location,
-                'array_of_image': img_list
+                'lesion_location': lesion_location
             }
             logger.info(f"Updated patient data for: {patient_name if patient_name else 'unnamed patient'}")
     
@@ -1934,81 +1053,28 @@ def main():
         progress_bar = st.progress(0)
         status_text = st.empty()
         
-        # Analysis steps
-        steps = [
-            "Preprocessing skin lesion image...",
-            "Applying deep learning model...",
-            "Analyzing dermatological patterns...",
-            "Comparing with medical database...",
-            "Generating diagnosis report..."
-        ]
+        def report_progress(fraction, message):
+            progress_bar.progress(fraction)
+            status_text.text(message)
         
-        start_time = time.perf_counter()
+        # Progress follows the real pipeline stages instead of a fixed timer
+        progress = AnalysisProgress(
+            stages=["decode", "preprocess", "infer", "persist"],
+            on_update=report_progress
+        )
         logger.info("Starting analysis process")
         
-        for i, step in enumerate(steps):
-            status_text.text(step)
-            logger.info(f"Analysis step {i+1}/5: {step}")
-            time.sleep(0.8)
-            progress_bar.progress((i + 1) / len(steps))
-        
-        status_text.text("✅ Analysis Complete!")
-        logger.info("Analysis steps completed")
-        
-        # Get prediction results
-        image = Image.open(st.session_state.uploaded_image)
+        with progress.stage("decode", "Decoding skin lesion image..."):
+            image_key = hashlib.sha256(st.session_state.uploaded_image.getvalue()).hexdigest()
+            image = Image.open(st.session_state.uploaded_image)
+            image.load()
 
-        def compress_image_for_storage(image, max_size_kb=500, quality=85):
-            """
-            Compress image to reduce size before database storage
-            """
-            try:
-                # Convert to RGB if necessary
-                if image.mode in ("RGBA", "P"):
-                    image = image.convert("RGB")
-                
-                # Resize if too large
-                max_dimension = 800  # Maximum width or height
-                if max(image.size) > max_dimension:
-                    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
-                
-                # Compress and convert to base64
-                buffer = BytesIO()
-                image.save(buffer, format="JPEG", quality=quality, optimize=True)
-                
-                # Check size and reduce quality if still too large
-                while buffer.tell() > max_size_kb * 1024 and quality > 30:
-                    buffer = BytesIO()
-                    quality -= 10
-                    image.save(buffer, format="JPEG", quality=quality, optimize=True)
-                
-                buffer.seek(0)
-                image_b64 = base64.b64encode(buffer.read()).decode('utf-8')
-                
-                return {
-                    'image_data': image_b64,
-                    'compressed_size_kb': len(image_b64) / 1024,
-                    'quality': quality,
-                    'dimensions': image.size
-                }
-                
-            except Exception as e:
-                logger.error(f"Error compressing image: {str(e)}")
-                return None
-
-        compressed_image_info = compress_image_for_storage(image)
-        if compressed_image_info:
-            st.session_state.patient_data['compressed_image'] = compressed_image_info
-            logger.info(f"Compressed image for storage: {compressed_image_info['compressed_size_kb']:.2f} KB at quality {compressed_image_info['quality']}")
-        else:
-            logger.warn("Image compression failed; proceeding without compressed image")
-        
         logger.info("Loading image for prediction")
-        results = predict_skin_disease(image= image)
+        results = predict_skin_disease(image= image, progress= progress, image_key= image_key)
         st.session_state.prediction_results = results
         
-        end_time = time.time()
-        analysis_time = end_time - start_time
+        # Only real work (decode, preprocess, inference) counts towards the analysis time
+        analysis_time = progress.elapsed("decode", "preprocess", "infer")
         logger.info(f"Analysis completed in {analysis_time:.2f} seconds")
         
         st.session_state.diagnosis_complete = True
@@ -2049,7 +1115,7 @@ def main():
                 """.format(analysis_time), unsafe_allow_html=True)
                 
             with col3:
-                risk_level = "High" if confidence_score > 0.9 else "Medium" if confidence_score > 0.7 else "Low"
+                risk_level = results['top_predictions'].confidence_bucket
                 st.markdown("""
                 <div class="metric-card">
                     <div style="color: white; font-size: 0.9rem; font-weight: 600; margin-bottom: 0.5rem;">RISK LEVEL</div>
@@ -2067,31 +1133,20 @@ def main():
                 </div>
                 """.format(predicted_class.split()[0]), unsafe_allow_html=True)
             
-            # Create probability chart
-            if 'all_predictions' in results:
-                # Convert predictions to a format suitable for plotting
-                predictions_flat = results['all_predictions'][0] if len(results['all_predictions'].shape) > 1 else results['all_predictions']
-                
-                # Create DataFrame for easier plotting
-                df_predictions = DataFrame({
-                    'Disease': SKIN_DISEASE_CLASSES,
-                    'Probability': predictions_flat
-                })
-                df_predictions = df_predictions.sort_values('Probability', ascending=True)
-                
-                # Display top 3 predictions in a nice format
+            # Top predictions come ranked from the predictor
+            top_predictions = results.get('top_predictions')
+            if top_predictions is not None:
                 st.markdown("### 🏆 Top 3 Predictions")
-                top_3 = df_predictions.nlargest(3, 'Probability')
                 
                 cols = st.columns(3)
-                for i, (idx, row) in enumerate(top_3.iterrows()):
+                for i, (disease, probability) in enumerate(zip(top_predictions.labels, top_predictions.probabilities)):
                     with cols[i]:
                         rank_emoji = ["🥇", "🥈", "🥉"][i]
                         st.markdown(f"""
                         <div style="background: rgba(255,255,255,0.1); padding: 1rem; border-radius: 10px; text-align: center; margin: 0.5rem 0;">
                             <div style="font-size: 2rem; margin-bottom: 0.5rem;">{rank_emoji}</div>
-                            <div style="font-weight: bold; color: white; margin-bottom: 0.5rem;">{row['Disease']}</div>
-                            <div style="font-size: 1.5rem; color: #4CAF50; font-weight: bold;">{row['Probability']:.2%}</div>
+                            <div style="font-weight: bold; color: white; margin-bottom: 0.5rem;">{disease}</div>
+                            <div style="font-size: 1.5rem; color: #4CAF50; font-weight: bold;">{probability:.2%}</div>
                         </div>
                         """, unsafe_allow_html=True)
             
@@ -2111,17 +1166,34 @@ def main():
                     'predicted_condition': predicted_class,
                     'confidence_score': float(confidence_score),
                     'analysis_time_seconds': round(analysis_time, 2),
+                    'tta_views': results.get('tta_views', 1),
+                    'confidence_bucket': results['top_predictions'].confidence_bucket,
                     'all_predictions': all_predictions
                 }
             }
             
-            # Save initial data to database
-            save_result = save_patient_data(initial_data)
+            with progress.stage("persist", "Saving diagnosis record..."):
+                # Images go to their own blob collection, encoded by the background writer;
+                # the record only keeps a reference
+                persistence = get_persistence_service()
+                if persistence is not None:
+                    initial_data['patient_data']['image_ref'] = queue_image_blob(
+                        persistence, image, content_key=image_key, max_size_kb=500)
+
+                    # The camera frame stays in the session; it is only encoded when a record is saved
+                    captured_frame = st.session_state.get('captured_frame')
+                    if captured_frame is not None:
+                        initial_data['patient_data']['captured_image_ref'] = queue_image_blob(
+                            persistence, captured_frame, max_size_kb=500)
+
+                # Save initial data to database
+                save_result = save_patient_data(initial_data)
+            status_text.text("✅ Analysis Complete!")
             
             if save_result.get('success'):
-                logger.info(f"Initial data saved successfully with ID: {save_result['record_id']}")
+                logger.info(f"Initial data queued for storage with ID: {save_result['record_id']}")
                 st.session_state.patient_record_id = save_result['record_id']
-                st.success(f"✅ Patient record created successfully! Record ID: {save_result['record_id']}")
+                st.success(f"✅ Patient record queued for storage! Record ID: {save_result['record_id']}")
             else:
                 logger.error(f"Failed to save initial data: {save_result.get('message', 'Unknown error')}")
                 st.warning(f"⚠️ Error saving diagnosis data: {save_result.get('message', 'Unknown error')}")
@@ -2311,8 +1383,7 @@ def main():
                             if update_result.get('success'):
                                 logger.info(f"Feedback updated successfully for record: {record_id}")
                                 st.session_state.feedback_submitted = True
-                                st.success("✅ Thank you for your feedback! Your input has been saved successfully.")
-                                time.sleep(2)
+                                st.success("✅ Thank you for your feedback! Your input has been queued for storage.")
                                 st.rerun()
                             else:
                                 logger.warn(f"Failed to update record: {update_result.get('message')}")
@@ -2328,8 +1399,7 @@ def main():
                                 if feedback_save_result.get('success'):
                                     logger.info(f"Feedback saved as new record: {feedback_save_result['record_id']}")
                                     st.session_state.feedback_submitted = True
-                                    st.success("✅ Thank you for your feedback! Your input has been saved.")
-                                    time.sleep(2)
+                                    st.success("✅ Thank you for your feedback! Your input has been queued for storage.")
                                     st.rerun()
                                 else:
                                     st.error("❌ Error saving feedback to database.")
@@ -2346,8 +1416,7 @@ def main():
                             if feedback_save_result.get('success'):
                                 logger.info(f"Feedback saved as new record: {feedback_save_result['record_id']}")
                                 st.session_state.feedback_submitted = True
-                                st.success("✅ Thank you for your feedback! Your input has been saved.")
-                                time.sleep(2)
+                                st.success("✅ Thank you for your feedback! Your input has been queued for storage.")
                                 st.rerun()
                             else:
                                 st.error("❌ Error saving feedback to database.")
@@ -0,0 +1,91 @@
+"""
+  check_import_time.py
+  --------------------
+  Cold-start import profile of a Streamlit page, from ``python -X importtime``.
+  Fails when the page's import graph exceeds the time budget or pulls in a
+  module that must only be imported lazily.
+  Run from the project root:
+      python scripts/check_import_time.py
+      python scripts/check_import_time.py pages/SKIN_DISEASE_DIAGNOSIS.py --budget-ms 2500
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_PAGE = "pages/SKIN_DISEASE_DIAGNOSIS.py"
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "2500"))
+
+# Loaded on demand (model load, persistence, medicine API) - never at page import
+FORBIDDEN_MODULES = ("tensorflow", "keras", "huggingface_hub", "pymongo", "bson", "pandas", "requests")
+
+_LOADER = (
+    "import importlib.util, sys\n"
+    "spec = importlib.util.spec_from_file_location('page_under_test', sys.argv[1])\n"
+    "spec.loader.exec_module(importlib.util.module_from_spec(spec))\n"
+)
+
+
+def profile_imports(page: str):
+    """
+    Import ``page`` in a fresh interpreter (not as ``__main__``, so ``main()`` does not run).
+
+    Returns:
+        list: ``(module, self_us, cumulative_us, depth)`` in import order
+    """
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _LOADER, str(ROOT / page)],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {page} failed:\n{completed.stderr[-2000:]}")
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # header row
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def report(entries, budget_ms, top=15):
+    """Print the profile and return the list of budget/forbidden-module violations."""
+    # Only outermost imports are counted; their cumulative time includes the children
+    total_ms = sum(cumulative for _, _, cumulative, depth in entries if depth == 0) / 1000
+    print(f"Total import time: {total_ms:.0f} ms (budget {budget_ms:.0f} ms), {len(entries)} modules")
+
+    print("\nSlowest top-level imports:")
+    top_level = sorted((e for e in entries if e[3] == 0), key=lambda e: e[2], reverse=True)
+    for name, _, cumulative, _ in top_level[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    violations = []
+    if total_ms > budget_ms:
+        violations.append(f"import time {total_ms:.0f} ms exceeds budget {budget_ms:.0f} ms")
+    imported = {name for name, _, _, _ in entries}
+    for module in FORBIDDEN_MODULES:
+        if module in imported:
+            violations.append(f"'{module}' is imported at page load")
+    return violations
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check a Streamlit page's cold-start import time")
+    parser.add_argument("page", nargs="?", default=DEFAULT_PAGE, help="Page path relative to the project root")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list")
+    args = parser.parse_args()
+
+    violations = report(profile_imports(args.page), args.budget_ms, args.top)
+    for violation in violations:
+        print(f"FAIL: {violation}")
+    sys.exit(1 if violations else 0)
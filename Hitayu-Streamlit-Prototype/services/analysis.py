@@ -0,0 +1,42 @@
+import time
+from contextlib import contextmanager
+
+
+class AnalysisProgress:
+    """
+    Progress reporting driven by the real stages of the diagnosis pipeline.
+
+    Each stage is timed with ``time.perf_counter`` and the optional
+    ``on_update(fraction, message)`` callback is fired when a stage starts
+    and when it finishes, so a progress bar only moves when work is done.
+    """
+
+    def __init__(self, stages, on_update=None):
+        self.stages = list(stages)
+        self.on_update = on_update
+        self.timings = {}
+        self._completed = 0
+
+    def _notify(self, message):
+        if self.on_update is not None:
+            self.on_update(self._completed / len(self.stages), message)
+
+    @contextmanager
+    def stage(self, name, message=None):
+        """Time one pipeline stage and advance the progress once it finishes."""
+        if name not in self.stages:
+            raise ValueError(f"Unknown analysis stage: {name}")
+
+        self._notify(message or f"{name.capitalize()}...")
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
+        self._completed += 1
+        self._notify(message or f"{name.capitalize()}...")
+
+    def elapsed(self, *stages):
+        """Seconds spent in the given stages (all recorded stages when omitted)."""
+        names = stages or tuple(self.timings)
+        return sum(self.timings.get(name, 0.0) for name in names)
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from logger import Logger
+
+logger = Logger(name="artifacts")
+
+DATA_DIR = Path(__file__).parent / "data"
+MANIFEST_PATH = DATA_DIR / "sdn5_manifest.json"
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "hitayu" / "artifacts"
+
+
+class ArtifactError(RuntimeError):
+    """Raised when an artifact cannot be found, fetched or verified."""
+
+
+def sha256_file(path, chunk_size=1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _env_flag(name) -> bool:
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes")
+
+
+class _FileLock:
+    """
+    Cross-process lock on a lock file created with O_EXCL (works on Windows and POSIX).
+
+    A lock older than ``stale_after`` seconds is assumed to belong to a
+    crashed process and is broken.
+    """
+
+    def __init__(self, path, timeout=600.0, stale_after=900.0):
+        self.path = str(path)
+        self.timeout = timeout
+        self.stale_after = stale_after
+
+    def __enter__(self):
+        started = time.monotonic()
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) > self.stale_after:
+                        logger.warn(f"Breaking stale lock {self.path}")
+                        os.remove(self.path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() - started > self.timeout:
+                    raise ArtifactError(f"Timed out waiting for lock {self.path}")
+                time.sleep(0.2)
+
+    def __exit__(self, *exc):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class ArtifactStore:
+    """
+    Offline-first store for model artifacts listed in the manifest.
+
+    Artifacts resolve from a local cache directory shared by every worker
+    process. A cached file is trusted only while its SHA-256 matches the
+    manifest; a sidecar ``.sha256`` stamp (hash, size, mtime) saves re-hashing
+    unchanged files on every start. Missing files are installed from a local
+    seed copy or, unless offline, downloaded from the Hugging Face Hub - under
+    a file lock and with an atomic rename, so concurrent processes never see
+    or produce a partial file. Packaged artifacts are read from the package.
+    """
+
+    def __init__(self, cache_dir, manifest, repo_id=None, seed_paths=None, offline=False):
+        self.cache_dir = Path(cache_dir)
+        self.manifest = manifest
+        self.repo_id = repo_id
+        self.seed_paths = {name: path for name, path in (seed_paths or {}).items() if path}
+        self.offline = offline
+
+    @classmethod
+    def from_env(cls, manifest_path=MANIFEST_PATH):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)["artifacts"]
+        user_name, repository = os.getenv("HUGGINGFACE_USERNAME"), os.getenv("HUGGINGFACE_REPO")
+        return cls(
+            cache_dir=os.getenv("HITAYU_ARTIFACT_DIR", str(DEFAULT_CACHE_DIR)),
+            manifest=manifest,
+            repo_id=f"{user_name}/{repository}" if user_name and repository else None,
+            seed_paths={"SDN5.h5": os.getenv("SDN5_LOCAL_MODEL_PATH")},
+            offline=_env_flag("HITAYU_OFFLINE") or _env_flag("HF_HUB_OFFLINE")
+        )
+
+    def _spec(self, name) -> dict:
+        if name not in self.manifest:
+            raise ArtifactError(f"Unknown artifact: {name}")
+        return self.manifest[name]
+
+    # Verification -------------------------------------------------------------
+
+    def _stamp_path(self, path) -> Path:
+        return path.with_name(path.name + ".sha256")
+
+    def _is_valid(self, path, expected_sha256) -> bool:
+        if not path.exists():
+            return False
+        stat = path.stat()
+        stamp_path = self._stamp_path(path)
+        try:
+            with open(stamp_path, encoding="utf-8") as f:
+                stamp = json.load(f)
+            if stamp == {"sha256": expected_sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}:
+                return True
+        except (OSError, ValueError):
+            pass
+
+        actual = sha256_file(path)
+        if actual != expected_sha256:
+            logger.warn(f"Checksum mismatch for {path}: expected {expected_sha256}, got {actual}")
+            return False
+        self._write_stamp(path, expected_sha256)
+        return True
+
+    def _write_stamp(self, path, sha256):
+        stat = path.stat()
+        stamp_path = self._stamp_path(path)
+        tmp_path = stamp_path.with_name(stamp_path.name + f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"sha256": sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}, f)
+        os.replace(tmp_path, stamp_path)
+
+    # Resolution ---------------------------------------------------------------
+
+    def resolve(self, name) -> Path:
+        """
+        Local path of a verified artifact, installing it into the cache if needed.
+
+        Raises:
+            ArtifactError: If no verified copy can be found or fetched
+        """
+        spec = self._spec(name)
+        if spec.get("packaged"):
+            # Small and possibly on a read-only install: hash it, never stamp it
+            path = DATA_DIR / name
+            if not path.exists() or sha256_file(path) != spec["sha256"]:
+                raise ArtifactError(f"Packaged artifact {name} is missing or corrupt")
+            return path
+
+        path = self.cache_dir / name
+        if self._is_valid(path, spec["sha256"]):
+            return path
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with _FileLock(self.cache_dir / f"{name}.lock"):
+            # Another process may have installed it while we waited
+            if self._is_valid(path, spec["sha256"]):
+                return path
+            for source in self._sources(name, spec):
+                try:
+                    self._install(path, source(), spec["sha256"])
+                    return path
+                except Exception as e:
+                    logger.warn(f"Could not install {name}: {str(e)}")
+        raise ArtifactError(f"No verified copy of {name} available"
+                            + (" (offline mode)" if self.offline else ""))
+
+    def _sources(self, name, spec):
+        """Candidate sources in order of preference: local seed copy, then the hub."""
+        seed = self.seed_paths.get(name)
+        if seed and os.path.exists(seed):
+            yield lambda: seed
+        if not self.offline and self.repo_id and spec.get("hub_filename"):
+            yield lambda: self._download(spec["hub_filename"])
+
+    def _download(self, filename) -> str:
+        from huggingface_hub import hf_hub_download
+
+        logger.info(f"Downloading {filename} from Hugging Face Hub ({self.repo_id})")
+        return hf_hub_download(repo_id=self.repo_id, filename=filename, repo_type="model")
+
+    def _install(self, path, source, expected_sha256):
+        """Copy ``source`` into the cache, verifying the hash before the atomic rename."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(fd, "wb") as out, open(source, "rb") as src:
+                for chunk in iter(lambda: src.read(1 << 20), b""):
+                    digest.update(chunk)
+                    out.write(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+            if digest.hexdigest() != expected_sha256:
+                raise ArtifactError(f"Checksum mismatch for {source}: got {digest.hexdigest()}")
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._write_stamp(path, expected_sha256)
+        logger.info(f"Installed {path.name} into {self.cache_dir}")
+
+
+@lru_cache(maxsize=None)
+def get_artifact_store() -> ArtifactStore:
+    """Return the process-wide ArtifactStore."""
+    return ArtifactStore.from_env()
@@ -0,0 +1,193 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from logger import Logger
+
+logger = Logger(name="camera")
+
+
+class SyntheticVideoSource:
+    """
+    Stand-in for ``cv2.VideoCapture`` that generates BGR frames at a fixed rate.
+
+    Each frame is a moving gradient with the frame number encoded in its first
+    pixel row, so tests can tell frames apart without a webcam.
+    """
+
+    def __init__(self, width=640, height=480, fps=30):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self._frame_id = 0
+        self._opened = True
+        self._next_frame_at = time.monotonic()
+        self._base = np.add.outer(np.arange(height, dtype=np.uint16), np.arange(width, dtype=np.uint16))
+
+    def isOpened(self):
+        return self._opened
+
+    def set(self, prop, value):
+        return True
+
+    def read(self):
+        if not self._opened:
+            return False, None
+        # Pace like a real device
+        delay = self._next_frame_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_frame_at = max(self._next_frame_at, time.monotonic()) + 1.0 / self.fps
+
+        shade = ((self._base + self._frame_id * 4) % 256).astype(np.uint8)
+        frame = np.stack([shade, np.flip(shade, axis=1), np.full_like(shade, self._frame_id % 256)], axis=-1)
+        frame[0, :8] = np.frombuffer(self._frame_id.to_bytes(8, "little") * 3, dtype=np.uint8).reshape(8, 3)
+        self._frame_id += 1
+        return True, frame
+
+    def release(self):
+        self._opened = False
+
+
+def camera_source_factory(source="0", width=640, height=480, fps=30):
+    """
+    Build a zero-argument factory for a frame source.
+
+    ``source`` is a webcam index ("0"), "synthetic", or a path/URL understood by OpenCV.
+    """
+    if source == "synthetic":
+        return lambda: SyntheticVideoSource(width, height, fps)
+
+    def _open():
+        import cv2
+        capture = cv2.VideoCapture(int(source) if str(source).isdigit() else source)
+        capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        capture.set(cv2.CAP_PROP_FPS, fps)
+        return capture
+    return _open
+
+
+class CaptureWorker:
+    """
+    Long-lived capture thread that owns the video device.
+
+    Frames are read continuously into a small lock-protected ring buffer, so
+    the UI can poll ``latest()`` at its own rate and ``capture()`` returns the
+    freshest frame without opening the device. The device is released after
+    ``idle_timeout`` seconds without readers and reopened on the next read.
+    When the device can't be opened or stops delivering frames, ``error`` says
+    why and reopening waits an exponentially growing backoff, so preview
+    polls don't hammer a busy or missing camera.
+    """
+
+    def __init__(self, source_factory, buffer_size=4, idle_timeout=15.0, max_read_failures=30,
+                 retry_backoff=1.0, retry_backoff_max=30.0):
+        self.source_factory = source_factory
+        self.idle_timeout = idle_timeout
+        self.max_read_failures = max_read_failures
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.error = None
+
+        self._frames = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_read = time.monotonic()
+        self._frame_id = 0
+        self._device_failures = 0
+        self._retry_at = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._last_read = time.monotonic()
+                self._thread = threading.Thread(target=self._run, name="camera-capture", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _fail(self, reason):
+        """Record a device failure and hold off reopening until the backoff expires."""
+        self._device_failures += 1
+        delay = min(self.retry_backoff * 2 ** (self._device_failures - 1), self.retry_backoff_max)
+        self._retry_at = time.monotonic() + delay
+        self.error = f"{reason} (retrying in {delay:g}s)"
+        logger.error(self.error)
+
+    def _run(self):
+        try:
+            source = self.source_factory()
+        except Exception as e:
+            self._fail(f"Could not open webcam: {str(e)}")
+            return
+        if not source.isOpened():
+            source.release()
+            self._fail("Could not open webcam")
+            return
+        logger.info("Capture worker started")
+
+        failures = 0
+        try:
+            while not self._stop.is_set():
+                if time.monotonic() - self._last_read > self.idle_timeout:
+                    logger.info("No preview readers - releasing camera")
+                    break
+                ok, frame = source.read()
+                if not ok:
+                    failures += 1
+                    if failures >= self.max_read_failures:
+                        self._fail("Cannot read from camera")
+                        break
+                    time.sleep(0.01)
+                    continue
+                if self.error is not None:
+                    # The device is back: clear the failure shown to the preview
+                    self.error = None
+                    self._device_failures = 0
+                failures = 0
+                with self._new_frame:
+                    self._frame_id += 1
+                    self._frames.append((self._frame_id, time.time(), frame))
+                    self._new_frame.notify_all()
+        finally:
+            source.release()
+            with self._lock:
+                self._frames.clear()
+
+    def latest(self, timeout=0.0):
+        """
+        Freshest frame as ``(frame_id, timestamp, rgb_array)``, or None.
+
+        Reading (re)starts the worker if it went idle, or once the retry
+        backoff after a device failure has passed. ``timeout`` waits that long
+        for a first frame.
+        """
+        self._last_read = time.monotonic()
+        if not self.running and self._last_read >= self._retry_at:
+            self.start()
+        with self._new_frame:
+            if not self._frames and timeout > 0:
+                self._new_frame.wait(timeout)
+            if not self._frames:
+                return None
+            frame_id, timestamp, frame = self._frames[-1]
+        # Devices deliver BGR; convert only the frames that are actually shown
+        return frame_id, timestamp, np.ascontiguousarray(frame[..., ::-1])
+
+    def capture(self, timeout=2.0):
+        """Freshest RGB frame as a new array, or None if the camera produced nothing."""
+        latest = self.latest(timeout=timeout)
+        return None if latest is None else latest[2]
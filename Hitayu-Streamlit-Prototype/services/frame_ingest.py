@@ -0,0 +1,90 @@
+import argparse
+import threading
+import time
+from io import BytesIO
+
+from PIL import Image
+
+
+def decode_frame(data: bytes) -> Image.Image:
+    """Decode a compressed JPEG/WebP/PNG frame to RGB."""
+    image = Image.open(BytesIO(data))
+    if image.format not in ("JPEG", "WEBP", "PNG"):
+        raise ValueError(f"Unsupported frame format: {image.format}")
+    return image.convert("RGB")
+
+
+class FrameIngestPipeline:
+    """
+    Ingest of compressed frames sent by the client (browser camera).
+
+    The live preview is rendered by the browser and never reaches the server;
+    only the final capture is uploaded, as one compressed image. It is decoded
+    at full resolution on the calling thread and handed to the inference pipeline.
+    """
+
+    def __init__(self):
+        self.stats = {"captures": 0, "bytes_in": 0}
+        self._lock = threading.Lock()
+
+    def capture(self, data: bytes) -> Image.Image:
+        """Decode the final capture at full resolution for inference."""
+        with self._lock:
+            self.stats["captures"] += 1
+            self.stats["bytes_in"] += len(data)
+        return decode_frame(data)
+
+
+def replay_video(path, fps=15.0, quality=80, realtime=True):
+    """
+    Test harness: replay a video file as the browser camera would.
+
+    Every frame is JPEG-encoded (as the browser does for its preview) but only
+    the last one is uploaded and decoded as the capture. Returns the raw frame
+    volume the server-side camera path used to push against what is uploaded now.
+    """
+    import cv2
+
+    pipeline = FrameIngestPipeline()
+    video = cv2.VideoCapture(path)
+    if not video.isOpened():
+        raise RuntimeError(f"Cannot open video: {path}")
+
+    frames, raw_bytes, last_jpeg = 0, 0, None
+    started = time.perf_counter()
+    try:
+        while True:
+            ok, frame = video.read()
+            if not ok:
+                break
+            raw_bytes += frame.nbytes
+            ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if ok:
+                last_jpeg = encoded.tobytes()
+            frames += 1
+            if realtime:
+                time.sleep(max(0.0, started + frames / fps - time.perf_counter()))
+    finally:
+        video.release()
+
+    decode_started = time.perf_counter()
+    capture = pipeline.capture(last_jpeg) if last_jpeg else None
+    decode_ms = (time.perf_counter() - decode_started) * 1000
+    return {
+        "frames": frames,
+        "seconds": round(time.perf_counter() - started, 3),
+        "raw_rgb_mb": round(raw_bytes / 2 ** 20, 2),
+        "uploaded_mb": round(pipeline.stats["bytes_in"] / 2 ** 20, 2),
+        "capture_decode_ms": round(decode_ms, 2),
+        "capture_size": capture.size if capture else None
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a video file through the frame ingest pipeline")
+    parser.add_argument("video", help="Path to a video file")
+    parser.add_argument("--fps", type=float, default=15.0)
+    parser.add_argument("--quality", type=int, default=80, help="JPEG quality used by the simulated client")
+    parser.add_argument("--no-realtime", action="store_true", help="Submit frames as fast as possible")
+    args = parser.parse_args()
+    print(replay_video(args.video, fps=args.fps, quality=args.quality, realtime=not args.no_realtime))
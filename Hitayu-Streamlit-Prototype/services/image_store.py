@@ -0,0 +1,127 @@
+import hashlib
+import os
+from io import BytesIO
+
+from PIL import Image
+from logger import Logger
+
+logger = Logger(name="image_store")
+
+IMAGE_CONTENT_TYPE = "image/jpeg"
+
+# Metadata reads never need the encoded bytes
+IMAGE_METADATA_PROJECTION = {"data": 0}
+
+
+def image_collection_name() -> str:
+    return os.getenv("IMAGE_COLLECTION_NAME", "patient_images")
+
+
+def _encode_jpeg(image, quality: int) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def encode_jpeg_to_budget(image, max_size_kb=500, max_quality=85, min_quality=30, max_dimension=800) -> dict:
+    """
+    Encode an image as JPEG at the highest quality that fits the size budget.
+
+    The first encode at ``max_quality`` is usually within budget. Otherwise the
+    quality is binary searched between ``min_quality`` and ``max_quality``,
+    which needs at most ~6 further encodes instead of a linear quality walk.
+
+    Args:
+        image: PIL Image object (not modified)
+        max_size_kb: Size budget for the encoded bytes
+        max_quality: Starting JPEG quality
+        min_quality: Lowest acceptable JPEG quality
+        max_dimension: Longest side after downscaling
+    Returns:
+        dict: Encoded bytes with their size, quality, dimensions and SHA-256 digest
+    """
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    if max(image.size) > max_dimension:
+        image = image.copy()
+        image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+    budget = max_size_kb * 1024
+    quality = max_quality
+    data = _encode_jpeg(image, quality)
+    encodes = 1
+
+    if len(data) > budget:
+        # Highest quality in [min_quality, max_quality) that fits; fall back to min_quality
+        low, high = min_quality, max_quality - 1
+        best = None
+        while low <= high:
+            mid = (low + high) // 2
+            candidate = _encode_jpeg(image, mid)
+            encodes += 1
+            if len(candidate) <= budget:
+                best = (mid, candidate)
+                low = mid + 1
+            else:
+                high = mid - 1
+        if best is None:
+            # Nothing fits: the last candidate tried was encoded at min_quality
+            best = (min_quality, candidate)
+        quality, data = best
+
+    logger.info(f"Encoded image at quality {quality} ({len(data) / 1024:.1f} KB, {encodes} encodes)")
+    return {
+        "image_data": data,
+        "size_kb": len(data) / 1024,
+        "quality": quality,
+        "dimensions": image.size,
+        "sha256": hashlib.sha256(data).hexdigest()
+    }
+
+
+def queue_image_blob(persistence, image, content_key=None, max_size_kb=500) -> dict:
+    """
+    Queue an image for the blob collection and return the reference stored on the patient record.
+
+    The JPEG encode runs on the persistence writer thread, so the caller only
+    pays for hashing. The blob ``_id`` is a SHA-256 content key of the source
+    (the pixels unless ``content_key`` is given), so the same image is only
+    stored once. Size, quality and dimensions are kept on the blob document.
+
+    Args:
+        persistence: The PersistenceService that writes the blob
+        image: PIL Image object (must not be modified afterwards)
+        content_key: Precomputed content hash, e.g. of the uploaded file
+        max_size_kb: Size budget for the encoded bytes
+    """
+    from bson import Binary
+
+    blob_id = content_key or hashlib.sha256(image.tobytes()).hexdigest()
+
+    def _encode(document):
+        encoded = encode_jpeg_to_budget(image, max_size_kb=max_size_kb)
+        return {
+            **document,
+            "data": Binary(encoded["image_data"]),
+            "size_bytes": len(encoded["image_data"]),
+            "quality": encoded["quality"],
+            "dimensions": list(encoded["dimensions"])
+        }
+
+    persistence.insert(image_collection_name(), {"_id": blob_id, "content_type": IMAGE_CONTENT_TYPE}, prepare=_encode)
+    return {
+        "blob_id": blob_id,
+        "collection": image_collection_name(),
+        "content_type": IMAGE_CONTENT_TYPE
+    }
+
+
+def fetch_image_metadata(client, database_name, blob_id):
+    """Read a blob's metadata without transferring the image bytes."""
+    return client[database_name][image_collection_name()].find_one({"_id": blob_id}, IMAGE_METADATA_PROJECTION)
+
+
+def fetch_image_bytes(client, database_name, blob_id):
+    """Read the raw encoded image bytes for a blob, or None if it does not exist."""
+    document = client[database_name][image_collection_name()].find_one({"_id": blob_id}, {"data": 1})
+    return bytes(document["data"]) if document else None
@@ -0,0 +1,97 @@
+import json
+import re
+from functools import lru_cache
+from html import escape
+from pathlib import Path
+from types import MappingProxyType
+
+KNOWLEDGE_PATH = Path(__file__).parent / "data" / "skin_diseases.json"
+
+_SECTION_TEMPLATE = """
+<div style="
+    background: linear-gradient(135deg, rgba({rgb}, 0.15), rgba({rgb}, 0.08));
+    backdrop-filter: blur(20px);
+    border: 2px solid rgba({rgb}, 0.3);
+    border-radius: 25px;
+    padding: 2.5rem;
+    margin: 1.5rem 0;
+    box-shadow: 0 15px 35px rgba(0, 0, 0, 0.3);
+">
+    <h3 style="
+        font-size: 1.5rem;
+        font-weight: 600;
+        margin-bottom: 1.5rem;
+        text-shadow: 1px 1px 3px rgba(0, 0, 0, 0.3);
+        text-align: center;
+        color: {color};
+        margin-top: 0;
+    ">{title}</h3>
+    <div style="
+        color: rgba(255, 255, 255, 0.9);
+        font-size: 1.1rem;
+        line-height: 1.8;
+    ">{items}</div>
+</div>
+"""
+
+
+def normalize_class_name(name: str) -> str:
+    """Lookup key for a class name or alias: lowercase alphanumerics only ("BA- cellulitis" -> "bacellulitis")."""
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def _render_section(title, items, color, rgb) -> str:
+    if not items:
+        return ""
+    return _SECTION_TEMPLATE.format(
+        title=title,
+        color=color,
+        rgb=rgb,
+        items="<br>".join(f"• {escape(item, quote=False)}" for item in items)
+    )
+
+
+class DiseaseKnowledgeIndex:
+    """
+    Immutable index over the versioned disease knowledge file.
+
+    Entries are keyed by the normalized class name and every alias, so a lookup
+    is a single dict access. Each entry also carries the pre-rendered HTML for
+    its prevention and complications sections.
+    """
+
+    def __init__(self, version: str, diseases):
+        self.version = version
+        index = {}
+        for disease in diseases:
+            entry = dict(disease)
+            entry["aliases"] = tuple(entry.get("aliases", ()))
+            entry["secondary_prevention"] = tuple(entry.get("secondary_prevention", ()))
+            entry["complications"] = tuple(entry.get("complications", ()))
+            entry["prevention_html"] = _render_section(
+                "How To Stay Safe", entry["secondary_prevention"], "#4CAF50", "76, 175, 80")
+            entry["complications_html"] = _render_section(
+                "Things That Might Happen", entry["complications"], "#f44336", "244, 67, 54")
+            entry = MappingProxyType(entry)
+
+            for name in (entry["disease"],) + entry["aliases"]:
+                key = normalize_class_name(name)
+                if key in index and index[key] is not entry:
+                    raise ValueError(f"Duplicate disease name or alias in knowledge base: {name}")
+                index[key] = entry
+        self._index = MappingProxyType(index)
+
+    def lookup(self, class_name: str):
+        """Return the read-only entry for a class name or alias, or None."""
+        return self._index.get(normalize_class_name(class_name))
+
+    def __len__(self):
+        return len({id(entry) for entry in self._index.values()})
+
+
+@lru_cache(maxsize=None)
+def load_knowledge_index(path=KNOWLEDGE_PATH) -> DiseaseKnowledgeIndex:
+    """Load the knowledge file once per process."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return DiseaseKnowledgeIndex(data["version"], data["skin_diseases"])
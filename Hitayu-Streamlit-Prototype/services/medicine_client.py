@@ -0,0 +1,228 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from logger import Logger
+
+logger = Logger(name="medicine_client")
+
+_client = None
+_client_lock = threading.Lock()
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised while the circuit breaker is open and calls are short-circuited."""
+
+
+class UnsuccessfulResponse(RuntimeError):
+    """Raised when the API answers, but without a "success" status."""
+
+
+class MedicineInfoClient:
+    """
+    Client for the medicine-info API.
+
+    Uses one keep-alive ``requests.Session`` with connect/read timeouts and
+    retries on transient errors, a circuit breaker that stops calling the API
+    after repeated failures, and a per-disease TTL cache. The payload only
+    depends on the disease name, so in steady state no network call is made.
+    Concurrent misses for the same disease share one API call, and once the
+    circuit's reset timeout passes a single probe call decides whether it closes.
+    Non-"success" answers are cached for ``negative_ttl_seconds`` so reruns
+    don't ask again straight away.
+    """
+
+    def __init__(self, url, username, password, ttl_seconds=3600, connect_timeout=3.05,
+                 read_timeout=10.0, max_retries=2, failure_threshold=3, reset_timeout=30.0,
+                 negative_ttl_seconds=60.0):
+        self.url = url
+        self.username = (username or "").strip()
+        self.password = (password or "").strip()
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._session = None
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            url=os.getenv("API_KEY"),
+            username=os.getenv("NAME"),
+            password=os.getenv("PASSWORD"),
+            ttl_seconds=float(os.getenv("MEDICINE_CACHE_TTL_SECONDS", "3600")),
+            negative_ttl_seconds=float(os.getenv("MEDICINE_NEGATIVE_CACHE_TTL_SECONDS", "60"))
+        )
+
+    def _get_session(self):
+        # The prewarm thread and render threads may all arrive here first
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                retry = Retry(
+                    total=self.max_retries,
+                    backoff_factor=0.3,
+                    status_forcelist=(429, 502, 503, 504),
+                    allowed_methods=frozenset({"POST"})
+                )
+                session = requests.Session()
+                session.mount("http://", HTTPAdapter(pool_maxsize=10, max_retries=retry))
+                session.mount("https://", HTTPAdapter(pool_maxsize=10, max_retries=retry))
+                self._session = session
+            return self._session
+
+    # Circuit breaker ------------------------------------------------------------
+
+    def _check_circuit(self) -> bool:
+        """Raise while the circuit is open; returns True when this call is the half-open probe."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError("Medicine API circuit is open")
+            # Half-open: exactly one call probes the API, the rest keep failing fast
+            self._probing = True
+            return True
+
+    def _record_result(self, success, probe=False):
+        with self._lock:
+            if probe:
+                self._probing = False
+            if success:
+                self._failures = 0
+                self._opened_at = None
+            else:
+                self._failures += 1
+                if probe or self._failures >= self.failure_threshold:
+                    self._opened_at = time.monotonic()
+                    logger.warn(f"Medicine API circuit opened for {self.reset_timeout:.0f}s")
+
+    # Cache ----------------------------------------------------------------------
+
+    def _cached(self, key, allow_stale=False):
+        with self._lock:
+            return self._cached_locked(key, allow_stale)
+
+    def _cached_locked(self, key, allow_stale=False):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if allow_stale or time.monotonic() < expires_at:
+            return payload
+        return None
+
+    def get(self, class_name: str) -> dict:
+        """
+        Medication payload for a disease, served from the TTL cache when fresh.
+
+        On a miss the first caller fetches; callers arriving meanwhile for the
+        same disease wait for its result instead of calling the API again.
+
+        Returns:
+            dict: The API payload on success, otherwise ``{"error": ...}``
+        """
+        key = class_name.strip()
+        with self._lock:
+            payload = self._cached_locked(key)
+            if payload is not None:
+                return payload
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+        if not leader:
+            return flight.result()
+
+        try:
+            flight.set_result(self._load(key))
+        except BaseException as e:
+            flight.set_exception(e)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return flight.result()
+
+    def _load(self, key):
+        try:
+            payload = self._fetch(key)
+        except UnsuccessfulResponse as e:
+            logger.warn(f"Medicine API returned no data for class: {key}, Error: {str(e)}")
+            stale = self._cached(key, allow_stale=True)
+            payload = stale if stale is not None else {"error": str(e)}
+            # Cached briefly: the answer won't change on the next rerun
+            with self._lock:
+                self._cache[key] = (time.monotonic() + self.negative_ttl_seconds, payload)
+            return payload
+        except Exception as e:
+            logger.error(f"Medicine API call failed for class: {key}, Error: {str(e)}")
+            # Serve an expired payload rather than nothing
+            stale = self._cached(key, allow_stale=True)
+            return stale if stale is not None else {"error": str(e)}
+
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.ttl_seconds, payload)
+        return payload
+
+    def _fetch(self, disease_name: str) -> dict:
+        if not self.url:
+            raise RuntimeError("Medicine API URL not configured")
+        probe = self._check_circuit()
+
+        logger.info(f"Medicine API call for class: {disease_name}")
+        try:
+            response = self._get_session().post(
+                url=self.url,
+                json={
+                    "username": self.username,
+                    "password": self.password,
+                    "disease_name": disease_name
+                },
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            result = response.json()
+        except Exception:
+            self._record_result(False, probe)
+            raise
+
+        self._record_result(True, probe)
+        if result.get("status") != "success":
+            raise UnsuccessfulResponse("Database tool call failed")
+        return result
+
+    def prewarm(self, class_names, background=True):
+        """Fill the cache for all known classes, by default on a daemon thread."""
+        def _run():
+            for class_name in class_names:
+                self.get(class_name)
+            logger.info(f"Prewarmed medicine cache for {len(class_names)} classes")
+
+        if not background:
+            _run()
+            return None
+        thread = threading.Thread(target=_run, name="medicine-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+
+def get_medicine_client() -> MedicineInfoClient:
+    """Return the process-wide MedicineInfoClient."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = MedicineInfoClient.from_env()
+    return _client
@@ -0,0 +1,385 @@
+import atexit
+import os
+import queue
+import threading
+import time
+
+from logger import Logger
+
+logger = Logger(name="persistence")
+
+INSERT = "insert"
+UPDATE = "update"
+
+_client = None
+_client_lock = threading.Lock()
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_mongo_client():
+    """
+    Return the process-wide pooled MongoClient, or None when MongoDB is not configured.
+
+    The client is created once per process and shared by every Streamlit session;
+    pymongo keeps its own connection pool, so no per-request handshakes are needed.
+    """
+    global _client
+    connection_string = os.getenv("MONGO_CONNECTION_STRING")
+    if not connection_string:
+        return None
+    with _client_lock:
+        if _client is None:
+            from pymongo import MongoClient
+            _client = MongoClient(
+                connection_string,
+                maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "20")),
+                serverSelectionTimeoutMS=int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+                connect=False
+            )
+            logger.info("Created pooled MongoDB client")
+    return _client
+
+
+class PersistenceService:
+    """
+    Background writer for patient records.
+
+    Inserts and updates are placed on a bounded queue and written by a single
+    daemon thread, which batches consecutive inserts into ``insert_many`` and
+    consecutive updates into ``bulk_write``. Failed batches are retried with
+    exponential backoff and, once retries are exhausted, appended to a local
+    spool file that is replayed as soon as the database is reachable again.
+    While the spool holds writes, new batches are appended behind them rather
+    than written ahead, so operations always reach the database in queue order.
+    Callers never wait on the database.
+    """
+
+    def __init__(self, client_factory, database_name, spool_path,
+                 max_queue_size=1000, batch_size=100, flush_interval=0.5,
+                 max_retries=4, backoff_base=0.5, backoff_max=8.0, replay_interval=30.0):
+        self.client_factory = client_factory
+        self.database_name = database_name
+        self.spool_path = spool_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.replay_interval = replay_interval
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._spool_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_env(cls):
+        """Build a service from the MONGO_* environment variables."""
+        spool_dir = os.getenv("PERSISTENCE_SPOOL_DIR", "spool")
+        return cls(
+            client_factory=get_mongo_client,
+            database_name=os.getenv("MONGO_DATABASE_NAME", "skin_disease_db"),
+            spool_path=os.path.join(spool_dir, "pending_writes.jsonl"),
+            max_queue_size=int(os.getenv("PERSISTENCE_QUEUE_SIZE", "1000")),
+            batch_size=int(os.getenv("PERSISTENCE_BATCH_SIZE", "100"))
+        )
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="persistence-writer", daemon=True)
+            self._thread.start()
+            logger.info("Started background persistence writer")
+        return self
+
+    def stop(self, timeout=5.0):
+        """Stop the writer after draining the queue; anything left over is spooled."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        leftover = self._drain(block=False)
+        if leftover:
+            self._spool(self._prepare(leftover))
+
+    # Producer API -----------------------------------------------------------------
+
+    def insert(self, collection, document, prepare=None) -> str:
+        """
+        Queue a document for insertion and return its (client generated) ID.
+
+        ``prepare``, when given, is called with the document on the writer
+        thread and returns the document to store, so expensive work such as
+        encoding an image never runs on the caller's thread.
+        """
+        from bson import ObjectId
+
+        document = dict(document)
+        document.setdefault("_id", ObjectId())
+        op = {"kind": INSERT, "collection": collection, "document": document}
+        if prepare is not None:
+            op["prepare"] = prepare
+        self._enqueue(op)
+        return str(document["_id"])
+
+    def update(self, collection, filter, update, on_missing=None):
+        """
+        Queue a single-document update.
+
+        Updates queued close together for the same document are coalesced and
+        written with one ``bulk_write``. When ``on_missing`` is given and the
+        update matches no document, it is inserted into ``collection`` instead.
+        """
+        op = {"kind": UPDATE, "collection": collection, "filter": filter, "update": update}
+        if on_missing is not None:
+            from bson import ObjectId
+            op["on_missing"] = dict(on_missing)
+            op["on_missing"].setdefault("_id", ObjectId())
+        self._enqueue(op)
+
+    def update_now(self, collection, filter, update) -> int:
+        """
+        Apply one update synchronously in a single round trip on the pooled client.
+
+        Returns:
+            int: The matched count (0 means the document does not exist)
+        """
+        client = self.client_factory()
+        if client is None:
+            raise RuntimeError("Database connection not available")
+        return client[self.database_name][collection].update_one(filter, update).matched_count
+
+    def _enqueue(self, op):
+        try:
+            self._queue.put_nowait(op)
+        except queue.Full:
+            # Never block the caller; the op becomes durable on disk instead
+            logger.warn("Persistence queue full - spooling write to disk")
+            self._spool(self._prepare([op]))
+
+    # Writer thread ----------------------------------------------------------------
+
+    def _drain(self, block=True):
+        ops = []
+        try:
+            ops.append(self._queue.get(timeout=self.flush_interval) if block else self._queue.get_nowait())
+            while len(ops) < self.batch_size:
+                ops.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return ops
+
+    def _run(self):
+        self._safe_replay()
+        last_replay = time.monotonic()
+        while not self._stop.is_set():
+            ops = self._drain()
+            if not ops:
+                # Idle: periodically retry anything left in the spool
+                if time.monotonic() - last_replay >= self.replay_interval:
+                    self._safe_replay()
+                    last_replay = time.monotonic()
+                continue
+            self._write_batch(ops)
+            last_replay = time.monotonic()
+
+    def _prepare(self, ops):
+        """Run the deferred ``prepare`` step of queued inserts; only plain documents are written or spooled."""
+        prepared = []
+        for op in ops:
+            if "prepare" in op:
+                op = dict(op)
+                prepare = op.pop("prepare")
+                try:
+                    op["document"] = prepare(op["document"])
+                except Exception as e:
+                    logger.error(f"Dropping {op['collection']} insert {op['document']['_id']}: {str(e)}")
+                    continue
+            prepared.append(op)
+        return prepared
+
+    def _write_batch(self, ops):
+        ops = self._prepare(ops)
+        # Older writes still in the spool go first: an update must never reach
+        # the database before the spooled insert it refers to
+        if not self._safe_replay() or not self._write_with_retry(ops):
+            self._spool(ops)
+
+    def _write_with_retry(self, ops) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._write(ops)
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(f"Giving up on batch of {len(ops)} writes: {str(e)}")
+                    break
+                delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+                logger.warn(f"Batch write failed ({str(e)}); retrying in {delay:.1f}s")
+                if self._stop.wait(delay):
+                    break
+        return False
+
+    def _write(self, ops):
+        from pymongo import UpdateOne
+        from pymongo.errors import BulkWriteError
+
+        client = self.client_factory()
+        if client is None:
+            raise RuntimeError("Database connection not available")
+        database = client[self.database_name]
+
+        # Group consecutive ops of the same kind/collection so ordering is preserved
+        groups = []
+        for op in ops:
+            key = (op["kind"], op["collection"])
+            if groups and groups[-1][0] == key:
+                groups[-1][1].append(op)
+            else:
+                groups.append((key, [op]))
+
+        for (kind, collection_name), group in groups:
+            collection = database[collection_name]
+            if kind == INSERT:
+                try:
+                    collection.insert_many([op["document"] for op in group], ordered=False)
+                except BulkWriteError as e:
+                    # Duplicate keys mean an earlier attempt already stored the document
+                    errors = [err for err in e.details.get("writeErrors", []) if err.get("code") != 11000]
+                    if errors or e.details.get("writeConcernErrors"):
+                        raise
+            else:
+                self._write_updates(collection, group, UpdateOne)
+        logger.info(f"Wrote batch of {len(ops)} operations")
+
+    def _write_updates(self, collection, group, UpdateOne):
+        from bson import json_util
+
+        # Coalesce $set-only updates to the same document; later fields win
+        merged = {}
+        for op in group:
+            key = json_util.dumps(op["filter"])
+            previous = merged.get(key)
+            if previous is not None and set(previous["update"]) == set(op["update"]) == {"$set"}:
+                previous["update"] = {"$set": {**previous["update"]["$set"], **op["update"]["$set"]}}
+                previous["on_missing"] = op.get("on_missing", previous.get("on_missing"))
+            else:
+                if previous is not None:
+                    # Not mergeable: keep the earlier op in place under a unique key
+                    merged[f"{key}#{len(merged)}"] = merged.pop(key)
+                merged[key] = dict(op)
+        ops = list(merged.values())
+
+        result = collection.bulk_write([UpdateOne(op["filter"], op["update"]) for op in ops], ordered=True)
+        if result.matched_count >= len(ops):
+            return
+
+        # Some targets do not exist; only now pay for a lookup to find which ones
+        fallbacks = [op for op in ops if op.get("on_missing") is not None and "_id" in op["filter"]]
+        if not fallbacks:
+            logger.warn(f"{len(ops) - result.matched_count} updates matched no document")
+            return
+        existing = {doc["_id"] for doc in collection.find(
+            {"_id": {"$in": [op["filter"]["_id"] for op in fallbacks]}}, {"_id": 1})}
+        missing = [op["on_missing"] for op in fallbacks if op["filter"]["_id"] not in existing]
+        if missing:
+            logger.warn(f"{len(missing)} updates matched no document - storing them as new records")
+            self._write([{"kind": INSERT, "collection": collection.name, "document": doc} for doc in missing])
+
+    # Spool ------------------------------------------------------------------------
+
+    def _spool(self, ops):
+        from bson import json_util
+
+        with self._spool_lock:
+            os.makedirs(os.path.dirname(self.spool_path) or ".", exist_ok=True)
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                for op in ops:
+                    f.write(json_util.dumps(op) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        logger.warn(f"Spooled {len(ops)} writes to {self.spool_path}")
+
+    def _safe_replay(self) -> bool:
+        # A replay failure must never take the writer thread down with it
+        try:
+            return self._replay_spool()
+        except Exception as e:
+            logger.error(f"Spool replay failed, will retry: {str(e)}")
+            return False
+
+    def _replay_spool(self) -> bool:
+        """
+        Write spooled operations to the database, oldest first.
+
+        Returns:
+            bool: True once the spool is empty, False if writes are still pending
+        """
+        from bson import json_util
+
+        replay_path = self.spool_path + ".replay"
+        while True:
+            with self._spool_lock:
+                # A leftover .replay file is older than the spool: a replay that was
+                # deferred or interrupted by a crash. Finish it first. Replaying twice
+                # is safe (duplicate inserts are ignored, updates are $set).
+                if not os.path.exists(replay_path):
+                    if not os.path.exists(self.spool_path):
+                        return True
+                    os.replace(self.spool_path, replay_path)
+
+            ops, corrupt = [], []
+            with open(replay_path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        ops.append(json_util.loads(line))
+                    except (ValueError, TypeError, KeyError):
+                        corrupt.append(line if line.endswith("\n") else line + "\n")
+            if corrupt:
+                self._quarantine(corrupt)
+            logger.info(f"Replaying {len(ops)} spooled writes")
+
+            for i in range(0, len(ops), self.batch_size):
+                try:
+                    self._write(ops[i:i + self.batch_size])
+                except Exception as e:
+                    logger.warn(f"Spool replay deferred: {str(e)}")
+                    # Keep the unwritten tail in the .replay file, ahead of anything spooled since
+                    self._rewrite_replay(replay_path, ops[i:])
+                    return False
+            os.remove(replay_path)
+
+    def _rewrite_replay(self, replay_path, ops):
+        from bson import json_util
+
+        partial_path = replay_path + ".tmp"
+        with open(partial_path, "w", encoding="utf-8") as f:
+            for op in ops:
+                f.write(json_util.dumps(op) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(partial_path, replay_path)
+
+    def _quarantine(self, lines):
+        """Set unparseable spool lines aside for manual recovery instead of failing the replay."""
+        bad_path = self.spool_path + ".bad"
+        with self._spool_lock:
+            with open(bad_path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        logger.error(f"Moved {len(lines)} corrupt spooled writes to {bad_path}")
+
+
+def get_persistence_service():
+    """Return the started process-wide PersistenceService, or None when MongoDB is not configured."""
+    global _service
+    if not os.getenv("MONGO_CONNECTION_STRING"):
+        return None
+    with _service_lock:
+        if _service is None:
+            _service = PersistenceService.from_env().start()
+            atexit.register(_service.stop)
+    return _service
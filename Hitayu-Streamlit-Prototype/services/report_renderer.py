@@ -0,0 +1,516 @@
+import json
+from functools import lru_cache
+from html import escape
+
+from services.knowledge import load_knowledge_index
+
+RENDER_CACHE_SIZE = 64
+
+# Shared stylesheet for every report card; emitted once per page run, not per card
+REPORT_CSS = """
+<style>
+.medical-report-container {
+    background: linear-gradient(145deg, rgba(255, 255, 255, 0.1), rgba(255, 255, 255, 0.05));
+    backdrop-filter: blur(25px);
+    border: 2px solid rgba(255, 255, 255, 0.2);
+    border-radius: 25px;
+    padding: 2.5rem;
+    margin: 2rem 0;
+    box-shadow: 
+        0 20px 40px rgba(0, 0, 0, 0.4),
+        inset 0 1px 0 rgba(255, 255, 255, 0.2),
+        0 0 0 1px rgba(255, 255, 255, 0.05);
+    position: relative;
+    overflow: hidden;
+}
+
+.medical-report-container::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    right: 0;
+    height: 3px;
+    background: linear-gradient(90deg, #667eea, #764ba2, #f093fb);
+    animation: reportHeaderShimmer 3s ease-in-out infinite;
+}
+
+@keyframes reportHeaderShimmer {
+    0%, 100% { opacity: 0.8; }
+    50% { opacity: 1; }
+}
+
+.medical-report-header {
+    text-align: center;
+    margin-bottom: 2.5rem;
+    padding: 2rem;
+    background: linear-gradient(135deg, rgba(255, 255, 255, 0.15), rgba(255, 255, 255, 0.08));
+    backdrop-filter: blur(20px);
+    border: 1px solid rgba(255, 255, 255, 0.2);
+    border-radius: 20px;
+    box-shadow: 
+        0 10px 25px rgba(0, 0, 0, 0.3),
+        inset 0 1px 0 rgba(255, 255, 255, 0.2);
+    position: relative;
+    overflow: hidden;
+}
+
+.medical-report-header::after {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: -100%;
+    width: 100%;
+    height: 100%;
+    background: linear-gradient(90deg, 
+        transparent, 
+        rgba(255, 255, 255, 0.1), 
+        transparent);
+    transition: left 0.8s ease;
+    pointer-events: none;
+}
+
+.medical-report-header:hover::after {
+    left: 100%;
+}
+
+.medical-report-title {
+    font-size: 2.2rem;
+    color: #ffffff;
+    margin-bottom: 0.8rem;
+    font-weight: 800;
+    text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.3);
+    letter-spacing: 1px;
+}
+
+.medical-report-subtitle {
+    font-size: 1.1rem;
+    color: rgba(255, 255, 255, 0.8);
+    margin: 0;
+    font-weight: 500;
+}
+
+.medical-report-section {
+    background: linear-gradient(135deg, rgba(255, 255, 255, 0.12), rgba(255, 255, 255, 0.06));
+    backdrop-filter: blur(20px);
+    border: 1px solid rgba(255, 255, 255, 0.15);
+    padding: 2rem;
+    border-radius: 18px;
+    margin-bottom: 1.8rem;
+    box-shadow: 
+        0 12px 28px rgba(0, 0, 0, 0.3),
+        inset 0 1px 0 rgba(255, 255, 255, 0.2);
+    border-left: 4px solid;
+    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+    position: relative;
+    overflow: hidden;
+}
+
+.medical-report-section::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: -100%;
+    width: 100%;
+    height: 100%;
+    background: linear-gradient(90deg, 
+        transparent, 
+        rgba(255, 255, 255, 0.08), 
+        transparent);
+    transition: left 0.6s ease;
+    pointer-events: none;
+}
+
+.medical-report-section:hover {
+    transform: translateY(-5px) scale(1.01);
+    box-shadow: 
+        0 18px 35px rgba(0, 0, 0, 0.4),
+        inset 0 1px 0 rgba(255, 255, 255, 0.25),
+        0 0 0 1px rgba(255, 255, 255, 0.1);
+    border-color: rgba(255, 255, 255, 0.25);
+}
+
+.medical-report-section:hover::before {
+    left: 100%;
+}
+
+.medical-section-title {
+    font-size: 1.4rem;
+    font-weight: 700;
+    margin-bottom: 1.2rem;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    gap: 0.8rem;
+    text-shadow: 1px 1px 3px rgba(0, 0, 0, 0.3);
+    position: relative;
+    padding-bottom: 0.5rem;
+}
+
+.medical-section-title::after {
+    content: '';
+    position: absolute;
+    bottom: 0;
+    left: 50%;
+    transform: translateX(-50%);
+    width: 50px;
+    height: 2px;
+    border-radius: 1px;
+    opacity: 0.8;
+}
+
+.medical-section-content {
+    font-size: 1.05rem;
+    line-height: 1.7;
+    color: rgba(255, 255, 255, 0.9);
+    text-shadow: 0 1px 2px rgba(0, 0, 0, 0.2);
+    font-weight: 400;
+}
+
+.medical-section-icon {
+    font-size: 1.6rem;
+    filter: drop-shadow(0 2px 4px rgba(0, 0, 0, 0.3));
+    animation: iconPulse 2.5s ease-in-out infinite;
+}
+
+@keyframes iconPulse {
+    0%, 100% { transform: scale(1); }
+    50% { transform: scale(1.05); }
+}
+
+/* Color variations for different sections */
+.section-description {
+    border-left-color: #4ecdc4;
+}
+.section-description .medical-section-title {
+    color: #4ecdc4;
+}
+.section-description .medical-section-title::after {
+    background: linear-gradient(90deg, #4ecdc4, transparent);
+}
+
+.section-development {
+    border-left-color: #ff6b6b;
+}
+.section-development .medical-section-title {
+    color: #ff6b6b;
+}
+.section-development .medical-section-title::after {
+    background: linear-gradient(90deg, #ff6b6b, transparent);
+}
+
+.section-transmission {
+    border-left-color: #ffa500;
+}
+.section-transmission .medical-section-title {
+    color: #ffa500;
+}
+.section-transmission .medical-section-title::after {
+    background: linear-gradient(90deg, #ffa500, transparent);
+}
+
+/* Responsive design */
+@media (max-width: 768px) {
+    .medical-report-container {
+        padding: 1.5rem;
+        margin: 1rem 0;
+    }
+
+    .medical-report-header {
+        padding: 1.5rem;
+    }
+
+    .medical-report-title {
+        font-size: 1.8rem;
+    }
+
+    .medical-report-section {
+        padding: 1.5rem;
+    }
+
+    .medical-section-title {
+        font-size: 1.2rem;
+    }
+}
+
+.info-container {
+    background: linear-gradient(135deg, rgba(25,25,50,0.9), rgba(45,45,80,0.9));
+    border-radius: 20px;
+    padding: 2rem;
+    margin: 1rem 0;
+    border: 1px solid rgba(255,255,255,0.1);
+    box-shadow: 0 8px 32px rgba(0,0,0,0.2);
+}
+.section-title {
+    color: #7B68EE;
+    font-size: 1.5rem;
+    font-weight: 600;
+    margin-bottom: 1rem;
+    text-shadow: 0 2px 4px rgba(0,0,0,0.2);
+}
+.info-card {
+    background: rgba(255,255,255,0.05);
+    border-radius: 15px;
+    padding: 1.5rem;
+    margin: 1rem 0;
+    border: 1px solid rgba(255,255,255,0.05);
+}
+.highlight-text {
+    color: #50C878;
+    font-weight: 500;
+}
+
+.medical-section-body {
+    font-size: 1.2rem;
+    line-height: 1.8;
+    color: rgba(255, 255, 255, 0.95);
+    text-shadow: 0 1px 2px rgba(0, 0, 0, 0.2);
+    font-weight: 400;
+    text-align: center;
+    background: linear-gradient(135deg, rgba(255, 255, 255, 0.05), rgba(255, 255, 255, 0.02));
+    border-radius: 12px;
+    padding: 1.5rem;
+    margin: 0.5rem 0;
+    border-left: 3px solid rgba(255, 255, 255, 0.2);
+    backdrop-filter: blur(10px);
+    box-shadow:
+        0 4px 15px rgba(0, 0, 0, 0.2),
+        inset 0 1px 0 rgba(255, 255, 255, 0.1);
+    transition: all 0.3s ease;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    min-height: 80px;
+}
+
+.medication-card {
+    background: linear-gradient(135deg, rgba(72, 49, 212, 0.05), rgba(72, 49, 212, 0.1));
+    border-radius: 15px;
+    padding: 1.5rem;
+    margin: 1rem auto;
+    border: 1px solid rgba(72, 49, 212, 0.2);
+    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+    max-width: 800px;
+    text-align: center;
+}
+.medication-name {
+    font-size: 1.5rem;
+    color: #7B68EE;
+    margin-bottom: 1rem;
+    font-weight: 600;
+}
+.medication-detail {
+    color: rgba(255,255,255,0.9);
+    font-size: 1.1rem;
+    margin-bottom: 0.5rem;
+}
+
+.info-card-title {
+    color: #7B68EE;
+    font-size: 1.3rem;
+    margin-bottom: 1.5rem;
+    font-weight: 600;
+}
+.condition-row {
+    display: grid;
+    grid-template-columns: 1fr 2fr;
+    gap: 1rem;
+    margin-bottom: 1.5rem;
+    color: rgba(255,255,255,0.9);
+}
+
+.prevention-card {
+    background: linear-gradient(135deg, rgba(80, 200, 120, 0.05), rgba(80, 200, 120, 0.1));
+    border: 1px solid rgba(80, 200, 120, 0.2);
+}
+.prevention-card .info-card-title {
+    color: #50C878;
+}
+.prevention-step {
+    display: flex;
+    align-items: center;
+    margin: 1rem 0;
+    padding: 1rem;
+    background: rgba(255, 255, 255, 0.05);
+    border-radius: 12px;
+    border: 1px solid rgba(80, 200, 120, 0.2);
+    transition: all 0.3s ease;
+}
+.prevention-step-number {
+    background: rgba(80, 200, 120, 0.1);
+    color: #50C878;
+    min-width: 28px;
+    height: 28px;
+    border-radius: 50%;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    margin-right: 1rem;
+    font-weight: 600;
+    border: 1px solid rgba(80, 200, 120, 0.3);
+}
+.prevention-step-text {
+    color: rgba(255,255,255,0.95);
+    font-size: 1.1rem;
+    line-height: 1.5;
+}
+.complication-item {
+    display: flex;
+    align-items: start;
+    margin: 0.5rem 0;
+    color: rgba(255,255,255,0.9);
+}
+.complication-item .bullet {
+    color: #FF6B6B;
+    margin-right: 0.5rem;
+}
+</style>
+"""
+
+_MEDICAL_SECTIONS = (
+    ("Medical Description", "description", "🏥", "section-description"),
+    ("How It Develops", "entry_to_body", "🔬", "section-development"),
+    ("Transmission Information", "spread", "🦠", "section-transmission"),
+)
+
+
+def _compact(html: str) -> str:
+    # No blank or indented lines: Markdown would end the HTML block or render a code block
+    return "\n".join(line.strip() for line in html.splitlines() if line.strip())
+
+
+def _text(value, default="Information not available"):
+    return escape(str(value), quote=False) if value else default
+
+
+def _medication_card(medication: dict) -> str:
+    timing = [slot.capitalize() for slot in ("morning", "afternoon", "evening") if medication.get(slot) == "Yes"]
+    return f"""
+<div class="medication-card">
+    <div class="medication-name">{_text(medication.get('drug_name'), 'Unnamed medication')}</div>
+    <div class="medication-detail">📋 Dosage: {_text(medication.get('dosage'), 'As directed')}</div>
+    <div class="medication-detail">⏱️ Duration: {_text(medication.get('duration'))}</div>
+    <div class="medication-detail">💊 Route: {_text(medication.get('route'))}</div>
+    <div class="medication-detail">🕒 Timing: {", ".join(timing) if timing else "As prescribed"}</div>
+</div>"""
+
+
+def _medications_html(payload: dict) -> str:
+    medications = payload.get("data") or []
+    if not medications:
+        return ""
+    cards = "".join(_medication_card(medication) for medication in medications)
+    return f"""
+<div class="info-container" style="text-align: center;">
+    <div class="section-title" style="text-align: center;">💊 Prescribed Medications</div>
+    {cards}
+</div>"""
+
+
+def _care_guide_html(entry) -> str:
+    rows = "".join(f"""
+    <div class="condition-row">
+        <div><strong>{label}:</strong></div>
+        <div>{_text(entry.get(key))}</div>
+    </div>""" for label, key in (("Description", "description"),
+                                 ("How it Affects the Body", "entry_to_body"),
+                                 ("Transmission", "spread")))
+    steps = "".join(f"""
+        <div class="prevention-step">
+            <div class="prevention-step-number">{i}</div>
+            <span class="prevention-step-text">{_text(step)}</span>
+        </div>""" for i, step in enumerate(entry.get("secondary_prevention", ()), 1))
+    complications = "".join(f"""
+        <div class="complication-item"><span class="bullet">•</span><span>{_text(item)}</span></div>"""
+                            for item in entry.get("complications", ()))
+    return f"""
+<div class="info-container">
+    <div class="section-title">🛡️ Prevention & Care Guide</div>
+    <div class="info-card">
+        <div class="info-card-title">About the Condition</div>
+        {rows}
+    </div>
+    {f'<div class="info-card prevention-card"><div class="info-card-title">🛡️ Prevention & Management Steps</div>{steps}</div>' if steps else ''}
+    {f'<div class="info-card"><div class="info-card-title">⚠️ Potential Complications</div>{complications}</div>' if complications else ''}
+</div>"""
+
+
+def _medical_report_html(entry) -> str:
+    sections = "".join(f"""
+    <div class="medical-report-section {css_class}">
+        <div class="medical-section-title">
+            <span class="medical-section-icon">{icon}</span>
+            {title}
+        </div>
+        <div class="medical-section-content">
+            <div class="medical-section-body">{_text(entry.get(key))}</div>
+        </div>
+    </div>""" for title, key, icon, css_class in _MEDICAL_SECTIONS)
+    return f"""
+<div class="medical-report-container">
+    <div class="medical-report-header">
+        <div class="medical-report-title">📋 Medical Report: {_text(entry.get('disease_name') or entry.get('disease'))}</div>
+        <div class="medical-report-subtitle">Comprehensive Medical Information & Analysis</div>
+    </div>
+    {sections}
+</div>
+{entry.get('prevention_html', '')}
+{entry.get('complications_html', '')}"""
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render(class_name: str, knowledge_version: str, medication_json: str) -> tuple:
+    entry = load_knowledge_index().lookup(class_name) or {"disease": class_name}
+    payload = json.loads(medication_json)
+
+    medications_html = _medications_html(payload)
+    care_guide_html = _care_guide_html(entry) if "description" in entry else ""
+    medical_report_html = _medical_report_html(entry)
+
+    document = f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Hitayu Medical Report - {_text(entry.get('disease'))}</title>
+{REPORT_CSS}
+<style>body {{ background: #0f0f23; color: #e0e6ed; font-family: 'Inter', sans-serif; padding: 2rem; }}</style>
+</head>
+<body>
+{medical_report_html}
+{medications_html}
+{care_guide_html}
+<p><em>⚠️ This report is for screening purposes only. Always consult with a dermatologist for final diagnosis.</em></p>
+</body>
+</html>
+"""
+    return (_compact(medications_html), _compact(care_guide_html), _compact(medical_report_html),
+            document.encode("utf-8"))
+
+
+def render_report(predicted_class: str, medication_payload: dict = None) -> dict:
+    """
+    Rendered HTML for a diagnosis report, memoized on (class, knowledge version, medication payload).
+
+    Returns:
+        dict: ``medications_html``, ``care_guide_html`` and ``medical_report_html``
+        fragments (styled by ``REPORT_CSS``) plus ``document``, a standalone HTML
+        report as bytes ready for download
+    """
+    knowledge = load_knowledge_index()
+    entry = knowledge.lookup(predicted_class)
+    class_name = entry["disease"] if entry else predicted_class.strip()
+    payload = medication_payload if medication_payload and not medication_payload.get("error") else {}
+    medication_json = json.dumps(payload, sort_keys=True, default=str)
+    medications_html, care_guide_html, medical_report_html, document = _render(
+        class_name, knowledge.version, medication_json)
+    return {
+        "medications_html": medications_html,
+        "care_guide_html": care_guide_html,
+        "medical_report_html": medical_report_html,
+        "document": document
+    }
+
+
+def render_cache_info():
+    """Hit/miss statistics of the report render cache."""
+    return _render.cache_info()
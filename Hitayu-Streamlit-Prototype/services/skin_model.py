@@ -0,0 +1,369 @@
+import argparse
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image, ImageOps
+from logger import Logger
+from services.artifacts import get_artifact_store
+
+logger = Logger(name="skin_model")
+
+MODEL_INPUT_SIZE = (224, 224)
+MODEL_ARTIFACT = "SDN5.h5"
+LABELS_ARTIFACT = "sdn5_labels.txt"
+PREPROCESS_CACHE_SIZE = 8
+
+# Test-time augmentation: 1 disables it; views beyond the standard fit are zoomed crops and flips
+TTA_VIEWS = int(os.getenv("SDN5_TTA_VIEWS", "1"))
+TTA_LATENCY_BUDGET_MS = float(os.getenv("SDN5_TTA_LATENCY_BUDGET_MS", "0")) or None
+TTA_CROP_FRACTION = 0.75
+# Order in which views are added as K grows: (source, flipped). Source 0 is the
+# standard fit, 1 the center crop and 2-5 the corner crops of the zoomed image.
+TTA_VIEW_ORDER = ((0, False), (0, True), (1, False), (1, True), (2, False), (3, False),
+                  (4, False), (5, False), (2, True), (3, True), (4, True), (5, True))
+MAX_TTA_VIEWS = len(TTA_VIEW_ORDER)
+
+# Confidence calibration: probabilities are temperature-scaled before bucketing
+CONFIDENCE_TEMPERATURE = float(os.getenv("SDN5_CONFIDENCE_TEMPERATURE", "1.0"))
+CONFIDENCE_BUCKETS = ((0.9, "High"), (0.7, "Medium"), (0.0, "Low"))
+TOP_K = 3
+
+_model = None
+_labels = None
+_model_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+_preprocess_cache = OrderedDict()
+_preprocess_lock = threading.Lock()
+_cost_model = None
+_warmup_thread = None
+
+
+def _load_keras_model(path):
+    import tensorflow as tf
+    from keras.models import load_model
+    from tensorflow.keras.layers import DepthwiseConv2D
+
+    class PatchedDepthwiseConv2D(DepthwiseConv2D):
+        def __init__(self, *args, groups=None, **kwargs):
+            super().__init__(*args, **kwargs)
+
+    with tf.keras.utils.custom_object_scope({'DepthwiseConv2D': PatchedDepthwiseConv2D}):
+        return load_model(path)
+
+
+def _load_model():
+    """Load SDN5 from the verified local artifact cache (downloaded only when missing)."""
+    try:
+        model_path = get_artifact_store().resolve(MODEL_ARTIFACT)
+        model = _load_keras_model(str(model_path))
+        logger.info(f"Model loaded successfully from {model_path}")
+        return model
+    except Exception as e:
+        logger.error(f"Error loading model: {str(e)}")
+        raise RuntimeError(f"Failed to load model: {str(e)}") from e
+
+
+def get_model():
+    """The process-wide SDN5 model, loaded on first use."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = _load_model()
+    return _model
+
+
+def load_in_background():
+    """
+    Start loading the model and labels on a daemon thread, once per process.
+
+    Called while the user is still filling in the form, so the first
+    prediction does not pay for the TensorFlow import and model load.
+    """
+    global _warmup_thread
+    with _executor_lock:
+        if _model is not None or (_warmup_thread is not None and _warmup_thread.is_alive()):
+            return _warmup_thread
+
+        def _run():
+            try:
+                get_model()
+                load_labels()
+            except Exception as e:
+                # predict() retries the load and reports the error to the user
+                logger.warn(f"Background model load failed: {str(e)}")
+
+        _warmup_thread = threading.Thread(target=_run, name="skin-model-load", daemon=True)
+        _warmup_thread.start()
+    return _warmup_thread
+
+
+def load_labels():
+    """Class labels in model output order ("0 Acne" lines -> "Acne")."""
+    global _labels
+    if _labels is None:
+        with open(get_artifact_store().resolve(LABELS_ARTIFACT), encoding="utf-8") as f:
+            _labels = [line.strip().split(" ", 1)[1] for line in f if line.strip()]
+    return _labels
+
+
+def _tta_views(image, views):
+    """
+    Build ``views`` uint8 model inputs in one pass.
+
+    The image is resized at most twice (the standard fit and one zoomed fit);
+    crops are strided windows into the zoomed array and flips are reversed
+    views, so no per-view copies are made until the final stack.
+    """
+    fitted = ImageOps.fit(image=image, size=MODEL_INPUT_SIZE, method=Image.Resampling.LANCZOS)
+    sources = [np.asarray(fitted)]
+    if views > 2:
+        height, width = MODEL_INPUT_SIZE
+        zoom = (round(width / TTA_CROP_FRACTION), round(height / TTA_CROP_FRACTION))
+        zoomed = np.asarray(ImageOps.fit(image=image, size=zoom, method=Image.Resampling.LANCZOS))
+        windows = np.lib.stride_tricks.sliding_window_view(zoomed, (height, width, 3))
+        dy, dx = zoom[1] - height, zoom[0] - width
+        rows = np.array([dy // 2, 0, 0, dy, dy])
+        cols = np.array([dx // 2, 0, dx, 0, dx])
+        sources.extend(windows[rows, cols, 0])
+
+    batch = np.stack([
+        sources[source][:, ::-1] if flipped else sources[source]
+        for source, flipped in TTA_VIEW_ORDER[:views]
+    ])
+    return batch, fitted
+
+
+def preprocess(image, image_key=None, views=1):
+    """
+    Fit the image to the model input and scale it to [-1, 1].
+
+    With ``views`` > 1 the batch also holds the test-time augmentation views
+    (see ``TTA_VIEW_ORDER``). Results are kept in a small LRU keyed by
+    ``image_key`` (a content hash) and view count, so re-analysing the same
+    image skips the resize.
+
+    Returns:
+        tuple: (views, 224, 224, 3) float32 batch and the fitted PIL image
+    """
+    cache_key = None if image_key is None else (image_key, views)
+    if cache_key is not None:
+        with _preprocess_lock:
+            if cache_key in _preprocess_cache:
+                _preprocess_cache.move_to_end(cache_key)
+                return _preprocess_cache[cache_key]
+
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    batch, processed_image = _tta_views(image, views)
+    normalized_batch = batch.astype(np.float32)
+    normalized_batch /= 127.5
+    normalized_batch -= 1
+    result = (normalized_batch, processed_image)
+
+    if cache_key is not None:
+        with _preprocess_lock:
+            _preprocess_cache[cache_key] = result
+            while len(_preprocess_cache) > PREPROCESS_CACHE_SIZE:
+                _preprocess_cache.popitem(last=False)
+    return result
+
+
+def calibrate_cost_model(model=None, batch_size=8, repeats=3):
+    """
+    Fit the batched inference cost as ``fixed_ms + per_view_ms * views``.
+
+    Measured once per process from a batch of one and a batch of
+    ``batch_size`` (after a warm-up call); ``SDN5_TTA_COST_MS="fixed,per_view"``
+    pins the coefficients so the chosen view count is reproducible across hosts.
+    """
+    global _cost_model
+    if _cost_model is not None:
+        return _cost_model
+    pinned = os.getenv("SDN5_TTA_COST_MS")
+    if pinned:
+        fixed_ms, per_view_ms = (float(value) for value in pinned.split(","))
+        _cost_model = (fixed_ms, per_view_ms)
+        return _cost_model
+
+    model = model or get_model()
+    height, width = MODEL_INPUT_SIZE
+
+    def _timed(views):
+        batch = np.zeros((views, height, width, 3), dtype=np.float32)
+        model.predict(batch, verbose=0)
+        started = time.perf_counter()
+        for _ in range(repeats):
+            model.predict(batch, verbose=0)
+        return (time.perf_counter() - started) * 1000 / repeats
+
+    single_ms, batch_ms = _timed(1), _timed(batch_size)
+    per_view_ms = max(0.0, (batch_ms - single_ms) / (batch_size - 1))
+    _cost_model = (max(0.0, single_ms - per_view_ms), per_view_ms)
+    logger.info(f"TTA cost model: {_cost_model[0]:.1f}ms + {_cost_model[1]:.2f}ms/view")
+    return _cost_model
+
+
+def choose_tta_views(views=None, latency_budget_ms=None):
+    """
+    Number of TTA views to run: the configured count, lowered to the largest
+    count whose predicted cost fits ``latency_budget_ms``. Never below 1.
+    """
+    views = max(1, min(MAX_TTA_VIEWS, views or TTA_VIEWS))
+    latency_budget_ms = latency_budget_ms or TTA_LATENCY_BUDGET_MS
+    if views == 1 or latency_budget_ms is None:
+        return views
+    fixed_ms, per_view_ms = calibrate_cost_model()
+    if per_view_ms <= 0:
+        return views
+    affordable = int((latency_budget_ms - fixed_ms) // per_view_ms)
+    return max(1, min(views, affordable))
+
+
+class TopPredictions(NamedTuple):
+    """Highest-probability classes, best first, plus the calibrated confidence bucket."""
+    indices: tuple
+    labels: tuple
+    probabilities: tuple
+    calibrated_confidence: float
+    confidence_bucket: str
+
+
+def calibrate(probabilities, temperature=None):
+    """Temperature-scale softmax outputs (equivalent to dividing the logits by T)."""
+    temperature = temperature or CONFIDENCE_TEMPERATURE
+    if temperature == 1.0:
+        return probabilities
+    scaled = np.power(probabilities, 1.0 / temperature)
+    return scaled / scaled.sum()
+
+
+def confidence_bucket(confidence) -> str:
+    for threshold, bucket in CONFIDENCE_BUCKETS:
+        if confidence > threshold:
+            return bucket
+    return CONFIDENCE_BUCKETS[-1][1]
+
+
+def top_predictions(probabilities, labels, k=TOP_K, temperature=None) -> TopPredictions:
+    """
+    Top-k classes of one probability vector.
+
+    ``np.argpartition`` selects the k largest in linear time; only those k are sorted.
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float64).reshape(-1)
+    k = min(k, probabilities.size)
+    indices = np.argpartition(probabilities, probabilities.size - k)[-k:]
+    indices = indices[np.argsort(probabilities[indices])[::-1]]
+    calibrated = float(calibrate(probabilities, temperature)[indices[0]])
+    return TopPredictions(
+        indices=tuple(int(i) for i in indices),
+        labels=tuple(labels[i] for i in indices),
+        probabilities=tuple(float(p) for p in probabilities[indices]),
+        calibrated_confidence=calibrated,
+        confidence_bucket=confidence_bucket(calibrated)
+    )
+
+
+def predict(image, progress=None, image_key=None, tta_views=None, latency_budget_ms=None) -> dict:
+    """
+    Predict skin disease type from an image
+
+    Args:
+        image: PIL Image object
+        progress: Optional AnalysisProgress receiving the preprocess/infer stages
+        image_key: Content hash of the image, used to cache preprocessing
+        tta_views: Test-time augmentation views (default ``SDN5_TTA_VIEWS``)
+        latency_budget_ms: Upper bound on inference time used to cap ``tta_views``
+    Returns:
+        dict: Prediction results with class, confidence and ``TopPredictions``
+    """
+    stage = progress.stage if progress is not None else (lambda *args, **kwargs: nullcontext())
+    try:
+        logger.info("Processing skin disease prediction")
+        views = choose_tta_views(tta_views, latency_budget_ms)
+
+        with stage("preprocess", "Preprocessing skin lesion image..."):
+            skin_data, processed_image = preprocess(image, image_key, views)
+
+        with stage("infer", "Applying deep learning model..."):
+            skin_model = get_model()
+            skin_labels = load_labels()
+
+            logger.info(f'Making prediction initiated ({views} view(s))')
+            # All views go through the model as one batch; their probabilities are averaged
+            prediction = skin_model.predict(skin_data, verbose=0).mean(axis=0, keepdims=True)
+        top = top_predictions(prediction[0], skin_labels)
+        logger.info('Making prediction finished')
+
+        return {
+            "predicted_class": top.labels[0],
+            "confidence_score": top.probabilities[0],
+            "all_predictions": prediction,
+            "top_predictions": top,
+            "tta_views": views
+        }
+
+    except Exception as e:
+        logger.error(f"Error in skin disease prediction: {str(e)}")
+        return {
+            "predicted_class": "Unknown",
+            "confidence_score": 0.0,
+            "error": str(e)
+        }
+
+
+def submit_prediction(image, image_key=None):
+    """
+    Run ``predict`` on the shared inference thread and return its Future.
+
+    A single worker serializes calls into the model, so concurrent sessions
+    queue instead of contending for it.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="skin-inference")
+    return _executor.submit(predict, image, None, image_key)
+
+
+def benchmark_tta(image_path, views=8, repeats=5):
+    """
+    Compare one batched TTA forward pass with the same views run one call at a time.
+
+    Returns mean milliseconds per prediction for both, after a warm-up.
+    """
+    model = get_model()
+    with Image.open(image_path) as image:
+        batch, _ = preprocess(image.convert("RGB"), views=views)
+
+    def _mean_ms(run):
+        run()
+        started = time.perf_counter()
+        for _ in range(repeats):
+            run()
+        return (time.perf_counter() - started) * 1000 / repeats
+
+    batched_ms = _mean_ms(lambda: model.predict(batch, verbose=0))
+    sequential_ms = _mean_ms(lambda: [model.predict(batch[i:i + 1], verbose=0) for i in range(views)])
+    return {
+        "views": views,
+        "batched_ms": round(batched_ms, 1),
+        "sequential_ms": round(sequential_ms, 1),
+        "speedup": round(sequential_ms / batched_ms, 2)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched test-time augmentation for SDN5")
+    parser.add_argument("image", help="Path to a skin lesion image")
+    parser.add_argument("--views", type=int, default=8, choices=range(1, MAX_TTA_VIEWS + 1), metavar="K")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    print(benchmark_tta(args.image, views=args.views, repeats=args.repeats))
@@ -69,6 +69,7 @@ setup(
       license="MIT",
       packages=find_packages(exclude=("tests", "tests.*")),
       include_package_data=True,
+      package_data={"services": ["data/*.json", "data/*.txt"]},
       install_requires=requirements,
       python_requires=">=3.11",
 )
\ No newline at end of file
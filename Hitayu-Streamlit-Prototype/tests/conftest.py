@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Loggers write to ./logs; keep test runs out of the working tree
+os.chdir(tempfile.mkdtemp(prefix="hitayu-tests-"))
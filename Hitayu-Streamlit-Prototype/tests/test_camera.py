@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+from services.camera import CaptureWorker, SyntheticVideoSource
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def source_frame_number(rgb):
+    # SyntheticVideoSource writes its frame counter into the first BGR pixels
+    return int.from_bytes(rgb[0, :8, ::-1].tobytes()[:8], "little")
+
+
+class RecordingFactory:
+    """Source factory that remembers every source it opened and can be told to fail."""
+
+    def __init__(self, fps=100):
+        self.fps = fps
+        self.sources = []
+        self.failures = 0
+
+    def __call__(self):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("device busy")
+        source = SyntheticVideoSource(width=64, height=48, fps=self.fps)
+        self.sources.append(source)
+        return source
+
+
+@pytest.fixture
+def factory():
+    return RecordingFactory()
+
+
+def test_latest_returns_the_freshest_frame(factory):
+    worker = CaptureWorker(factory).start()
+    try:
+        first = worker.latest(timeout=2.0)
+        assert first is not None
+        frame_id, timestamp, rgb = first
+        assert rgb.shape == (48, 64, 3)
+        assert time.time() - timestamp < 1.0
+
+        assert wait_for(lambda: worker.latest()[0] >= frame_id + 3)
+        newest_id, _, newest = worker.latest()
+        # Worker IDs start at 1, the source's counter at 0: no frame was skipped or reordered
+        assert source_frame_number(newest) == newest_id - 1
+        assert len(factory.sources) == 1
+    finally:
+        worker.stop()
+
+
+def test_capture_returns_a_copy_without_reopening(factory):
+    worker = CaptureWorker(factory).start()
+    try:
+        image = worker.capture(timeout=2.0)
+        image[:] = 0
+        assert worker.capture().any()
+        assert len(factory.sources) == 1
+    finally:
+        worker.stop()
+
+
+def test_idle_worker_releases_and_reopens_the_device(factory):
+    worker = CaptureWorker(factory, idle_timeout=0.1).start()
+    try:
+        assert worker.latest(timeout=2.0) is not None
+        assert wait_for(lambda: not worker.running)
+        assert not factory.sources[0].isOpened()
+
+        assert worker.latest(timeout=2.0) is not None
+        assert len(factory.sources) == 2
+    finally:
+        worker.stop()
+
+
+def test_failed_open_backs_off_before_retrying(factory):
+    factory.failures = 2
+    worker = CaptureWorker(factory, retry_backoff=0.2)
+    try:
+        assert worker.latest() is None
+        assert wait_for(lambda: worker.error is not None and not worker.running)
+        assert "device busy" in worker.error
+        failed_at = time.monotonic()
+
+        # Preview polls during the backoff must not touch the device
+        while time.monotonic() - failed_at < 0.15:
+            assert worker.latest() is None
+            time.sleep(0.01)
+        assert factory.failures == 1
+
+        # Polling on: the second open fails too (0.4s backoff), the third succeeds and clears the error
+        assert wait_for(lambda: worker.latest() is not None, timeout=3.0)
+        assert time.monotonic() - failed_at >= 0.5
+        assert worker.error is None
+        assert len(factory.sources) == 1
+    finally:
+        worker.stop()
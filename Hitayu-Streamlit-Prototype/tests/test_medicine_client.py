@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from services.medicine_client import MedicineInfoClient
+
+
+class StubResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class StubSession:
+    """Records every POST; answers with ``status`` after ``delay`` seconds, or raises while ``down``."""
+
+    def __init__(self, status="success", delay=0.0):
+        self.status = status
+        self.delay = delay
+        self.down = False
+        self.calls = []
+
+    def post(self, url, json, timeout):
+        self.calls.append(json["disease_name"])
+        time.sleep(self.delay)
+        if self.down:
+            raise ConnectionError("medicine API unreachable")
+        return StubResponse({"status": self.status, "disease": json["disease_name"]})
+
+
+def make_client(session, **kwargs):
+    client = MedicineInfoClient("http://medicine.test", "user", "secret", **kwargs)
+    client._session = session
+    return client
+
+
+def run_concurrently(target, count):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_misses_share_one_call():
+    session = StubSession(delay=0.1)
+    client = make_client(session)
+    results = []
+
+    run_concurrently(lambda: results.append(client.get("Acne")), 8)
+
+    assert session.calls == ["Acne"]
+    assert all(result == {"status": "success", "disease": "Acne"} for result in results)
+
+
+def test_half_open_circuit_lets_one_probe_through():
+    session = StubSession(delay=0.1)
+    client = make_client(session, failure_threshold=2, reset_timeout=0.2)
+    session.down = True
+    client.get("A")
+    client.get("B")
+    assert client._opened_at is not None
+
+    time.sleep(0.25)
+    session.calls.clear()
+    run_concurrently(lambda: client.get(f"D{threading.get_ident()}"), 6)
+
+    assert len(session.calls) == 1
+    # The probe failed, so the circuit is open again
+    assert client._opened_at is not None
+
+
+def test_successful_probe_closes_the_circuit():
+    session = StubSession()
+    client = make_client(session, failure_threshold=1, reset_timeout=0.1)
+    session.down = True
+    client.get("A")
+
+    time.sleep(0.15)
+    session.down = False
+    assert client.get("B")["status"] == "success"
+    assert client._opened_at is None
+
+
+@pytest.mark.parametrize("elapsed, expected_calls", [(0.0, 1), (0.25, 2)])
+def test_unsuccessful_answers_are_cached_briefly(elapsed, expected_calls):
+    session = StubSession(status="not_found")
+    client = make_client(session, negative_ttl_seconds=0.2)
+
+    assert "error" in client.get("Acne")
+    time.sleep(elapsed)
+    assert "error" in client.get("Acne")
+    assert len(session.calls) == expected_calls
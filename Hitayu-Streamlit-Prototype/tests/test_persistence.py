@@ -0,0 +1,226 @@
+import os
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from services.persistence import INSERT, UPDATE, PersistenceService
+
+
+class StubCollection:
+    """In-memory collection implementing the subset of pymongo the writer uses."""
+
+    def __init__(self, name, database):
+        self.name = name
+        self.database = database
+        self.documents = {}
+
+    def insert_many(self, documents, ordered=True):
+        self.database.check()
+        errors = []
+        for index, document in enumerate(documents):
+            if document["_id"] in self.documents:
+                errors.append({"index": index, "code": 11000, "errmsg": "duplicate key"})
+            else:
+                self.documents[document["_id"]] = dict(document)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "writeConcernErrors": []})
+
+    def bulk_write(self, requests, ordered=True):
+        self.database.check()
+        self.database.bulk_writes += 1
+        matched = 0
+        for request in requests:
+            document = self.documents.get(request._filter["_id"])
+            if document is not None:
+                matched += 1
+                document.update(request._doc["$set"])
+        return type("BulkWriteResult", (), {"matched_count": matched})()
+
+    def find(self, filter, projection=None):
+        return [{"_id": _id} for _id in filter["_id"]["$in"] if _id in self.documents]
+
+    def update_one(self, filter, update):
+        raise NotImplementedError
+
+
+class StubDatabase:
+    def __init__(self):
+        self.collections = {}
+        self.available = True
+        self.bulk_writes = 0
+
+    def check(self):
+        if not self.available:
+            raise ConnectionError("database unavailable")
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = StubCollection(name, self)
+        return self.collections[name]
+
+
+@pytest.fixture
+def database():
+    return StubDatabase()
+
+
+@pytest.fixture
+def service(database, tmp_path):
+    return PersistenceService(
+        client_factory=lambda: {"db": database},
+        database_name="db",
+        spool_path=str(tmp_path / "spool" / "pending_writes.jsonl"),
+        batch_size=10,
+        max_retries=1,
+        backoff_base=0.0
+    )
+
+
+def insert_op(_id, **fields):
+    return {"kind": INSERT, "collection": "records", "document": {"_id": _id, **fields}}
+
+
+def update_op(_id, on_missing=None, **fields):
+    op = {"kind": UPDATE, "collection": "records", "filter": {"_id": _id}, "update": {"$set": fields}}
+    if on_missing is not None:
+        op["on_missing"] = on_missing
+    return op
+
+
+def test_batch_inserts_then_coalesces_updates(service, database):
+    service._write_batch([insert_op(1, a=1), update_op(1, b=2), update_op(1, c=3)])
+
+    assert database["records"].documents[1] == {"_id": 1, "a": 1, "b": 2, "c": 3}
+    assert database.bulk_writes == 1
+
+
+def test_duplicate_inserts_are_tolerated(service, database):
+    service._write_batch([insert_op(1, a=1)])
+    service._write_batch([insert_op(1, a=1)])
+
+    assert list(database["records"].documents) == [1]
+
+
+def test_update_of_missing_document_falls_back_to_insert(service, database):
+    service._write_batch([update_op(1, on_missing={"_id": 2, "feedback": "x"}, feedback="x")])
+
+    assert database["records"].documents == {2: {"_id": 2, "feedback": "x"}}
+
+
+def test_outage_spools_and_replay_restores(service, database):
+    database.available = False
+    service._write_batch([insert_op(1, a=1)])
+    assert os.path.exists(service.spool_path)
+
+    database.available = True
+    assert service._replay_spool()
+    assert database["records"].documents[1] == {"_id": 1, "a": 1}
+    assert not os.path.exists(service.spool_path)
+    assert not os.path.exists(service.spool_path + ".replay")
+
+
+def test_new_writes_stay_behind_the_spool(service, database):
+    database.available = False
+    service._write_batch([insert_op(1, a=1)])
+
+    # The feedback update must not reach the database ahead of the spooled insert
+    database.available = True
+    service._write_batch([update_op(1, on_missing={"_id": 2, "feedback": "x"}, feedback="x")])
+
+    assert database["records"].documents == {1: {"_id": 1, "a": 1, "feedback": "x"}}
+
+
+def test_writes_queue_behind_a_spool_that_cannot_be_replayed(service, database):
+    database.available = False
+    service._write_batch([insert_op(1, a=1)])
+    service._write_batch([update_op(1, feedback="x")])
+    assert database["records"].documents == {}
+
+    database.available = True
+    assert service._replay_spool()
+    assert database["records"].documents == {1: {"_id": 1, "a": 1, "feedback": "x"}}
+
+
+def test_deferred_replay_keeps_its_tail_ahead_of_newer_writes(service, database, monkeypatch):
+    service._spool([insert_op(i) for i in range(15)])
+    write = service._write
+    calls = []
+
+    def fail_second_batch(ops):
+        calls.append(len(ops))
+        if len(calls) == 2:
+            raise ConnectionError("database unavailable")
+        write(ops)
+
+    monkeypatch.setattr(service, "_write", fail_second_batch)
+    assert not service._replay_spool()
+    service._spool([update_op(14, late=True)])
+
+    monkeypatch.setattr(service, "_write", write)
+    assert service._replay_spool()
+    assert len(database["records"].documents) == 15
+    assert database["records"].documents[14] == {"_id": 14, "late": True}
+
+
+def test_interrupted_replay_is_resumed(service, database):
+    from bson import json_util
+
+    os.makedirs(os.path.dirname(service.spool_path))
+    with open(service.spool_path + ".replay", "w", encoding="utf-8") as f:
+        f.write(json_util.dumps(insert_op(1, a=1)) + "\n")
+    service._spool([update_op(1, b=2)])
+
+    assert service._replay_spool()
+    assert database["records"].documents[1] == {"_id": 1, "a": 1, "b": 2}
+
+
+def test_corrupt_spool_lines_are_quarantined(service, database):
+    from bson import json_util
+
+    os.makedirs(os.path.dirname(service.spool_path))
+    with open(service.spool_path, "w", encoding="utf-8") as f:
+        f.write(json_util.dumps(insert_op(1)) + "\n")
+        f.write('{"kind": "insert", "collec\n')
+
+    assert service._replay_spool()
+    assert list(database["records"].documents) == [1]
+    with open(service.spool_path + ".bad", encoding="utf-8") as f:
+        assert f.read() == '{"kind": "insert", "collec\n'
+
+
+def test_stop_spools_queued_writes(service, database):
+    database.available = False
+    service.insert("records", {"a": 1})
+    service.stop()
+
+    database.available = True
+    assert service._replay_spool()
+    assert [doc["a"] for doc in database["records"].documents.values()] == [1]
+
+
+def test_prepare_runs_before_the_write(service, database):
+    service.insert("records", {"_id": 1}, prepare=lambda document: {**document, "encoded": True})
+    service._write_batch(service._drain(block=False))
+
+    assert database["records"].documents[1] == {"_id": 1, "encoded": True}
+
+
+def test_prepared_documents_are_spooled_not_the_callable(service, database):
+    database.available = False
+    service.insert("records", {"_id": 1}, prepare=lambda document: {**document, "encoded": True})
+    service._write_batch(service._drain(block=False))
+
+    database.available = True
+    assert service._replay_spool()
+    assert database["records"].documents[1] == {"_id": 1, "encoded": True}
+
+
+def test_failed_prepare_drops_only_that_insert(service, database):
+    def fail(document):
+        raise ValueError("cannot encode")
+
+    service.insert("records", {"_id": 1}, prepare=fail)
+    service.insert("records", {"_id": 2})
+    service._write_batch(service._drain(block=False))
+
+    assert list(database["records"].documents) == [2]